@@ -1,6 +1,19 @@
 from flask import Flask, jsonify, request
 from app.config import settings
 from app.extensions import db, migrate, swagger
+from app.jobs import init_celery
+from app.services.cache import init_cache
+from app.services.events import init_events
+from app.services.sync import init_sync
+from app.services.project_stats import init_project_stats
+from app.services.analytics import init_analytics
+from app.services.soft_delete import init_soft_delete
+from app.services.tenancy import init_tenancy
+from app.services.rate_limit import init_rate_limit
+from app.services.admission import init_admission
+from app.services.idempotency import init_idempotency
+from app.services.compression import init_compression
+from app.utils.json_provider import FastJSONProvider
 from app.routes.user import user_bp
 from app.routes.auth import auth_bp
 from app.routes.customer import customer_bp
@@ -12,12 +25,25 @@ from app.models import *
 
 def create_app(config_class=settings.DevelopmentConfig):
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
     app.config.from_object(config_class)
 
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
     jwt = JWTManager(app)
+    init_celery(app)
+    init_cache(app)
+    init_events(app)
+    init_sync(app)
+    init_project_stats(app)
+    init_analytics(app)
+    init_soft_delete(app)
+    init_tenancy(app)
+    init_rate_limit(app)
+    init_admission(app)
+    init_idempotency(app)
+    init_compression(app)
 
     # Add Swagger Bearer token security definition
     app.config['SWAGGER'] = {
@@ -64,6 +90,26 @@ def create_app(config_class=settings.DevelopmentConfig):
     app.register_blueprint(subtask_bp)
     app.register_blueprint(kanban_bp)
     app.register_blueprint(calendar_bp)
+    from app.routes.events import events_bp
+    from app.routes.export import export_bp
+    from app.routes.tenant_import import import_bp
+    from app.routes.metrics import metrics_bp
+    from app.routes.sync import sync_bp
+    from app.routes.overview import overview_bp
+    from app.routes.project_stats import project_stats_bp
+    from app.routes.analytics import analytics_bp
+    from app.routes.notification import notification_bp
+    from app.routes.activity import activity_bp
+    app.register_blueprint(events_bp)
+    app.register_blueprint(export_bp)
+    app.register_blueprint(import_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(sync_bp)
+    app.register_blueprint(overview_bp)
+    app.register_blueprint(project_stats_bp)
+    app.register_blueprint(analytics_bp)
+    app.register_blueprint(notification_bp)
+    app.register_blueprint(activity_bp)
 
     # Now, initialize swagger (after blueprints)
     from flasgger import swag_from
@@ -0,0 +1,71 @@
+"""
+ASGI app serving the read-heavy board endpoints with SQLAlchemy's async engine.
+
+It shares the models, statements and serializers of the Flask routes,
+including their fields= and include= handling, so for the same data it returns
+the same JSON (status codes and bodies; headers such as ETag and
+Content-Encoding are Flask-only). A single event-loop worker can hold hundreds of
+board loads open while they wait on the database instead of one per thread.
+Run it next to the Flask app and route the GETs below to it:
+
+  uvicorn asgi:application --workers 2
+
+Requests are rate limited like their Flask endpoints. Admission control is not
+applied: requests here wait on the database pool rather than on worker threads,
+so the pool size is what bounds a worker's concurrent work.
+"""
+from contextlib import asynccontextmanager
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from starlette.applications import Starlette
+from starlette.routing import Route
+from app.config import settings
+from app.async_api.routes import get_kanban_board, get_project_calendar, list_comments, list_files
+from app.services.rate_limit import rate_limiter
+
+
+def async_database_url(url):
+    """The async driver URL of a sync database URL (asyncpg for PostgreSQL, aiosqlite for SQLite)."""
+    scheme, sep, rest = url.partition('://')
+    dialect = scheme.split('+')[0]
+    if dialect in ('postgresql', 'postgres'):
+        return f'postgresql+asyncpg{sep}{rest}'
+    if dialect == 'sqlite':
+        return f'sqlite+aiosqlite{sep}{rest}'
+    return url
+
+
+def create_async_app(config_class=settings.DevelopmentConfig):
+    url = async_database_url(config_class.SQLALCHEMY_DATABASE_URI)
+    pool = {}
+    if not url.startswith('sqlite'):
+        pool = {
+            'pool_size': config_class.ASYNC_DB_POOL_SIZE,
+            'max_overflow': config_class.ASYNC_DB_MAX_OVERFLOW,
+            'pool_pre_ping': True,
+        }
+    engine = create_async_engine(url, **pool)
+    rate_limiter.configure(
+        limits=config_class.RATE_LIMITS,
+        user_limits=config_class.RATE_LIMITS_PER_USER,
+        redis_url=config_class.RATE_LIMIT_REDIS_URL,
+        maxsize=config_class.RATE_LIMIT_MAX_KEYS,
+    )
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        await engine.dispose()
+
+    app = Starlette(
+        debug=getattr(config_class, 'DEBUG', False),
+        routes=[
+            Route('/api/kanban/{project_id}', get_kanban_board, methods=['GET']),
+            Route('/api/calendar/{project_id}', get_project_calendar, methods=['GET']),
+            Route('/api/comments', list_comments, methods=['GET']),
+            Route('/api/files', list_files, methods=['GET']),
+        ],
+        lifespan=lifespan,
+    )
+    app.state.config = config_class
+    app.state.session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    return app
@@ -0,0 +1,152 @@
+import math
+import jwt
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+from app.models.customer import Customer
+from app.routes.kanban import card_rows, kanban_statement, build_board, board_cards
+from app.routes.calendar import calendar_statement, event_rows
+from app.routes.comment import comments_statement, comment_rows
+from app.routes.file_attachment import file_rows, files_statement, dump_files
+from app.services.rate_limit import rate_limiter
+from app.services.soft_delete import live_rows_criteria
+from app.services.tenancy import tenant_scope_for, tenant_criteria
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; without it the stdlib encoder is used
+    orjson = None
+    import json
+
+
+class JSONResponse(Response):
+    """JSON rendered like the Flask app's jsonify(): sorted keys, compact, trailing newline."""
+
+    media_type = 'application/json'
+
+    def render(self, content):
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS) + b'\n'
+        return (json.dumps(content, sort_keys=True, separators=(',', ':')) + '\n').encode()
+
+
+def _claims(request):
+    """
+    Claims of the request's access token, or an error response mirroring
+    flask-jwt-extended: 401 when the token is missing or expired, 422 when invalid.
+    """
+    header = request.headers.get('Authorization', '')
+    scheme, _, token = header.partition(' ')
+    if scheme != 'Bearer' or not token:
+        return None, JSONResponse({'msg': 'Missing Authorization Header'}, status_code=401)
+    try:
+        claims = jwt.decode(token, request.app.state.config.JWT_SECRET_KEY, algorithms=['HS256'])
+    except jwt.ExpiredSignatureError:
+        return None, JSONResponse({'msg': 'Token has expired'}, status_code=401)
+    except jwt.PyJWTError as exc:
+        return None, JSONResponse({'msg': str(exc)}, status_code=422)
+    if claims.get('type') != 'access':
+        return None, JSONResponse({'msg': 'Only non-refresh tokens are allowed'}, status_code=422)
+    return claims, None
+
+
+async def _rate_limit(request, session, claims, endpoint):
+    """
+    Take the caller's tokens from the Flask app's buckets (shared across both
+    apps when RATE_LIMIT_REDIS_URL is set). Returns a 429 response, or None.
+    """
+    if not request.app.state.config.RATE_LIMIT_ENABLED:
+        return None
+    customer_id = claims.get('customer_id')
+    if customer_id:
+        plan = await session.scalar(select(Customer.plan_type).where(Customer.id == customer_id))
+        caller = (f'customer:{customer_id}', plan or 'free', claims.get('sub'))
+    else:
+        caller = (f"user:{claims.get('sub')}", 'user', None)
+    # A Redis round trip blocks, so it runs off the event loop
+    wait = await run_in_threadpool(rate_limiter.check, endpoint, *caller)
+    if wait is None:
+        return None
+    return JSONResponse({'error': 'Too many requests'}, status_code=429,
+                        headers={'Retry-After': str(max(1, math.ceil(wait)))})
+
+
+async def _expand(session, view, entries, options, tenant_id):
+    """Embed the view's includes into entries with the same batched loads as the Flask routes, on session."""
+    loaded = {}
+    for name, related, keys in view.include_keys(entries):
+        loaded[name] = {}
+        for statement in related.statements(keys, tenant_id):
+            loaded[name].update(related.dump(await session.execute(statement.options(*options))))
+    return view.embed(entries, loaded)
+
+
+async def _list(request, endpoint, serializer, statement, render, entries=lambda body: body):
+    """
+    Serve a list endpoint like its Flask counterpart: once the request has passed
+    the endpoint's rate limits, narrow serializer with the fields= and include=
+    query arguments (400 on unknown names), run statement(view) under the
+    caller's tenant and live-rows scope, render(rows, view) the body without its
+    includes, then embed them into entries(body).
+    """
+    claims, error = _claims(request)
+    if error is not None:
+        return error
+    options = [live_rows_criteria()]
+    tenant_id = tenant_scope_for(claims)
+    if tenant_id is not None:
+        options.append(tenant_criteria(tenant_id))
+    async with request.app.state.session_factory() as session:
+        limited = await _rate_limit(request, session, claims, endpoint)
+        if limited is not None:
+            return limited
+        try:
+            view = serializer.for_request(request.query_params)
+        except ValueError as error:
+            return JSONResponse({'error': str(error)}, status_code=400)
+        result = await session.execute(statement(view).options(*options))
+        body = render(result.all(), view)
+        await _expand(session, view, entries(body), options, tenant_id)
+    return JSONResponse(body)
+
+
+async def get_kanban_board(request):
+    project_id = request.path_params['project_id']
+    return await _list(
+        request, 'kanban_bp.get_kanban_board', card_rows,
+        lambda cards: kanban_statement(project_id, cards),
+        lambda rows, cards: build_board(rows, cards, expand=False),
+        entries=board_cards,
+    )
+
+
+async def get_project_calendar(request):
+    project_id = request.path_params['project_id']
+    return await _list(
+        request, 'calendar_bp.get_project_calendar', event_rows,
+        lambda events: calendar_statement(project_id, events),
+        lambda rows, events: events.dump_rows(rows, expand=False),
+    )
+
+
+async def list_comments(request):
+    task_id = request.query_params.get('task_id')
+    return await _list(
+        request, 'comment_bp.list_comments', comment_rows,
+        lambda comments: comments_statement(task_id, comments),
+        lambda rows, comments: comments.dump_rows(rows, expand=False),
+    )
+
+
+def _thumbnail_url(file_id, thumbnail_status):
+    return f'/api/files/{file_id}/thumbnail' if thumbnail_status == 'ready' else None
+
+
+async def list_files(request):
+    task_id = request.query_params.get('task_id')
+    project_id = request.query_params.get('project_id')
+    return await _list(
+        request, 'file_bp.list_files', file_rows,
+        lambda files: files_statement(task_id, project_id, files),
+        lambda rows, files: dump_files(rows, thumbnail_url=_thumbnail_url, serializer=files, expand=False),
+    )
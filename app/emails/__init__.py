@@ -0,0 +1,26 @@
+import smtplib
+from email.message import EmailMessage
+from flask import current_app
+
+
+def send_email(to, subject, body):
+    """
+    Send a plain-text email through MAIL_SERVER. Returns False without sending
+    when no mail server is configured (development), so callers can log it.
+    """
+    config = current_app.config
+    if not config['MAIL_SERVER']:
+        current_app.logger.info('MAIL_SERVER not set, not sending "%s" to %s', subject, to)
+        return False
+    message = EmailMessage()
+    message['From'] = config['MAIL_DEFAULT_SENDER']
+    message['To'] = to
+    message['Subject'] = subject
+    message.set_content(body)
+    with smtplib.SMTP(config['MAIL_SERVER'], config['MAIL_PORT'], timeout=10) as smtp:
+        if config['MAIL_USE_TLS']:
+            smtp.starttls()
+        if config['MAIL_USERNAME']:
+            smtp.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
+        smtp.send_message(message)
+    return True
@@ -0,0 +1,15 @@
+REMINDER_HEADINGS = {'overdue': 'Overdue', 'due_tomorrow': 'Due tomorrow'}
+
+
+def render_due_digest(name, reminders):
+    """Subject and body of one user's digest; reminders are (kind, title, due_date) tuples."""
+    lines = [f'Hi {name},', '']
+    for kind, heading in REMINDER_HEADINGS.items():
+        tasks = [(title, due_date) for task_kind, title, due_date in reminders if task_kind == kind]
+        if not tasks:
+            continue
+        lines.append(f'{heading}:')
+        lines.extend(f'  - {title} (due {due_date.isoformat()})' for title, due_date in tasks)
+        lines.append('')
+    subject = '1 task needs your attention' if len(reminders) == 1 else f'{len(reminders)} tasks need your attention'
+    return subject, '\n'.join(lines)
@@ -1 +1,48 @@
+from celery import Celery
+from celery.schedules import crontab
 
+celery = Celery(__name__)
+
+
+def init_celery(app):
+    """Bind the Celery app to the Flask app so tasks run inside an application context."""
+    celery.conf.update(
+        broker_url=app.config['CELERY_BROKER_URL'],
+        result_backend=app.config['CELERY_RESULT_BACKEND'],
+        # Fail fast when the broker or result backend is down so web requests that enqueue work don't stall
+        broker_transport_options={'max_retries': 2, 'interval_start': 0, 'interval_step': 0.2, 'interval_max': 0.5},
+        result_backend_transport_options={
+            'retry_policy': {'max_retries': 2, 'interval_start': 0, 'interval_step': 0.2, 'interval_max': 0.5},
+        },
+        include=['app.jobs.blob_gc', 'app.jobs.thumbnails', 'app.jobs.export', 'app.jobs.tenant_import', 'app.jobs.compaction', 'app.jobs.project_stats', 'app.jobs.reminders'],
+        beat_schedule={
+            'gc-orphaned-blobs': {
+                'task': 'app.jobs.blob_gc.gc_orphaned_blobs',
+                'schedule': app.config['BLOB_GC_INTERVAL_SECONDS'],
+            },
+            'process-thumbnail-backlog': {
+                'task': 'app.jobs.thumbnails.process_thumbnail_backlog',
+                'schedule': app.config['THUMBNAIL_BACKLOG_INTERVAL_SECONDS'],
+            },
+            'compact-deleted-rows': {
+                'task': 'app.jobs.compaction.compact_deleted_rows',
+                'schedule': crontab(hour=app.config['COMPACTION_HOUR'], minute=0),
+            },
+            'send-due-reminders': {
+                'task': 'app.jobs.reminders.send_due_reminders',
+                'schedule': app.config['REMINDER_INTERVAL_SECONDS'],
+            },
+            'repair-project-stats': {
+                'task': 'app.jobs.project_stats.repair_project_stats',
+                'schedule': crontab(hour=app.config['STATS_REPAIR_HOUR'], minute=30),
+            },
+        },
+    )
+
+    class ContextTask(celery.Task):
+        def __call__(self, *args, **kwargs):
+            with app.app_context():
+                return self.run(*args, **kwargs)
+
+    celery.Task = ContextTask
+    return celery
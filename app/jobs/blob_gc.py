@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta
+from flask import current_app
+from app.jobs import celery
+from app.models.file_blob import FileBlob
+from app.services.blob_storage import delete_blob_if_orphaned, sweep_unreferenced_files
+
+GC_BATCH_SIZE = 500
+
+
+@celery.task
+def gc_orphaned_blobs():
+    """
+    Remove blobs no attachment references any more.
+
+    Only blobs that have been unreferenced for longer than BLOB_GC_GRACE_SECONDS
+    are collected, which leaves room for an upload of the same content that is
+    racing with the delete of its last attachment. Files in the upload folder
+    that no row accounts for (from uploads whose request failed before
+    committing) are swept after the same grace period.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=current_app.config['BLOB_GC_GRACE_SECONDS'])
+    candidates = [
+        sha256 for (sha256,) in FileBlob.query
+        .with_entities(FileBlob.sha256)
+        .filter(FileBlob.ref_count <= 0, FileBlob.released_at < cutoff)
+        .limit(GC_BATCH_SIZE)
+    ]
+    removed = sum(1 for sha256 in candidates if delete_blob_if_orphaned(sha256))
+    return {'candidates': len(candidates), 'removed': removed, 'files_swept': sweep_unreferenced_files(cutoff)}
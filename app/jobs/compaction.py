@@ -0,0 +1,121 @@
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select, exists, func
+from app.extensions import db
+from app.jobs import celery
+from app.models.task import Task
+from app.models.comment import Comment
+from app.models.file_attachment import FileAttachment
+from app.models.sync_counter import SyncCounter
+from app.models.tombstone import Tombstone
+from app.services.blob_storage import release_blob
+
+
+def _cascade_batch(batch_size):
+    """
+    Soft-delete one batch of live comments, files and subtasks whose task is
+    deleted. Goes through the ORM so each gets its tombstone; deeper levels of a
+    subtask tree are reached by later batches. Returns the number of rows marked.
+    """
+    tasks = Task.__table__
+    deleted_tasks = select(tasks.c.id).where(tasks.c.deleted_at.isnot(None))
+    marked = 0
+    for model, column in ((Comment, Comment.task_id), (FileAttachment, FileAttachment.task_id), (Task, Task.parent_task_id)):
+        for row in model.query.filter(column.in_(deleted_tasks)).limit(batch_size):
+            row.soft_delete()
+            marked += 1
+    db.session.commit()
+    return marked
+
+
+def _purge_batch(model, cutoff, batch_size):
+    """Hard-delete one batch of rows soft-deleted before cutoff. Returns the number removed."""
+    table = model.__table__
+    query = select(table.c.id).where(table.c.deleted_at < cutoff)
+    if model is FileAttachment:
+        query = query.add_columns(table.c.blob_sha256)
+    if model is Task:
+        # Keep a task until nothing live hangs off it
+        for child in (Comment.__table__.c.task_id, FileAttachment.__table__.c.task_id, table.alias().c.parent_task_id):
+            query = query.where(~exists().where(child == table.c.id, child.table.c.deleted_at.is_(None)))
+    rows = db.session.execute(query.limit(batch_size)).all()
+    if not rows:
+        return 0
+    db.session.execute(table.delete().where(table.c.id.in_([row[0] for row in rows])))
+    if model is FileAttachment:
+        released = {}
+        for _, sha256 in rows:
+            if sha256:
+                released[sha256] = released.get(sha256, 0) + 1
+        for sha256, count in released.items():
+            release_blob(sha256, count)
+    db.session.commit()
+    return len(rows)
+
+
+def _prune_tombstones(cutoff, batch_size, deadline):
+    """
+    Drop sync tombstones older than cutoff. Each tenant's purged_seq is raised
+    first, so a client whose cursor predates the pruned tombstones gets a 410
+    instead of silently missing deletes.
+    """
+    pruned = 0
+    horizons = (
+        db.session.query(Tombstone.customer_id, func.max(Tombstone.change_seq))
+        .filter(Tombstone.deleted_at < cutoff)
+        .group_by(Tombstone.customer_id)
+        .all()
+    )
+    for customer_id, seq in horizons:
+        SyncCounter.query.filter(SyncCounter.customer_id == customer_id, SyncCounter.purged_seq < seq).update(
+            {SyncCounter.purged_seq: seq}, synchronize_session=False
+        )
+        db.session.commit()
+        while time.monotonic() < deadline:
+            ids = [
+                tombstone_id for (tombstone_id,) in Tombstone.query
+                .with_entities(Tombstone.id)
+                .filter(Tombstone.customer_id == customer_id, Tombstone.change_seq <= seq)
+                .limit(batch_size)
+            ]
+            if not ids:
+                break
+            Tombstone.query.filter(Tombstone.id.in_(ids)).delete(synchronize_session=False)
+            db.session.commit()
+            pruned += len(ids)
+    return pruned
+
+
+@celery.task
+def compact_deleted_rows():
+    """
+    Purge soft-deleted tasks, comments and files, scheduled off-peak.
+
+    Work is done in batches of COMPACTION_BATCH_SIZE rows, each in its own short
+    transaction, and stops after COMPACTION_MAX_SECONDS; whatever is left is
+    picked up by the next run. Rows are only purged COMPACTION_GRACE_SECONDS
+    after they were deleted.
+    """
+    config = current_app.config
+    batch_size = config['COMPACTION_BATCH_SIZE']
+    deadline = time.monotonic() + config['COMPACTION_MAX_SECONDS']
+    now = datetime.utcnow()
+    cutoff = now - timedelta(seconds=config['COMPACTION_GRACE_SECONDS'])
+    stats = {'cascaded': 0, 'purged': 0, 'tombstones_pruned': 0}
+
+    while time.monotonic() < deadline:
+        marked = _cascade_batch(batch_size)
+        stats['cascaded'] += marked
+        if not marked:
+            break
+    for model in (Comment, FileAttachment, Task):
+        while time.monotonic() < deadline:
+            removed = _purge_batch(model, cutoff, batch_size)
+            stats['purged'] += removed
+            if not removed:
+                break
+    if time.monotonic() < deadline:
+        tombstone_cutoff = now - timedelta(days=config['SYNC_TOMBSTONE_RETENTION_DAYS'])
+        stats['tombstones_pruned'] = _prune_tombstones(tombstone_cutoff, batch_size, deadline)
+    return stats
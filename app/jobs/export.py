@@ -0,0 +1,46 @@
+import os
+from datetime import datetime
+from flask import current_app
+from app.extensions import db
+from app.jobs import celery
+from app.models.export_job import ExportJob
+from app.services.export import EXPORT_FORMATS
+
+
+def export_path(job):
+    _, _, extension = EXPORT_FORMATS[job.format]
+    return os.path.join(current_app.config['UPLOAD_FOLDER'], 'exports', f'{job.id}.{extension}')
+
+
+@celery.task
+def run_export(job_id):
+    """Write a tenant export to storage, streaming exactly as the synchronous endpoint does."""
+    job = db.session.get(ExportJob, job_id)
+    if job is None or job.status != 'pending':
+        return None
+    job.status = 'running'
+    db.session.commit()
+    generate, _, _ = EXPORT_FORMATS[job.format]
+    path = export_path(job)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    progress = {}
+    try:
+        with open(path + '.part', 'wb') as out:
+            for chunk in generate(job.customer_id, progress):
+                out.write(chunk)
+        os.replace(path + '.part', path)
+    except Exception as exc:
+        db.session.rollback()
+        if os.path.exists(path + '.part'):
+            os.remove(path + '.part')
+        job.status = 'failed'
+        job.error = str(exc)
+        job.completed_at = datetime.utcnow()
+        db.session.commit()
+        raise
+    job.status = 'done'
+    job.file_path = path
+    job.row_count = progress.get('rows')
+    job.completed_at = datetime.utcnow()
+    db.session.commit()
+    return {'rows': job.row_count}
@@ -0,0 +1,31 @@
+from flask import current_app
+from sqlalchemy import select
+from app.extensions import db
+from app.jobs import celery
+from app.models.project import Project
+from app.services.project_stats import recompute_project_stats
+
+
+@celery.task
+def repair_project_stats():
+    """
+    Recompute every project's task counters from its tasks, correcting any
+    drift (bulk writes that bypassed the session, manual SQL fixes). Projects
+    are rebuilt STATS_REPAIR_BATCH_SIZE at a time, each batch in its own short
+    transaction.
+    """
+    batch_size = current_app.config['STATS_REPAIR_BATCH_SIZE']
+    projects = Project.__table__
+    last_id = ''
+    repaired = 0
+    while True:
+        ids = db.session.scalars(
+            select(projects.c.id).where(projects.c.id > last_id).order_by(projects.c.id).limit(batch_size)
+        ).all()
+        if not ids:
+            break
+        recompute_project_stats(ids)
+        db.session.commit()
+        repaired += len(ids)
+        last_id = ids[-1]
+    return {'projects': repaired}
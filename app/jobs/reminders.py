@@ -0,0 +1,195 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from flask import current_app
+from sqlalchemy import select, exists, and_, or_
+from sqlalchemy.exc import IntegrityError
+from app.emails import send_email
+from app.emails.due_reminders import render_due_digest
+from app.extensions import db
+from app.jobs import celery
+from app.models.job_cursor import JobCursor
+from app.models.task import Task
+from app.models.task_reminder import TaskReminder
+from app.models.user import User
+
+# High-water mark: the last due date whose overdue tasks have all been reminded
+OVERDUE_CURSOR = 'due_reminders:overdue'
+
+
+def _lock_cursor(name, initial):
+    """
+    The job cursor row, locked for this transaction; None if another worker
+    holds it (on PostgreSQL; elsewhere runs just overlap and the claims dedupe).
+    """
+    cursor = db.session.execute(
+        select(JobCursor).where(JobCursor.name == name).with_for_update(skip_locked=True)
+    ).scalar_one_or_none()
+    if cursor is not None:
+        return cursor
+    try:
+        with db.session.begin_nested():
+            cursor = JobCursor(name=name, position=initial.isoformat())
+            db.session.add(cursor)
+        return cursor
+    except IntegrityError:
+        return None
+
+
+def _unclaimed(kind, low, high, batch_size):
+    """Open, assigned tasks due in [low, high] with no claim for this kind and due date yet."""
+    tasks = Task.__table__
+    claims = TaskReminder.__table__
+    return db.session.execute(
+        select(tasks.c.id, tasks.c.customer_id, tasks.c.assignee_user_id, tasks.c.due_date)
+        .where(
+            tasks.c.due_date.between(low, high),
+            tasks.c.deleted_at.is_(None),
+            tasks.c.status != 'done',
+            tasks.c.assignee_user_id.isnot(None),
+            ~exists().where(and_(
+                claims.c.task_id == tasks.c.id, claims.c.kind == kind, claims.c.due_date == tasks.c.due_date
+            ))
+        )
+        .order_by(tasks.c.due_date, tasks.c.id)
+        .limit(batch_size)
+    ).all()
+
+
+def _claim(kind, rows):
+    """Insert claims for rows; a claim another worker inserted first is skipped."""
+    claimed = []
+    for task_id, customer_id, user_id, due_date in rows:
+        try:
+            with db.session.begin_nested():
+                db.session.add(TaskReminder(
+                    task_id=task_id, kind=kind, due_date=due_date, customer_id=customer_id, user_id=user_id
+                ))
+            claimed.append((task_id, kind, due_date))
+        except IntegrityError:
+            continue
+    return claimed
+
+
+def _reclaim_unsent(today, batch_size):
+    """
+    Claims not sent REMINDER_RETRY_SECONDS after they were claimed (the send
+    failed, or MAIL_SERVER wasn't set) whose reminder still applies: the task
+    is open, assigned and still due that day, and a due-tomorrow reminder isn't
+    late yet. Each is taken over by moving its claimed_at forward, which only
+    one worker can do.
+    """
+    config = current_app.config
+    now = datetime.utcnow()
+    tasks = Task.__table__
+    claims = TaskReminder.__table__
+    rows = db.session.execute(
+        select(claims.c.task_id, claims.c.kind, claims.c.due_date, claims.c.claimed_at)
+        .join(tasks, tasks.c.id == claims.c.task_id)
+        .where(
+            claims.c.sent_at.is_(None),
+            claims.c.claimed_at < now - timedelta(seconds=config['REMINDER_RETRY_SECONDS']),
+            or_(
+                and_(claims.c.kind == 'due_tomorrow', claims.c.due_date == today + timedelta(days=1)),
+                and_(claims.c.kind == 'overdue', claims.c.due_date >= today - timedelta(days=config['REMINDER_RETRY_DAYS'])),
+            ),
+            tasks.c.due_date == claims.c.due_date,
+            tasks.c.deleted_at.is_(None),
+            tasks.c.status != 'done',
+            tasks.c.assignee_user_id.isnot(None),
+        )
+        .order_by(claims.c.claimed_at)
+        .limit(batch_size)
+    ).all()
+    reclaimed = []
+    for task_id, kind, due_date, claimed_at in rows:
+        taken = db.session.execute(
+            claims.update()
+            .where(claims.c.task_id == task_id, claims.c.kind == kind, claims.c.due_date == due_date,
+                   claims.c.claimed_at == claimed_at, claims.c.sent_at.is_(None))
+            .values(claimed_at=now)
+        ).rowcount
+        if taken:
+            reclaimed.append((task_id, kind, due_date))
+    return reclaimed
+
+
+def _send_digests(claimed):
+    """One email per user listing every task claimed for them. Returns the claims that were sent."""
+    task_ids = {task_id for task_id, _, _ in claimed}
+    kinds = defaultdict(list)
+    for task_id, kind, due_date in claimed:
+        kinds[task_id].append((kind, due_date))
+    digests = defaultdict(list)
+    recipients = {}
+    rows = db.session.execute(
+        select(Task.id, Task.title, User.id, User.email, User.name)
+        .join(User, User.id == Task.assignee_user_id)
+        .where(Task.id.in_(task_ids))
+        .execution_options(all_tenants=True)
+    )
+    for task_id, title, user_id, email, name in rows:
+        recipients[user_id] = (email, name)
+        for kind, due_date in kinds[task_id]:
+            digests[user_id].append((kind, title, due_date, task_id))
+    sent = []
+    for user_id, reminders in digests.items():
+        email, name = recipients[user_id]
+        subject, body = render_due_digest(name, [(kind, title, due_date) for kind, title, due_date, _ in reminders])
+        try:
+            if send_email(email, subject, body):
+                sent.extend((task_id, kind, due_date) for kind, _, due_date, task_id in reminders)
+        except Exception:
+            current_app.logger.exception('Could not send due-date digest to user %s', user_id)
+    return sent
+
+
+@celery.task
+def send_due_reminders():
+    """
+    Email "due tomorrow" and "overdue" digests for tasks that newly qualify.
+
+    Candidates come from the open-tasks due_date index, scanned over a window
+    rather than the whole table: tomorrow's due date, and for overdue tasks the
+    days since the high-water mark up to yesterday (yesterday is rescanned each
+    run to pick up due dates moved onto it). Each reminder is claimed by
+    inserting a task_reminders row before anything is sent, so with any number
+    of workers a task is reminded at most once per kind and due date. Claims
+    left unsent by a failed send are retried by later runs (_reclaim_unsent).
+
+    The high-water mark starts at the day before yesterday, so tasks that were
+    already overdue before the job's first run are not reminded; only due dates
+    from yesterday on are.
+    """
+    config = current_app.config
+    batch_size = config['REMINDER_BATCH_SIZE']
+    today = date.today()
+    yesterday = today - timedelta(days=1)
+    tomorrow = today + timedelta(days=1)
+
+    cursor = _lock_cursor(OVERDUE_CURSOR, initial=yesterday - timedelta(days=1))
+    if cursor is None:
+        db.session.rollback()
+        return {'skipped': 'locked'}
+    overdue_from = min(date.fromisoformat(cursor.position) + timedelta(days=1), yesterday)
+    claimed = []
+    for kind, low, high in (('due_tomorrow', tomorrow, tomorrow), ('overdue', overdue_from, yesterday)):
+        while True:
+            rows = _unclaimed(kind, low, high, batch_size)
+            claimed.extend(_claim(kind, rows))
+            if len(rows) < batch_size:
+                break
+    claimed.extend(_reclaim_unsent(today, batch_size))
+    cursor.position = yesterday.isoformat()
+    db.session.commit()
+
+    sent = _send_digests(claimed) if claimed else []
+    if sent:
+        claims = TaskReminder.__table__
+        for task_id, kind, due_date in sent:
+            db.session.execute(
+                claims.update()
+                .where(claims.c.task_id == task_id, claims.c.kind == kind, claims.c.due_date == due_date)
+                .values(sent_at=datetime.utcnow())
+            )
+        db.session.commit()
+    return {'claimed': len(claimed), 'sent': len(sent)}
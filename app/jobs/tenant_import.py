@@ -0,0 +1,21 @@
+import os
+from app.extensions import db
+from app.jobs import celery
+from app.models.import_job import ImportJob
+from app.services.tenant_import import run_import, import_stalled
+
+
+@celery.task
+def run_import_job(job_id):
+    """
+    Run or resume a tenant import from its last committed checkpoint. A job
+    another worker is running is left alone unless its lease has expired.
+    """
+    job = db.session.get(ImportJob, job_id)
+    if job is None or job.status == 'done' or (job.status == 'running' and not import_stalled(job)):
+        return None
+    run_import(job)
+    # The uploaded archive is only kept while the job may still be resumed
+    if os.path.exists(job.source_path):
+        os.remove(job.source_path)
+    return {'rows_loaded': job.rows_loaded, 'rows_skipped': job.rows_skipped}
@@ -0,0 +1,58 @@
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from app.extensions import db
+from app.jobs import celery
+from app.models.file_blob import FileBlob
+from app.services.blob_storage import blob_path
+from app.services.thumbnails import render_thumbnail
+
+
+def _thumbnail_size():
+    return (current_app.config['THUMBNAIL_WIDTH'], current_app.config['THUMBNAIL_HEIGHT'])
+
+
+@celery.task
+def generate_thumbnail(sha256):
+    """Render the thumbnail for a single freshly uploaded blob."""
+    blob = db.session.get(FileBlob, sha256)
+    if blob is None or blob.thumbnail_status != 'pending':
+        return None
+    blob.thumbnail_status = render_thumbnail(blob_path(sha256), blob.content_type, _thumbnail_size())
+    db.session.commit()
+    return blob.thumbnail_status
+
+
+@celery.task
+def process_thumbnail_backlog():
+    """
+    Render thumbnails for every blob still pending, e.g. uploads made while the
+    broker was unavailable or before thumbnails existed. Batches are spread
+    over a thread pool: Pillow releases the GIL while decoding, resizing and
+    encoding, and a prefork Celery worker is a daemon process, which may not
+    start a process pool of its own.
+    """
+    batch_size = current_app.config['THUMBNAIL_BATCH_SIZE']
+    size = _thumbnail_size()
+    processed = 0
+    with ThreadPoolExecutor(max_workers=current_app.config['THUMBNAIL_WORKERS']) as pool:
+        while True:
+            pending = (
+                FileBlob.query
+                .with_entities(FileBlob.sha256, FileBlob.content_type)
+                .filter(FileBlob.thumbnail_status == 'pending')
+                .limit(batch_size)
+                .all()
+            )
+            if not pending:
+                break
+            futures = {
+                sha256: pool.submit(render_thumbnail, blob_path(sha256), content_type, size)
+                for sha256, content_type in pending
+            }
+            for sha256, future in futures.items():
+                FileBlob.query.filter_by(sha256=sha256).update(
+                    {FileBlob.thumbnail_status: future.result()}, synchronize_session=False
+                )
+            db.session.commit()
+            processed += len(pending)
+    return {'processed': processed}
@@ -0,0 +1,6 @@
+# Celery entry point:
+#   celery -A app.jobs.worker.celery worker --beat
+from app import create_app
+from app.jobs import celery
+
+app = create_app()
@@ -1,3 +1,17 @@
 from app.models.customer import Customer
 from app.models.user import User
 from app.models.audit_log import AuditLog
+from app.models.project import Project
+from app.models.task import Task
+from app.models.comment import Comment
+from app.models.file_blob import FileBlob
+from app.models.file_attachment import FileAttachment
+from app.models.export_job import ExportJob
+from app.models.import_job import ImportJob
+from app.models.sync_counter import SyncCounter
+from app.models.tombstone import Tombstone
+from app.models.project_stat import ProjectStat
+from app.models.task_reminder import TaskReminder
+from app.models.job_cursor import JobCursor
+from app.models.notification import Notification
+from app.models.notification_counter import NotificationCounter
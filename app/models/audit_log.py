@@ -13,6 +13,10 @@ class AuditLog(db.Model):
     meta = db.Column(db.JSON)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_audit_logs_target', 'target_type', 'target_id', 'timestamp'),
+    )
+
     # Relationships temporarily removed for migration
     # Will be added back after migration
     # customer = db.relationship('Customer', back_populates='audit_logs')
@@ -0,0 +1,25 @@
+import uuid
+from datetime import datetime
+from app.extensions import db
+from app.models.tenant import TenantScopedMixin, tenant_partitioned
+from app.models.soft_delete import SoftDeleteMixin, LIVE_ROWS, DELETED_ROWS
+
+class Comment(TenantScopedMixin, SoftDeleteMixin, db.Model):
+    __tablename__ = 'comments'
+    id = db.Column(db.String(36), nullable=False, default=lambda: str(uuid.uuid4()))
+    task_id = db.Column(db.String(36))
+    author_user_id = db.Column(db.String(36))
+    content = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Tenant change sequence of the last write, for delta sync
+    change_seq = db.Column(db.BigInteger)
+    # Bumped by every ORM update, which only applies if the row is still at the version it was read at
+    version_id = db.Column(db.Integer, nullable=False, server_default='1')
+
+    __table_args__ = tenant_partitioned(
+        db.Index('ix_comments_customer_change_seq', 'customer_id', 'change_seq'),
+        db.Index('ix_comments_live_task', 'customer_id', 'task_id', 'created_at', postgresql_where=LIVE_ROWS, sqlite_where=LIVE_ROWS),
+        db.Index('ix_comments_deleted_at', 'deleted_at', postgresql_where=DELETED_ROWS, sqlite_where=DELETED_ROWS),
+    )
+    __mapper_args__ = {'primary_key': [id], 'version_id_col': version_id}
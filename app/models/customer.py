@@ -14,6 +14,10 @@ class Customer(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     plan_type = db.Column(db.Enum('free', 'business', 'enterprise', name='plan_type_enum'), default='free')
     status = db.Column(db.Enum('active', 'suspended', 'deleted', name='customer_status_enum'), default='active')
+    # Optimistic concurrency version, served as the ETag
+    version_id = db.Column(db.Integer, nullable=False, server_default='1')
+
+    __mapper_args__ = {'version_id_col': version_id}
 
     # Relationships temporarily removed for migration
     # Will be added back after migration
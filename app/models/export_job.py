@@ -0,0 +1,17 @@
+import uuid
+from datetime import datetime
+from app.extensions import db
+
+class ExportJob(db.Model):
+    """A tenant data export written to storage by a background job."""
+    __tablename__ = 'export_jobs'
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    customer_id = db.Column(db.String(36), nullable=False, index=True)
+    requested_by_user_id = db.Column(db.String(36))
+    format = db.Column(db.Enum('ndjson', 'csv', name='export_format_enum'), nullable=False, default='ndjson')
+    status = db.Column(db.Enum('pending', 'running', 'done', 'failed', name='export_status_enum'), nullable=False, default='pending')
+    file_path = db.Column(db.String(512))
+    row_count = db.Column(db.Integer)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    completed_at = db.Column(db.DateTime)
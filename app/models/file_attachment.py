@@ -0,0 +1,27 @@
+import uuid
+from datetime import datetime
+from app.extensions import db
+from app.models.tenant import TenantScopedMixin, tenant_partitioned
+from app.models.soft_delete import SoftDeleteMixin, LIVE_ROWS, DELETED_ROWS
+
+class FileAttachment(TenantScopedMixin, SoftDeleteMixin, db.Model):
+    __tablename__ = 'file_attachments'
+    id = db.Column(db.String(36), nullable=False, default=lambda: str(uuid.uuid4()))
+    task_id = db.Column(db.String(36))
+    project_id = db.Column(db.String(36))
+    uploaded_by_user_id = db.Column(db.String(36))
+    file_url = db.Column(db.String(512), nullable=False)
+    file_name = db.Column(db.String(256), nullable=False)
+    # Set when the attachment is backed by a stored blob rather than an external URL
+    blob_sha256 = db.Column(db.String(64), db.ForeignKey('file_blobs.sha256'), index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Tenant change sequence of the last write, for delta sync
+    change_seq = db.Column(db.BigInteger)
+
+    __table_args__ = tenant_partitioned(
+        db.Index('ix_file_attachments_customer_change_seq', 'customer_id', 'change_seq'),
+        db.Index('ix_file_attachments_live_task', 'customer_id', 'task_id', 'created_at', postgresql_where=LIVE_ROWS, sqlite_where=LIVE_ROWS),
+        db.Index('ix_file_attachments_live_project', 'customer_id', 'project_id', postgresql_where=LIVE_ROWS, sqlite_where=LIVE_ROWS),
+        db.Index('ix_file_attachments_deleted_at', 'deleted_at', postgresql_where=DELETED_ROWS, sqlite_where=DELETED_ROWS),
+    )
+    __mapper_args__ = {'primary_key': [id]}
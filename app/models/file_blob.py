@@ -0,0 +1,21 @@
+from datetime import datetime
+from app.extensions import db
+
+class FileBlob(db.Model):
+    """Content-addressed file contents shared by any number of attachments."""
+    __tablename__ = 'file_blobs'
+    sha256 = db.Column(db.String(64), primary_key=True)
+    size = db.Column(db.BigInteger, nullable=False)
+    content_type = db.Column(db.String(128))
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Last time an attachment let go of this blob; the GC waits a grace period after it
+    released_at = db.Column(db.DateTime)
+    thumbnail_status = db.Column(
+        db.Enum('pending', 'ready', 'failed', 'unsupported', name='thumbnail_status_enum'),
+        nullable=False, default='unsupported', index=True
+    )
+
+    __table_args__ = (
+        db.Index('ix_file_blobs_orphaned', 'ref_count', 'released_at'),
+    )
@@ -0,0 +1,24 @@
+import uuid
+from datetime import datetime
+from app.extensions import db
+
+class ImportJob(db.Model):
+    """
+    A tenant data import from an NDJSON archive. lines_processed is the resume
+    checkpoint: it is committed together with each loaded batch, and so is
+    heartbeat_at, the running worker's lease on the job.
+    """
+    __tablename__ = 'import_jobs'
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    customer_id = db.Column(db.String(36), nullable=False, index=True)
+    requested_by_user_id = db.Column(db.String(36))
+    status = db.Column(db.Enum('pending', 'running', 'done', 'failed', name='import_status_enum'), nullable=False, default='pending')
+    source_path = db.Column(db.String(512), nullable=False)
+    lines_processed = db.Column(db.Integer, nullable=False, default=0)
+    rows_loaded = db.Column(db.Integer, nullable=False, default=0)
+    rows_skipped = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)
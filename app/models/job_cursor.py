@@ -0,0 +1,9 @@
+from datetime import datetime
+from app.extensions import db
+
+class JobCursor(db.Model):
+    """High-water mark of an incremental job: how far it has already scanned."""
+    __tablename__ = 'job_cursors'
+    name = db.Column(db.String(64), primary_key=True)
+    position = db.Column(db.String(64), nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
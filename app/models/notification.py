@@ -0,0 +1,22 @@
+from datetime import datetime
+from app.extensions import db
+from app.models.tenant import TenantScopedMixin
+
+class Notification(TenantScopedMixin, db.Model):
+    """One entry in a user's inbox, written when something they watch changes."""
+    __tablename__ = 'notifications'
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True, autoincrement=True)
+    user_id = db.Column(db.String(36), nullable=False)
+    kind = db.Column(db.String(32), nullable=False)
+    task_id = db.Column(db.String(36))
+    project_id = db.Column(db.String(36))
+    actor_user_id = db.Column(db.String(36))
+    message = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    read_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_notifications_user_id', 'user_id', 'id'),
+        db.Index('ix_notifications_user_unread', 'user_id', 'id',
+                 postgresql_where=db.text('read_at IS NULL'), sqlite_where=db.text('read_at IS NULL')),
+    )
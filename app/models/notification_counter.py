@@ -0,0 +1,7 @@
+from app.extensions import db
+
+class NotificationCounter(db.Model):
+    """A user's unread notification count, kept in step with the inbox in the same transaction."""
+    __tablename__ = 'notification_counters'
+    user_id = db.Column(db.String(36), primary_key=True)
+    unread = db.Column(db.BigInteger, nullable=False, default=0)
@@ -0,0 +1,18 @@
+import uuid
+from datetime import datetime
+from app.extensions import db
+from app.models.tenant import TenantScopedMixin
+
+class Project(TenantScopedMixin, db.Model):
+    __tablename__ = 'projects'
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    name = db.Column(db.String(128), nullable=False)
+    description = db.Column(db.Text)
+    owner_user_id = db.Column(db.String(36))
+    status = db.Column(db.Enum('active', 'archived', name='project_status_enum'), default='active')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_projects_customer_status', 'customer_id', 'status'),
+    )
@@ -0,0 +1,14 @@
+from app.extensions import db
+from app.models.tenant import TenantScopedMixin
+
+class ProjectStat(TenantScopedMixin, db.Model):
+    """
+    One counter of a project's live tasks: how many fall in `bucket` of
+    `dimension` (see app.services.project_stats). Kept up to date in the same
+    transaction as task writes and recomputed nightly to correct drift.
+    """
+    __tablename__ = 'project_stats'
+    project_id = db.Column(db.String(36), primary_key=True)
+    dimension = db.Column(db.String(16), primary_key=True)
+    bucket = db.Column(db.String(36), primary_key=True)
+    count = db.Column(db.BigInteger, nullable=False, default=0)
@@ -0,0 +1,17 @@
+from datetime import datetime
+from app.extensions import db
+
+# Predicates for partial indexes over live (or only deleted) rows
+LIVE_ROWS = db.text('deleted_at IS NULL')
+DELETED_ROWS = db.text('deleted_at IS NOT NULL')
+
+class SoftDeleteMixin:
+    """
+    Rows are marked deleted instead of removed. Deleted rows are hidden from ORM
+    queries (see app.services.soft_delete) and hard-deleted later by the
+    compaction job.
+    """
+    deleted_at = db.Column(db.DateTime)
+
+    def soft_delete(self):
+        self.deleted_at = datetime.utcnow()
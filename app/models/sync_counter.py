@@ -0,0 +1,12 @@
+from app.extensions import db
+
+class SyncCounter(db.Model):
+    """
+    Per-tenant change sequence for delta sync. Writers bump seq inside their
+    transaction, so the row lock orders a tenant's changes in commit order.
+    """
+    __tablename__ = 'sync_counters'
+    customer_id = db.Column(db.String(36), primary_key=True)
+    seq = db.Column(db.BigInteger, nullable=False, default=0)
+    # Tombstones at or below this seq have been compacted away
+    purged_seq = db.Column(db.BigInteger, nullable=False, default=0)
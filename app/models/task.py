@@ -0,0 +1,40 @@
+import uuid
+from datetime import datetime
+from app.extensions import db
+from app.models.tenant import TenantScopedMixin, tenant_partitioned
+from app.models.soft_delete import SoftDeleteMixin, LIVE_ROWS, DELETED_ROWS
+
+# Tasks the due-date reminders look at
+OPEN_ROWS = db.text("deleted_at IS NULL AND status != 'done'")
+
+class Task(TenantScopedMixin, SoftDeleteMixin, db.Model):
+    __tablename__ = 'tasks'
+    id = db.Column(db.String(36), nullable=False, default=lambda: str(uuid.uuid4()))
+    project_id = db.Column(db.String(36))
+    parent_task_id = db.Column(db.String(36))
+    title = db.Column(db.String(256), nullable=False)
+    description = db.Column(db.Text)
+    status = db.Column(db.Enum('todo', 'in_progress', 'done', 'blocked', name='task_status_enum'), default='todo')
+    priority = db.Column(db.Enum('high', 'medium', 'low', name='task_priority_enum'), default='medium')
+    assignee_user_id = db.Column(db.String(36))
+    due_date = db.Column(db.Date)
+    start_date = db.Column(db.Date)
+    completed_at = db.Column(db.DateTime)
+    position = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Tenant change sequence of the last write, for delta sync
+    change_seq = db.Column(db.BigInteger)
+    # Bumped by every ORM update, which only applies if the row is still at the version it was read at
+    version_id = db.Column(db.Integer, nullable=False, server_default='1')
+
+    __table_args__ = tenant_partitioned(
+        db.Index('ix_tasks_customer_change_seq', 'customer_id', 'change_seq'),
+        db.Index('ix_tasks_live_project', 'customer_id', 'project_id', 'status', postgresql_where=LIVE_ROWS, sqlite_where=LIVE_ROWS),
+        db.Index('ix_tasks_live_assignee', 'customer_id', 'assignee_user_id', 'status', postgresql_where=LIVE_ROWS, sqlite_where=LIVE_ROWS),
+        db.Index('ix_tasks_live_parent', 'customer_id', 'parent_task_id', postgresql_where=LIVE_ROWS, sqlite_where=LIVE_ROWS),
+        db.Index('ix_tasks_open_due_date', 'due_date', postgresql_where=OPEN_ROWS, sqlite_where=OPEN_ROWS),
+        db.Index('ix_tasks_deleted_at', 'deleted_at', postgresql_where=DELETED_ROWS, sqlite_where=DELETED_ROWS),
+    )
+    __mapper_args__ = {'primary_key': [id], 'version_id_col': version_id}
+
@@ -0,0 +1,18 @@
+from datetime import datetime
+from app.extensions import db
+
+class TaskReminder(db.Model):
+    """
+    Claim on one reminder of a task: the worker that inserts the row is the only
+    one to send it, and a task is reminded at most once per kind and due date.
+    A claim whose sent_at is still empty wasn't sent; it is retried, and
+    claimed_at is moved to each retry's start.
+    """
+    __tablename__ = 'task_reminders'
+    task_id = db.Column(db.String(36), primary_key=True)
+    kind = db.Column(db.Enum('due_tomorrow', 'overdue', name='task_reminder_kind_enum'), primary_key=True)
+    due_date = db.Column(db.Date, primary_key=True)
+    customer_id = db.Column(db.String(36))
+    user_id = db.Column(db.String(36), nullable=False)
+    claimed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
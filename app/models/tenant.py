@@ -0,0 +1,39 @@
+from sqlalchemy import event, Table
+from app.extensions import db
+
+# Number of hash partitions of each tenant-partitioned table on PostgreSQL
+TENANT_PARTITIONS = 16
+
+
+class TenantScopedMixin:
+    """
+    A model whose rows belong to one customer. Queries made while handling a
+    request are confined to the caller's customer (see app.services.tenancy).
+    """
+    customer_id = db.Column(db.String(36))
+
+
+def tenant_partitioned(*args):
+    """
+    __table_args__ for a table hash-partitioned by customer_id on PostgreSQL.
+    PostgreSQL requires the partition key in the primary key, so it becomes
+    (id, customer_id); map the model's primary key to id alone with
+    __mapper_args__ = {'primary_key': [id]}. Other databases get the same
+    schema without partitioning.
+    """
+    return args + (
+        db.PrimaryKeyConstraint('id', 'customer_id'),
+        {'postgresql_partition_by': 'HASH (customer_id)'},
+    )
+
+
+@event.listens_for(Table, 'after_create')
+def _create_partitions(table, connection, **kw):
+    """Create the hash partitions of a partitioned table made by metadata.create_all()."""
+    if connection.dialect.name != 'postgresql' or not table.dialect_options['postgresql'].get('partition_by'):
+        return
+    for remainder in range(TENANT_PARTITIONS):
+        connection.exec_driver_sql(
+            f'CREATE TABLE {table.name}_p{remainder} PARTITION OF {table.name} '
+            f'FOR VALUES WITH (MODULUS {TENANT_PARTITIONS}, REMAINDER {remainder})'
+        )
@@ -0,0 +1,16 @@
+from datetime import datetime
+from app.extensions import db
+
+class Tombstone(db.Model):
+    """Record of a deleted task, comment or file, kept so sync clients learn about the delete."""
+    __tablename__ = 'tombstones'
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True, autoincrement=True)
+    customer_id = db.Column(db.String(36), nullable=False)
+    entity_type = db.Column(db.String(32), nullable=False)
+    entity_id = db.Column(db.String(36), nullable=False)
+    change_seq = db.Column(db.BigInteger, nullable=False)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_tombstones_customer_seq', 'customer_id', 'change_seq'),
+    )
@@ -0,0 +1,128 @@
+import base64
+import heapq
+from datetime import datetime
+from itertools import islice
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from sqlalchemy import and_, or_
+from app.extensions import db
+from app.models.audit_log import AuditLog
+from app.models.comment import Comment
+from app.models.file_attachment import FileAttachment
+from app.models.task import Task
+from app.routes.comment import comment_rows
+from app.routes.file_attachment import file_rows
+from app.schemas.serializer import RowSerializer
+
+activity_bp = Blueprint('activity_bp', __name__, url_prefix='/api/tasks')
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+audit_rows = RowSerializer([
+    ('id', AuditLog.id),
+    ('action_type', AuditLog.action_type),
+    ('actor_user_id', AuditLog.actor_user_id),
+    ('meta', AuditLog.meta),
+    ('created_at', AuditLog.timestamp),
+])
+
+# Timeline streams: type -> (serializer, id column, timestamp column, filter column).
+# Entries are ordered newest first by (timestamp, type, id), so the type breaks
+# timestamp ties between streams and the id within one.
+ACTIVITY_STREAMS = {
+    'file': (file_rows, FileAttachment.id, FileAttachment.created_at, FileAttachment.task_id),
+    'comment': (comment_rows, Comment.id, Comment.created_at, Comment.task_id),
+    'audit': (audit_rows, AuditLog.id, AuditLog.timestamp, AuditLog.target_id),
+}
+
+
+def encode_cursor(created_at, entry_type, entry_id):
+    raw = f'{created_at.isoformat()}|{entry_type}|{entry_id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError for anything it didn't produce."""
+    created_at, entry_type, entry_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|', 2)
+    return datetime.fromisoformat(created_at), entry_type, entry_id
+
+
+def _stream(entry_type, task, after, limit):
+    """
+    One stream's entries older than the cursor, newest first, as (sort key, entry).
+    Reads at most limit rows through the stream's (task, created_at) index.
+    """
+    serializer, id_column, created_column, task_column = ACTIVITY_STREAMS[entry_type]
+    # customer_id is needed for superadmins, whose queries aren't tenant-scoped. It leads the comment
+    # and file indexes; audit rows are found through ix_audit_logs_target (target_type, target_id,
+    # timestamp) and customer_id is checked on the rows it yields
+    statement = serializer.statement().where(id_column.class_.customer_id == task.customer_id, task_column == task.id)
+    if entry_type == 'audit':
+        statement = statement.where(AuditLog.target_type == 'task')
+    if after is not None:
+        created_at, after_type, after_id = after
+        if entry_type < after_type:
+            statement = statement.where(created_column <= created_at)
+        elif entry_type > after_type:
+            statement = statement.where(created_column < created_at)
+        else:
+            statement = statement.where(or_(
+                created_column < created_at, and_(created_column == created_at, id_column < after_id)
+            ))
+    statement = statement.order_by(created_column.desc(), id_column.desc()).limit(limit)
+    for row in db.session.execute(statement):
+        entry = serializer.dump_row(row)
+        created_at = row[serializer.names.index('created_at')]
+        yield (created_at, entry_type, entry['id']), {'type': entry_type, 'created_at': entry['created_at'],
+                                                     'id': entry['id'], 'data': entry}
+
+
+@activity_bp.route('/<task_id>/activity', methods=['GET'])
+@jwt_required()
+def get_task_activity(task_id):
+    """
+    A task's comments, files and audit log entries as one timeline, newest
+    first. Pass the returned next_cursor to get the next page.
+    ---
+    tags:
+      - Tasks
+    security:
+      - Bearer: []
+    parameters:
+      - in: path
+        name: task_id
+        required: true
+        type: string
+      - in: query
+        name: cursor
+        type: string
+        required: false
+      - in: query
+        name: limit
+        type: integer
+        required: false
+        default: 50
+    responses:
+      200:
+        description: A page of the task's activity
+      400:
+        description: Invalid cursor or limit
+      404:
+        description: Task not found
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+        after = decode_cursor(request.args['cursor']) if request.args.get('cursor') else None
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor or limit'}), 400
+    task = Task.query.get_or_404(task_id)
+    # Each stream is already sorted, so a k-way merge of limit + 1 rows from each finds the page
+    streams = [_stream(entry_type, task, after, limit + 1) for entry_type in ACTIVITY_STREAMS]
+    page = list(islice(heapq.merge(*streams, key=lambda item: item[0], reverse=True), limit + 1))
+    has_more = len(page) > limit
+    page = page[:limit]
+    return jsonify({
+        'activity': [entry for _, entry in page],
+        'next_cursor': encode_cursor(*page[-1][0]) if has_more else None,
+    })
@@ -0,0 +1,62 @@
+from datetime import date, timedelta
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from app.services.analytics import project_analytics
+
+analytics_bp = Blueprint('analytics_bp', __name__, url_prefix='/api/analytics')
+
+DEFAULT_WINDOW_DAYS = 30
+MAX_WINDOW_DAYS = 366
+
+@analytics_bp.route('/projects/<project_id>', methods=['GET'])
+@jwt_required()
+def get_project_analytics(project_id):
+    """
+    Burndown, cumulative flow, throughput and cycle-time percentiles of a
+    project's tasks, one value per day of the window (default: the last 30 days)
+    ---
+    tags:
+      - Analytics
+    security:
+      - Bearer: []
+    parameters:
+      - in: path
+        name: project_id
+        required: true
+        type: string
+      - in: query
+        name: from
+        type: string
+        format: date
+        required: false
+      - in: query
+        name: to
+        type: string
+        format: date
+        required: false
+        description: Defaults to today
+      - in: query
+        name: assignee_user_id
+        type: string
+        required: false
+        description: Only count tasks assigned to this user
+    responses:
+      200:
+        description: Daily series (aligned with "dates") and cycle/lead time in days
+      400:
+        description: Invalid window
+      404:
+        description: Project not found
+    """
+    try:
+        end = date.fromisoformat(request.args['to']) if request.args.get('to') else date.today()
+        start = (date.fromisoformat(request.args['from']) if request.args.get('from')
+                 else end - timedelta(days=DEFAULT_WINDOW_DAYS - 1))
+    except ValueError:
+        return jsonify({'error': 'from and to must be dates (YYYY-MM-DD)'}), 400
+    if start > end or (end - start).days >= MAX_WINDOW_DAYS:
+        return jsonify({'error': f'from must be on or before to, at most {MAX_WINDOW_DAYS} days apart'}), 400
+    analytics = project_analytics(project_id, start, end, request.args.get('assignee_user_id'))
+    if analytics is None:
+        return jsonify({'error': 'Project not found'}), 404
+    return jsonify(analytics)
@@ -1,10 +1,29 @@
 from flask import Blueprint, request, jsonify
+from sqlalchemy import or_
 from flask_jwt_extended import jwt_required, get_jwt
+from app.extensions import db
 from app.models.project import Project
 from app.models.task import Task
+from app.schemas.serializer import RowSerializer
+from app.schemas.includes import user_include
 
 calendar_bp = Blueprint('calendar_bp', __name__, url_prefix='/api/calendar')
 
+event_rows = RowSerializer([
+    ('id', Task.id),
+    ('title', Task.title),
+    ('start', Task.start_date),
+    ('end', Task.due_date),
+    ('status', Task.status),
+    ('assignee_user_id', Task.assignee_user_id),
+], includes={'assignee': user_include(Task.assignee_user_id)})
+
+def calendar_statement(project_id, events=event_rows):
+    return events.statement().where(
+        Task.project_id == project_id,
+        or_(Task.start_date.isnot(None), Task.due_date.isnot(None))
+    )
+
 @calendar_bp.route('/<project_id>', methods=['GET'])
 @jwt_required()
 def get_project_calendar(project_id):
@@ -20,20 +39,24 @@ def get_project_calendar(project_id):
         name: project_id
         required: true
         type: string
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: Comma-separated fields to return (id is always returned)
+      - in: query
+        name: include
+        type: string
+        required: false
+        description: Comma-separated related rows to embed (assignee)
     responses:
       200:
         description: List of tasks with dates for calendar view
+      400:
+        description: Unknown field or include
     """
-    tasks = Task.query.filter_by(project_id=project_id).all()
-    events = []
-    for t in tasks:
-        if t.start_date or t.due_date:
-            events.append({
-                'id': t.id,
-                'title': t.title,
-                'start': t.start_date.isoformat() if t.start_date else None,
-                'end': t.due_date.isoformat() if t.due_date else None,
-                'status': t.status,
-                'assignee_user_id': t.assignee_user_id
-            })
-    return jsonify(events)
+    try:
+        events = event_rows.for_request(request.args)
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    return jsonify(events.dump_rows(db.session.execute(calendar_statement(project_id, events))))
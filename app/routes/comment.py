@@ -1,15 +1,45 @@
 import uuid
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt
+from sqlalchemy.orm.exc import StaleDataError
 from app.extensions import db
 from app.models.comment import Comment
 from app.models.task import Task
 from app.models.user import User
+from app.schemas.serializer import RowSerializer
+from app.schemas.includes import user_include
+from app.services.events import publish_event
+from app.services.notifications import notify_task_watchers
+from app.services.idempotency import idempotent
+from app.services.concurrency import precondition_failed, stale_write, with_etag, apply_patch
 
 comment_bp = Blueprint('comment_bp', __name__, url_prefix='/api/comments')
 
+comment_rows = RowSerializer([
+    ('id', Comment.id),
+    ('content', Comment.content),
+    ('author_user_id', Comment.author_user_id),
+    ('created_at', Comment.created_at),
+], includes={'author': user_include(Comment.author_user_id)})
+
+def comments_statement(task_id, comments=comment_rows):
+    return comments.statement().where(Comment.task_id == task_id)
+
+def _task_project_id(task_id):
+    return db.session.query(Task.project_id).filter_by(id=task_id).scalar()
+
+def _comment_event(comment):
+    return {
+        'id': comment.id,
+        'task_id': comment.task_id,
+        'content': comment.content,
+        'author_user_id': comment.author_user_id,
+        'created_at': comment.created_at.isoformat() if comment.created_at else None
+    }
+
 @comment_bp.route('', methods=['POST'])
 @jwt_required()
+@idempotent
 def create_comment():
     """
     Create a new comment on a task
@@ -30,11 +60,17 @@ def create_comment():
     responses:
       201:
         description: Comment created
+      404:
+        description: Task not found
     """
     claims = get_jwt()
-    customer_id = claims.get('customer_id')
     user_id = claims['sub']
     data = request.json
+    # Comments go in the task's customer. The lookup is tenant-scoped, so a task of
+    # another customer is not found (superadmins comment in any customer)
+    customer_id = db.session.query(Task.customer_id).filter_by(id=data['task_id']).scalar()
+    if not customer_id:
+        return jsonify({'error': 'Task not found'}), 404
     comment = Comment(
         id=str(uuid.uuid4()),
         customer_id=customer_id,
@@ -43,7 +79,9 @@ def create_comment():
         content=data['content']
     )
     db.session.add(comment)
+    notify_task_watchers(comment.task_id, 'comment.created', customer_id, actor_user_id=user_id, message=comment.content[:200])
     db.session.commit()
+    publish_event(_task_project_id(comment.task_id), 'comment.created', _comment_event(comment))
     return jsonify({'id': comment.id, 'content': comment.content}), 201
 
 @comment_bp.route('', methods=['GET'])
@@ -61,15 +99,28 @@ def list_comments():
         name: task_id
         type: string
         required: true
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: Comma-separated fields to return (id is always returned)
+      - in: query
+        name: include
+        type: string
+        required: false
+        description: Comma-separated related rows to embed (author)
     responses:
       200:
         description: List of comments
+      400:
+        description: Unknown field or include
     """
     task_id = request.args.get('task_id')
-    comments = Comment.query.filter_by(task_id=task_id).all()
-    return jsonify([
-        {'id': c.id, 'content': c.content, 'author_user_id': c.author_user_id, 'created_at': c.created_at.isoformat()} for c in comments
-    ])
+    try:
+        comments = comment_rows.for_request(request.args)
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    return jsonify(comments.dump_rows(db.session.execute(comments_statement(task_id, comments))))
 
 @comment_bp.route('/<comment_id>', methods=['GET'])
 @jwt_required()
@@ -91,13 +142,13 @@ def get_comment(comment_id):
         description: Comment details
     """
     comment = Comment.query.get_or_404(comment_id)
-    return jsonify({'id': comment.id, 'content': comment.content, 'author_user_id': comment.author_user_id, 'created_at': comment.created_at.isoformat()})
+    return with_etag(jsonify({'id': comment.id, 'content': comment.content, 'author_user_id': comment.author_user_id, 'created_at': comment.created_at.isoformat()}), comment)
 
 @comment_bp.route('/<comment_id>', methods=['PATCH'])
 @jwt_required()
 def update_comment(comment_id):
     """
-    Update a comment
+    Update a comment, if If-Match (when sent) still matches its ETag
     ---
     tags:
       - Comments
@@ -108,6 +159,10 @@ def update_comment(comment_id):
         name: comment_id
         required: true
         type: string
+      - in: header
+        name: If-Match
+        type: string
+        required: false
       - in: body
         name: body
         required: true
@@ -117,13 +172,24 @@ def update_comment(comment_id):
             content: {type: string}
     responses:
       200:
-        description: Comment updated
+        description: Comment updated; ETag is the new version
+      409:
+        description: Changed by a concurrent request
+      412:
+        description: If-Match doesn't match the current version
     """
     comment = Comment.query.get_or_404(comment_id)
-    data = request.json
-    comment.content = data.get('content', comment.content)
-    db.session.commit()
-    return jsonify({'id': comment.id, 'content': comment.content})
+    refused = precondition_failed(comment)
+    if refused is not None:
+        return refused
+    apply_patch(comment, request.get_json() or {}, {'content': None})
+    try:
+        db.session.commit()
+    except StaleDataError:
+        db.session.rollback()
+        return stale_write()
+    publish_event(_task_project_id(comment.task_id), 'comment.updated', _comment_event(comment))
+    return with_etag(jsonify({'id': comment.id, 'content': comment.content}), comment)
 
 @comment_bp.route('/<comment_id>', methods=['DELETE'])
 @jwt_required()
@@ -145,6 +211,8 @@ def delete_comment(comment_id):
         description: Comment deleted
     """
     comment = Comment.query.get_or_404(comment_id)
-    db.session.delete(comment)
+    task_id = comment.task_id
+    comment.soft_delete()
     db.session.commit()
+    publish_event(_task_project_id(task_id), 'comment.deleted', {'id': comment_id, 'task_id': task_id})
     return jsonify({'msg': 'Comment deleted'})
@@ -3,11 +3,34 @@ from app.extensions import db
 from app.models.customer import Customer
 from app.models.user import User
 import uuid
-from datetime import datetime
+from datetime import datetime, date, timedelta
+from sqlalchemy import select, func, case, and_
 from flask_jwt_extended import get_jwt
+from sqlalchemy.orm.exc import StaleDataError
+from app.models.task import Task
+from app.services.cache import cached_get
+from app.services.idempotency import idempotent
+from app.services.concurrency import precondition_failed, stale_write, with_etag, apply_patch
+from app.schemas.serializer import RowSerializer
+from app.schemas.includes import user_include
 
 customer_bp = Blueprint('customer', __name__, url_prefix='/api/customers')
 
+customer_rows = RowSerializer([
+    ('id', Customer.id),
+    ('name', Customer.name),
+    ('plan_type', Customer.plan_type),
+    ('status', Customer.status),
+    ('subdomain_url', Customer.subdomain_url),
+], includes={'admin': user_include(Customer.admin_user_id)})
+customer_user_rows = RowSerializer([
+    ('id', User.id),
+    ('name', User.name),
+    ('email', User.email),
+    ('role', User.role),
+    ('status', User.status),
+])
+
 @customer_bp.route('', methods=['GET'])
 def get_customers():
     """
@@ -17,6 +40,17 @@ def get_customers():
       - Customers
     security:
       - Bearer: []
+    parameters:
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: Comma-separated fields to return (id is always returned)
+      - in: query
+        name: include
+        type: string
+        required: false
+        description: Comma-separated related rows to embed (admin)
     responses:
       200:
         description: List of customers
@@ -30,25 +64,23 @@ def get_customers():
               plan_type: {type: string}
               status: {type: string}
               subdomain_url: {type: string}
+      400:
+        description: Unknown field or include
     """
     claims = get_jwt()
     role = claims.get('role')
     customer_id = claims.get('customer_id')
 
     if role in ("superadmin", "superadmin_readonly"):
-        customers = Customer.query.all()
+        customers = Customer.query
     else:
-        customers = Customer.query.filter_by(id=customer_id).all()
+        customers = Customer.query.filter_by(id=customer_id)
 
-    return jsonify([
-        {
-            'id': c.id,
-            'name': c.name,
-            'plan_type': c.plan_type,
-            'status': c.status,
-            'subdomain_url': c.subdomain_url
-        } for c in customers
-    ])
+    try:
+        rows = customer_rows.for_request(request.args)
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    return jsonify(rows.dump_rows(rows.select(customers)))
 
 @customer_bp.route('/<customer_id>/users', methods=['GET'])
 def get_customer_users(customer_id):
@@ -79,21 +111,15 @@ def get_customer_users(customer_id):
               role: {type: string}
               status: {type: string}
     """
-    users = User.query.filter_by(customer_id=customer_id).all()
-    return jsonify([
-        {
-            'id': u.id,
-            'name': u.name,
-            'email': u.email,
-            'role': u.role,
-            'status': u.status
-        } for u in users
-    ])
+    users = customer_user_rows.select(User.query.filter_by(customer_id=customer_id))
+    return jsonify(customer_user_rows.dump_rows(users))
 
 @customer_bp.route('/<customer_id>', methods=['GET'])
 def get_customer(customer_id):
     """
-    Fetch customer details including admin user
+    Fetch customer details including admin user. The body embeds the admin,
+    whose edits don't bump the customer's version, so the ETag is the weak one
+    hashed from the body; send version_id as If-Match (quoted) to update.
     ---
     tags:
       - Customers
@@ -116,6 +142,7 @@ def get_customer(customer_id):
             plan_type: {type: string}
             status: {type: string}
             subdomain_url: {type: string}
+            version_id: {type: integer}
             admin:
               type: object
               properties:
@@ -125,16 +152,18 @@ def get_customer(customer_id):
       404:
         description: Customer not found
     """
+    # Not cached_get: version_id is what update_customer checks If-Match against
     customer = Customer.query.get(customer_id)
     if not customer:
         return jsonify({'error': 'Customer not found'}), 404
-    admin = User.query.get(customer.admin_user_id) if customer.admin_user_id else None
+    admin = cached_get(User, customer.admin_user_id)
     return jsonify({
         'id': customer.id,
         'name': customer.name,
         'plan_type': customer.plan_type,
         'status': customer.status,
         'subdomain_url': customer.subdomain_url,
+        'version_id': customer.version_id,
         'admin': {
             'id': admin.id,
             'name': admin.name,
@@ -142,10 +171,98 @@ def get_customer(customer_id):
         } if admin else None
     })
 
+def workload_statement(customer_id, today, week_end, due_from=None, due_to=None):
+    """Open tasks of a customer per assignee, in one GROUP BY joined once to users for names."""
+    def count_if(*conditions):
+        return func.sum(case((and_(*conditions), 1), else_=0))
+    statement = (
+        select(
+            Task.assignee_user_id,
+            User.name,
+            func.count(),
+            count_if(Task.status == 'todo'),
+            count_if(Task.status == 'in_progress'),
+            count_if(Task.status == 'blocked'),
+            count_if(Task.due_date < today),
+            count_if(Task.due_date >= today, Task.due_date <= week_end),
+        )
+        .outerjoin(User, User.id == Task.assignee_user_id)
+        .where(Task.customer_id == customer_id, Task.status != 'done')
+        .group_by(Task.assignee_user_id, User.name)
+    )
+    if due_from:
+        statement = statement.where(Task.due_date >= due_from)
+    if due_to:
+        statement = statement.where(Task.due_date <= due_to)
+    return statement
+
+@customer_bp.route('/<customer_id>/workload', methods=['GET'])
+def get_customer_workload(customer_id):
+    """
+    Open task load per assignee across the customer's projects: open tasks by
+    status, overdue, and due this week (today through Sunday). Unassigned tasks
+    are reported with a null assignee_user_id.
+    ---
+    tags:
+      - Customers
+    security:
+      - Bearer: []
+    parameters:
+      - in: path
+        name: customer_id
+        required: true
+        type: string
+      - in: query
+        name: due_from
+        type: string
+        format: date
+        required: false
+        description: Only count tasks due on or after this date
+      - in: query
+        name: due_to
+        type: string
+        format: date
+        required: false
+        description: Only count tasks due on or before this date
+    responses:
+      200:
+        description: Workload per assignee, busiest first
+      400:
+        description: Invalid date
+      403:
+        description: Cross-customer access forbidden
+    """
+    claims = get_jwt()
+    if claims.get('role') not in ('superadmin', 'superadmin_readonly') and claims.get('customer_id') != customer_id:
+        return jsonify({'error': 'Cross-customer access forbidden'}), 403
+    try:
+        due_from = date.fromisoformat(request.args['due_from']) if request.args.get('due_from') else None
+        due_to = date.fromisoformat(request.args['due_to']) if request.args.get('due_to') else None
+    except ValueError:
+        return jsonify({'error': 'due_from and due_to must be dates (YYYY-MM-DD)'}), 400
+    today = date.today()
+    week_end = today + timedelta(days=6 - today.weekday())
+    rows = db.session.execute(workload_statement(customer_id, today, week_end, due_from, due_to))
+    workload = [
+        {
+            'assignee_user_id': assignee_user_id,
+            'name': name,
+            'open': open_count,
+            'todo': todo or 0,
+            'in_progress': in_progress or 0,
+            'blocked': blocked or 0,
+            'overdue': overdue or 0,
+            'due_this_week': due_this_week or 0,
+        }
+        for assignee_user_id, name, open_count, todo, in_progress, blocked, overdue, due_this_week in rows
+    ]
+    workload.sort(key=lambda entry: entry['open'], reverse=True)
+    return jsonify(workload)
+
 @customer_bp.route('/<customer_id>', methods=['PATCH'])
 def update_customer(customer_id):
     """
-    Update customer settings
+    Update customer settings, if If-Match (when sent) still matches the ETag
     ---
     tags:
       - Customers
@@ -157,6 +274,10 @@ def update_customer(customer_id):
         required: true
         type: string
         example: 7b2f5e5e-6c0a-4f9b-8c7e-123456789abc
+      - in: header
+        name: If-Match
+        type: string
+        required: false
       - in: body
         name: body
         required: true
@@ -167,21 +288,28 @@ def update_customer(customer_id):
             plan_type: {type: string, enum: [free, business, enterprise], example: "business"}
     responses:
       200:
-        description: Customer updated
+        description: Customer updated; ETag is the new version
       404:
         description: Customer not found
+      409:
+        description: Changed by a concurrent request
+      412:
+        description: If-Match doesn't match the current version
     """
     customer = Customer.query.get(customer_id)
     if not customer:
         return jsonify({'error': 'Customer not found'}), 404
-    data = request.get_json()
-    if 'name' in data:
-        customer.name = data['name']
-    if 'plan_type' in data:
-        customer.plan_type = data['plan_type']
-    customer.updated_at = datetime.utcnow()
-    db.session.commit()
-    return jsonify({'message': 'Customer updated'})
+    refused = precondition_failed(customer)
+    if refused is not None:
+        return refused
+    # updated_at (onupdate) and the version only change when a field does
+    apply_patch(customer, request.get_json() or {}, {'name': None, 'plan_type': None})
+    try:
+        db.session.commit()
+    except StaleDataError:
+        db.session.rollback()
+        return stale_write()
+    return with_etag(jsonify({'message': 'Customer updated'}), customer)
 
 @customer_bp.route('/<customer_id>', methods=['DELETE'])
 def delete_customer(customer_id):
@@ -213,6 +341,7 @@ def delete_customer(customer_id):
     return jsonify({'message': 'Customer suspended'})
 
 @customer_bp.route('', methods=['POST'])
+@idempotent
 def create_customer():
     """
     Create a new customer and first admin user
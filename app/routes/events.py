@@ -0,0 +1,85 @@
+import json
+import queue
+from flask import Blueprint, request, jsonify, Response, current_app
+from flask_jwt_extended import jwt_required, get_jwt
+from app.models.project import Project
+from app.services.events import event_bus
+
+events_bp = Blueprint('events_bp', __name__, url_prefix='/api/projects')
+
+def _format_event(event):
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+
+def _stream(project_id, last_event_id, heartbeat):
+    # Subscribe before replaying so nothing published in between is lost
+    subscription = event_bus.subscribe(project_id)
+    try:
+        if last_event_id is not None:
+            missed, complete = event_bus.replay(project_id, last_event_id)
+            if not complete:
+                yield 'event: resync\ndata: {}\n\n'
+            for event in missed:
+                last_event_id = event['id']
+                yield _format_event(event)
+        while True:
+            if subscription.overflowed:
+                yield 'event: resync\ndata: {}\n\n'
+                return
+            try:
+                event = subscription.queue.get(timeout=heartbeat)
+            except queue.Empty:
+                yield ': keepalive\n\n'
+                continue
+            # Events published while the replay was being sent are already delivered
+            if last_event_id is not None and event['id'] <= last_event_id:
+                continue
+            yield _format_event(event)
+    finally:
+        event_bus.unsubscribe(subscription)
+
+@events_bp.route('/<project_id>/events', methods=['GET'])
+@jwt_required()
+def stream_project_events(project_id):
+    """
+    Server-Sent Events stream of task, comment and file changes on a project.
+    Event types are task.created, task.updated, task.deleted, comment.created,
+    comment.updated, comment.deleted, file.created, file.updated and file.deleted.
+    Reconnect with the Last-Event-ID header to receive missed events; a "resync"
+    event means some were lost (or the client fell too far behind) and the
+    board should be reloaded.
+    ---
+    tags:
+      - Projects
+    security:
+      - Bearer: []
+    produces:
+      - text/event-stream
+    parameters:
+      - in: path
+        name: project_id
+        required: true
+        type: string
+      - in: header
+        name: Last-Event-ID
+        type: integer
+        required: false
+    responses:
+      200:
+        description: Event stream
+      404:
+        description: Project not found
+    """
+    claims = get_jwt()
+    project = Project.query.get(project_id)
+    if not project or (claims.get('role') not in ('superadmin', 'superadmin_readonly') and project.customer_id != claims.get('customer_id')):
+        return jsonify({'error': 'Project not found'}), 404
+    last_event_id = request.headers.get('Last-Event-ID', request.args.get('last_event_id'))
+    try:
+        last_event_id = int(last_event_id) if last_event_id is not None else None
+    except ValueError:
+        last_event_id = None
+    return Response(
+        _stream(project_id, last_event_id, current_app.config['EVENTS_HEARTBEAT_SECONDS']),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
@@ -0,0 +1,159 @@
+from flask import Blueprint, request, jsonify, Response, stream_with_context, send_file, current_app, url_for
+from flask_jwt_extended import jwt_required, get_jwt
+from app.extensions import db
+from app.models.export_job import ExportJob
+from app.services.export import EXPORT_FORMATS
+from app.jobs.export import run_export
+
+export_bp = Blueprint('export_bp', __name__, url_prefix='/api/customers')
+
+def _can_export(claims, customer_id):
+    role = claims.get('role')
+    if role in ('superadmin', 'superadmin_readonly'):
+        return True
+    return role == 'admin' and claims.get('customer_id') == customer_id
+
+def _job_json(job):
+    return {
+        'id': job.id,
+        'status': job.status,
+        'format': job.format,
+        'row_count': job.row_count,
+        'error': job.error,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'completed_at': job.completed_at.isoformat() if job.completed_at else None,
+        'download_url': url_for('export_bp.download_export', customer_id=job.customer_id, job_id=job.id) if job.status == 'done' else None
+    }
+
+@export_bp.route('/<customer_id>/export', methods=['GET'])
+@jwt_required()
+def export_customer_data(customer_id):
+    """
+    Export all projects, tasks, comments and files of a customer (admin only).
+    Streams newline-delimited JSON records ({"type": ..., "data": {...}}), or a zip
+    of CSV files with format=csv. With mode=async the export is written to storage
+    by a background job instead; poll the returned job for its download URL.
+    ---
+    tags:
+      - Customers
+    security:
+      - Bearer: []
+    parameters:
+      - in: path
+        name: customer_id
+        required: true
+        type: string
+      - in: query
+        name: format
+        type: string
+        enum: [ndjson, csv]
+        required: false
+      - in: query
+        name: mode
+        type: string
+        enum: [stream, async]
+        required: false
+    responses:
+      200:
+        description: Streamed export
+      202:
+        description: Export job queued
+      400:
+        description: Unknown format
+      403:
+        description: Forbidden
+      503:
+        description: Export queue unavailable
+    """
+    claims = get_jwt()
+    if not _can_export(claims, customer_id):
+        return jsonify({'error': 'Forbidden'}), 403
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f'Unknown export format "{export_format}"'}), 400
+
+    if request.args.get('mode') == 'async':
+        job = ExportJob(customer_id=customer_id, requested_by_user_id=claims['sub'], format=export_format)
+        db.session.add(job)
+        db.session.commit()
+        try:
+            run_export.delay(job.id)
+        except Exception:
+            current_app.logger.warning('Could not queue export %s', job.id)
+            job.status = 'failed'
+            job.error = 'Export queue unavailable'
+            db.session.commit()
+            return jsonify({'error': 'Export queue unavailable'}), 503
+        return jsonify(_job_json(job)), 202
+
+    generate, mimetype, extension = EXPORT_FORMATS[export_format]
+    return Response(
+        stream_with_context(generate(customer_id)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=export-{customer_id}.{extension}'}
+    )
+
+@export_bp.route('/<customer_id>/exports/<job_id>', methods=['GET'])
+@jwt_required()
+def get_export(customer_id, job_id):
+    """
+    Get the status of a background export
+    ---
+    tags:
+      - Customers
+    security:
+      - Bearer: []
+    parameters:
+      - in: path
+        name: customer_id
+        required: true
+        type: string
+      - in: path
+        name: job_id
+        required: true
+        type: string
+    responses:
+      200:
+        description: Export job status
+      404:
+        description: Export not found
+    """
+    if not _can_export(get_jwt(), customer_id):
+        return jsonify({'error': 'Forbidden'}), 403
+    job = ExportJob.query.filter_by(id=job_id, customer_id=customer_id).first()
+    if not job:
+        return jsonify({'error': 'Export not found'}), 404
+    return jsonify(_job_json(job))
+
+@export_bp.route('/<customer_id>/exports/<job_id>/download', methods=['GET'])
+@jwt_required()
+def download_export(customer_id, job_id):
+    """
+    Download a finished background export
+    ---
+    tags:
+      - Customers
+    security:
+      - Bearer: []
+    parameters:
+      - in: path
+        name: customer_id
+        required: true
+        type: string
+      - in: path
+        name: job_id
+        required: true
+        type: string
+    responses:
+      200:
+        description: Export file
+      404:
+        description: Export not found or not finished
+    """
+    if not _can_export(get_jwt(), customer_id):
+        return jsonify({'error': 'Forbidden'}), 403
+    job = ExportJob.query.filter_by(id=job_id, customer_id=customer_id).first()
+    if not job or job.status != 'done':
+        return jsonify({'error': 'Export not found'}), 404
+    _, mimetype, extension = EXPORT_FORMATS[job.format]
+    return send_file(job.file_path, mimetype=mimetype, as_attachment=True, download_name=f'export-{customer_id}.{extension}')
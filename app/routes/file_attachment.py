@@ -1,55 +1,178 @@
 import uuid
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, url_for, send_file, current_app
 from flask_jwt_extended import jwt_required, get_jwt
 from app.extensions import db
 from app.models.file_attachment import FileAttachment
+from app.models.file_blob import FileBlob
+from app.services.blob_storage import store_stream, acquire_blob, place_blob, reference_blob, blob_path
+from app.services.thumbnails import is_previewable, thumbnail_path, THUMBNAIL_MIMETYPE
+from app.jobs.thumbnails import generate_thumbnail
+from app.schemas.serializer import RowSerializer
+from app.schemas.includes import user_include
+from app.services.events import publish_event
+from app.services.idempotency import idempotent
 from app.models.task import Task
 from app.models.project import Project
 from app.models.user import User
 
 file_bp = Blueprint('file_bp', __name__, url_prefix='/api/files')
 
+file_rows = RowSerializer([
+    ('id', FileAttachment.id),
+    ('file_url', FileAttachment.file_url),
+    ('file_name', FileAttachment.file_name),
+    ('uploaded_by_user_id', FileAttachment.uploaded_by_user_id),
+    ('created_at', FileAttachment.created_at),
+], includes={'uploaded_by': user_include(FileAttachment.uploaded_by_user_id)}, computed=('thumbnail_url',))
+
+def _owner_customer_id(task_id, project_id):
+    """
+    Customer of the task and/or project a file is attached to. None when neither
+    is given, when one isn't visible to the caller (the lookups are tenant-scoped)
+    or when they belong to different customers.
+    """
+    owners = set()
+    if task_id:
+        owners.add(db.session.query(Task.customer_id).filter_by(id=task_id).scalar())
+    if project_id:
+        owners.add(db.session.query(Project.customer_id).filter_by(id=project_id).scalar())
+    return owners.pop() if len(owners) == 1 else None
+
+def _file_project_id(file):
+    if file.project_id or not file.task_id:
+        return file.project_id
+    return db.session.query(Task.project_id).filter_by(id=file.task_id).scalar()
+
+def _file_event(file):
+    return {
+        'id': file.id,
+        'task_id': file.task_id,
+        'project_id': file.project_id,
+        'file_name': file.file_name,
+        'file_url': file.file_url,
+        'uploaded_by_user_id': file.uploaded_by_user_id
+    }
+
+def _thumbnail_url(file_id, thumbnail_status):
+    return url_for('file_bp.download_thumbnail', file_id=file_id) if thumbnail_status == 'ready' else None
+
+def files_statement(task_id=None, project_id=None, files=file_rows):
+    statement = files.statement(FileBlob.thumbnail_status).select_from(FileAttachment).outerjoin(
+        FileBlob, FileAttachment.blob_sha256 == FileBlob.sha256
+    )
+    if task_id:
+        statement = statement.where(FileAttachment.task_id == task_id)
+    if project_id:
+        statement = statement.where(FileAttachment.project_id == project_id)
+    return statement
+
+def dump_files(rows, thumbnail_url=_thumbnail_url, serializer=file_rows, expand=True):
+    """Serialize (thumbnail_status, *file) rows, adding each file's thumbnail_url (and includes unless expand is False)."""
+    with_thumbnail = serializer.wants('thumbnail_url')
+    files = []
+    for thumbnail_status, *row in rows:
+        file = serializer.dump_row(row)
+        if with_thumbnail:
+            file['thumbnail_url'] = thumbnail_url(file['id'], thumbnail_status)
+        files.append(file)
+    return serializer.expand(files) if expand else files
+
+def _queue_thumbnail(sha256):
+    try:
+        generate_thumbnail.delay(sha256)
+    except Exception:
+        # The blob stays pending and is picked up by the backlog job
+        current_app.logger.warning('Could not queue thumbnail for blob %s', sha256)
+
 @file_bp.route('', methods=['POST'])
 @jwt_required()
+@idempotent
 def upload_file():
     """
-    Upload a file and attach to a task or project
+    Upload a file and attach to a task or project.
+    Send the file as multipart/form-data to store it by content hash, or send JSON with
+    the sha256 of a blob already attached elsewhere in your account to attach it without
+    re-uploading. JSON with a file_url attaches an external link.
     ---
     tags:
       - Files
     security:
       - Bearer: []
+    consumes:
+      - application/json
+      - multipart/form-data
     parameters:
       - in: body
         name: body
-        required: true
+        required: false
         schema:
           type: object
           properties:
             file_url: {type: string}
+            sha256: {type: string}
             file_name: {type: string}
             task_id: {type: string}
             project_id: {type: string}
+      - in: formData
+        name: file
+        type: file
+        required: false
     responses:
       201:
         description: File uploaded
+      400:
+        description: Missing file
+      404:
+        description: Blob not found (upload the file content instead), or task/project not found
     """
     claims = get_jwt()
-    customer_id = claims.get('customer_id')
     user_id = claims['sub']
-    data = request.json
+    file_id = str(uuid.uuid4())
+    upload = request.files.get('file')
+    data = request.form if upload is not None else request.json
+    # Files go in the customer of the task or project they are attached to
+    customer_id = _owner_customer_id(data.get('task_id'), data.get('project_id'))
+    if not customer_id:
+        return jsonify({'error': 'Task or project not found'}), 404
+    if upload is not None:
+        sha256, size, tmp_path = store_stream(upload.stream)
+        created = acquire_blob(sha256, size, upload.mimetype)
+        place_blob(sha256, tmp_path)
+        queue_thumbnail = created and is_previewable(upload.mimetype)
+        file_url = url_for('file_bp.download_file', file_id=file_id)
+        file_name = data.get('file_name') or upload.filename
+    else:
+        sha256 = data.get('sha256')
+        if sha256:
+            # Only blobs this customer already holds can be attached by hash, so the
+            # dedup index can't be used to probe other tenants' files
+            if not FileAttachment.query.filter_by(customer_id=customer_id, blob_sha256=sha256).first() \
+                    or not reference_blob(sha256):
+                db.session.rollback()
+                return jsonify({'error': 'Blob not found', 'upload_required': True}), 404
+            file_url = url_for('file_bp.download_file', file_id=file_id)
+        elif data.get('file_url'):
+            file_url = data['file_url']
+        else:
+            return jsonify({'error': 'file, sha256 or file_url is required'}), 400
+        file_name = data['file_name']
+        queue_thumbnail = False
     file = FileAttachment(
-        id=str(uuid.uuid4()),
+        id=file_id,
         customer_id=customer_id,
         task_id=data.get('task_id'),
         project_id=data.get('project_id'),
         uploaded_by_user_id=user_id,
-        file_url=data['file_url'],
-        file_name=data['file_name']
+        file_url=file_url,
+        file_name=file_name,
+        blob_sha256=sha256
     )
     db.session.add(file)
     db.session.commit()
-    return jsonify({'id': file.id, 'file_url': file.file_url, 'file_name': file.file_name}), 201
+    if queue_thumbnail:
+        _queue_thumbnail(sha256)
+    publish_event(_file_project_id(file), 'file.created', _file_event(file))
+    return jsonify({'id': file.id, 'file_url': file.file_url, 'file_name': file.file_name, 'sha256': file.blob_sha256}), 201
 
 @file_bp.route('', methods=['GET'])
 @jwt_required()
@@ -70,21 +193,29 @@ def list_files():
         name: project_id
         type: string
         required: false
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: Comma-separated fields to return (id is always returned)
+      - in: query
+        name: include
+        type: string
+        required: false
+        description: Comma-separated related rows to embed (uploaded_by)
     responses:
       200:
         description: List of files
+      400:
+        description: Unknown field or include
     """
     task_id = request.args.get('task_id')
     project_id = request.args.get('project_id')
-    q = FileAttachment.query
-    if task_id:
-        q = q.filter_by(task_id=task_id)
-    if project_id:
-        q = q.filter_by(project_id=project_id)
-    files = q.all()
-    return jsonify([
-        {'id': f.id, 'file_url': f.file_url, 'file_name': f.file_name, 'uploaded_by_user_id': f.uploaded_by_user_id, 'created_at': f.created_at.isoformat()} for f in files
-    ])
+    try:
+        files = file_rows.for_request(request.args)
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    return jsonify(dump_files(db.session.execute(files_statement(task_id, project_id, files)), serializer=files))
 
 @file_bp.route('/<file_id>', methods=['GET'])
 @jwt_required()
@@ -106,7 +237,9 @@ def get_file(file_id):
         description: File details
     """
     file = FileAttachment.query.get_or_404(file_id)
-    return jsonify({'id': file.id, 'file_url': file.file_url, 'file_name': file.file_name, 'uploaded_by_user_id': file.uploaded_by_user_id, 'created_at': file.created_at.isoformat()})
+    blob = db.session.get(FileBlob, file.blob_sha256) if file.blob_sha256 else None
+    thumbnail_url = _thumbnail_url(file.id, blob.thumbnail_status) if blob else None
+    return jsonify({'id': file.id, 'file_url': file.file_url, 'file_name': file.file_name, 'uploaded_by_user_id': file.uploaded_by_user_id, 'created_at': file.created_at.isoformat(), 'thumbnail_url': thumbnail_url})
 
 @file_bp.route('/<file_id>', methods=['PATCH'])
 @jwt_required()
@@ -138,6 +271,7 @@ def update_file(file_id):
     data = request.json
     file.file_name = data.get('file_name', file.file_name)
     db.session.commit()
+    publish_event(_file_project_id(file), 'file.updated', _file_event(file))
     return jsonify({'id': file.id, 'file_name': file.file_name})
 
 @file_bp.route('/<file_id>', methods=['DELETE'])
@@ -160,6 +294,64 @@ def delete_file(file_id):
         description: File deleted
     """
     file = FileAttachment.query.get_or_404(file_id)
-    db.session.delete(file)
+    project_id = _file_project_id(file)
+    event = {'id': file.id, 'task_id': file.task_id, 'project_id': file.project_id}
+    # The compaction job releases the blob reference when it purges the row
+    file.soft_delete()
     db.session.commit()
+    publish_event(project_id, 'file.deleted', event)
     return jsonify({'msg': 'File deleted'})
+
+@file_bp.route('/<file_id>/content', methods=['GET'])
+@jwt_required()
+def download_file(file_id):
+    """
+    Download the stored content of a file
+    ---
+    tags:
+      - Files
+    security:
+      - Bearer: []
+    parameters:
+      - in: path
+        name: file_id
+        required: true
+        type: string
+    responses:
+      200:
+        description: File content
+      404:
+        description: File not found or not stored by the API
+    """
+    file = FileAttachment.query.get_or_404(file_id)
+    if not file.blob_sha256:
+        return jsonify({'error': 'File content is not stored by the API'}), 404
+    blob = FileBlob.query.get_or_404(file.blob_sha256)
+    return send_file(blob_path(blob.sha256), mimetype=blob.content_type, download_name=file.file_name, etag=blob.sha256)
+
+@file_bp.route('/<file_id>/thumbnail', methods=['GET'])
+@jwt_required()
+def download_thumbnail(file_id):
+    """
+    Download the preview thumbnail of an image or PDF file
+    ---
+    tags:
+      - Files
+    security:
+      - Bearer: []
+    parameters:
+      - in: path
+        name: file_id
+        required: true
+        type: string
+    responses:
+      200:
+        description: PNG thumbnail
+      404:
+        description: File not found or no thumbnail available
+    """
+    file = FileAttachment.query.get_or_404(file_id)
+    blob = db.session.get(FileBlob, file.blob_sha256) if file.blob_sha256 else None
+    if not blob or blob.thumbnail_status != 'ready':
+        return jsonify({'error': 'Thumbnail not available'}), 404
+    return send_file(thumbnail_path(blob_path(blob.sha256)), mimetype=THUMBNAIL_MIMETYPE, etag=blob.sha256 + '-thumb')
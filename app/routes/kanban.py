@@ -1,10 +1,35 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt
+from app.extensions import db
 from app.models.project import Project
 from app.models.task import Task
+from app.schemas.serializer import RowSerializer
+from app.schemas.includes import user_include
 
 kanban_bp = Blueprint('kanban_bp', __name__, url_prefix='/api/kanban')
 
+card_rows = RowSerializer([
+    ('id', Task.id),
+    ('title', Task.title),
+    ('assignee_user_id', Task.assignee_user_id),
+    ('due_date', Task.due_date),
+], includes={'assignee': user_include(Task.assignee_user_id)})
+
+def kanban_statement(project_id, cards=card_rows):
+    return cards.statement(Task.status).where(Task.project_id == project_id)
+
+def build_board(rows, cards=card_rows, expand=True):
+    """Group (status, *card) rows into board columns (embedding includes unless expand is False)."""
+    board = {'todo': [], 'in_progress': [], 'done': [], 'blocked': []}
+    for status, *card in rows:
+        board.get(status, []).append(cards.dump_row(card))
+    if expand:
+        cards.expand(board_cards(board))
+    return board
+
+def board_cards(board):
+    return [card for column in board.values() for card in column]
+
 @kanban_bp.route('/<project_id>', methods=['GET'])
 @jwt_required()
 def get_kanban_board(project_id):
@@ -20,17 +45,24 @@ def get_kanban_board(project_id):
         name: project_id
         required: true
         type: string
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: Comma-separated fields to return (id is always returned)
+      - in: query
+        name: include
+        type: string
+        required: false
+        description: Comma-separated related rows to embed (assignee)
     responses:
       200:
         description: Kanban board grouped by status
+      400:
+        description: Unknown field or include
     """
-    tasks = Task.query.filter_by(project_id=project_id).all()
-    board = {'todo': [], 'in_progress': [], 'done': [], 'blocked': []}
-    for t in tasks:
-        board.get(t.status, []).append({
-            'id': t.id,
-            'title': t.title,
-            'assignee_user_id': t.assignee_user_id,
-            'due_date': t.due_date.isoformat() if t.due_date else None
-        })
-    return jsonify(board)
+    try:
+        cards = card_rows.for_request(request.args)
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    return jsonify(build_board(db.session.execute(kanban_statement(project_id, cards)), cards))
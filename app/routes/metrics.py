@@ -0,0 +1,38 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required, get_jwt
+from app.services.cache import record_cache
+from app.services.events import event_bus
+from app.services.rate_limit import rate_limiter
+from app.services.admission import admission
+from app.services.idempotency import idempotency_store
+from app.services.compression import compression_stats
+
+metrics_bp = Blueprint('metrics_bp', __name__, url_prefix='/api/metrics')
+
+@metrics_bp.route('', methods=['GET'])
+@jwt_required()
+def get_metrics():
+    """
+    Runtime metrics for this worker process (superadmin only)
+    ---
+    tags:
+      - Metrics
+    security:
+      - Bearer: []
+    responses:
+      200:
+        description: Cache hit/miss counters, event stream subscribers, rate limiter counters, admission queue depth and shed counts, idempotent replays, bytes saved by compression
+      403:
+        description: Forbidden
+    """
+    claims = get_jwt()
+    if claims.get('role') not in ('superadmin', 'superadmin_readonly'):
+        return jsonify({'error': 'Forbidden'}), 403
+    return jsonify({
+        'record_cache': record_cache.snapshot(),
+        'events': event_bus.stats(),
+        'rate_limit': rate_limiter.stats(),
+        'admission': admission.stats(),
+        'idempotency': idempotency_store.snapshot(),
+        'compression': compression_stats.snapshot()
+    })
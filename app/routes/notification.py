@@ -0,0 +1,129 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt
+from app.extensions import db
+from app.models.notification import Notification
+from app.schemas.serializer import RowSerializer
+from app.services.notifications import unread_count, mark_read
+
+notification_bp = Blueprint('notification_bp', __name__, url_prefix='/api/notifications')
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+MAX_MARK_IDS = 1000
+
+notification_rows = RowSerializer([
+    ('id', Notification.id),
+    ('kind', Notification.kind),
+    ('task_id', Notification.task_id),
+    ('project_id', Notification.project_id),
+    ('actor_user_id', Notification.actor_user_id),
+    ('message', Notification.message),
+    ('created_at', Notification.created_at),
+    ('read_at', Notification.read_at),
+])
+
+@notification_bp.route('', methods=['GET'])
+@jwt_required()
+def list_notifications():
+    """
+    The caller's notifications, newest first. Pass the returned next_before to
+    get the next page.
+    ---
+    tags:
+      - Notifications
+    security:
+      - Bearer: []
+    parameters:
+      - in: query
+        name: before
+        type: integer
+        required: false
+        description: Only notifications older than this id
+      - in: query
+        name: limit
+        type: integer
+        required: false
+        default: 50
+      - in: query
+        name: unread
+        type: boolean
+        required: false
+        description: Only unread notifications
+    responses:
+      200:
+        description: A page of notifications and the unread count
+      400:
+        description: Invalid before or limit
+    """
+    user_id = get_jwt()['sub']
+    try:
+        before = int(request.args['before']) if request.args.get('before') else None
+        limit = min(max(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({'error': 'before and limit must be integers'}), 400
+    statement = notification_rows.statement().where(Notification.user_id == user_id)
+    if before is not None:
+        statement = statement.where(Notification.id < before)
+    if request.args.get('unread', '').lower() == 'true':
+        statement = statement.where(Notification.read_at.is_(None))
+    notifications = notification_rows.dump_rows(
+        db.session.execute(statement.order_by(Notification.id.desc()).limit(limit))
+    )
+    return jsonify({
+        'notifications': notifications,
+        'unread': unread_count(user_id),
+        'next_before': notifications[-1]['id'] if len(notifications) == limit else None,
+    })
+
+@notification_bp.route('/unread_count', methods=['GET'])
+@jwt_required()
+def get_unread_count():
+    """
+    Number of unread notifications (the badge), read from a maintained counter
+    ---
+    tags:
+      - Notifications
+    security:
+      - Bearer: []
+    responses:
+      200:
+        description: Unread count
+    """
+    return jsonify({'unread': unread_count(get_jwt()['sub'])})
+
+@notification_bp.route('/read', methods=['POST'])
+@jwt_required()
+def mark_notifications_read():
+    """
+    Mark notifications read, either the given ids or all of them
+    ---
+    tags:
+      - Notifications
+    security:
+      - Bearer: []
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          properties:
+            ids: {type: array, items: {type: integer}}
+            all: {type: boolean}
+    responses:
+      200:
+        description: How many were marked and the new unread count
+      400:
+        description: Neither ids nor all given
+    """
+    user_id = get_jwt()['sub']
+    data = request.get_json(silent=True) or {}
+    if data.get('all'):
+        ids = None
+    elif isinstance(data.get('ids'), list) and all(isinstance(i, int) for i in data['ids']):
+        ids = data['ids'][:MAX_MARK_IDS]
+    else:
+        return jsonify({'error': 'Pass ids (a list of notification ids) or all: true'}), 400
+    marked = mark_read(user_id, ids)
+    db.session.commit()
+    return jsonify({'marked': marked, 'unread': unread_count(user_id)})
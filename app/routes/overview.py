@@ -0,0 +1,143 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import date, timedelta
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required
+from sqlalchemy import select, func, and_, or_, text
+from app.extensions import db
+from app.models.comment import Comment
+from app.models.file_attachment import FileAttachment
+from app.models.task import Task
+from app.routes.kanban import kanban_statement, build_board
+from app.routes.calendar import calendar_statement, event_rows
+from app.routes.file_attachment import files_statement, dump_files
+from app.services.tenancy import current_tenant_scope, tenant_criteria
+
+overview_bp = Blueprint('overview_bp', __name__, url_prefix='/api/projects')
+
+DEFAULT_CALENDAR_DAYS = 14
+MAX_CALENDAR_DAYS = 90
+RECENT_FILES = 10
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _section_pool():
+    """
+    Threads running overview sections, shared by every request on this worker.
+    Each holds a pooled connection while it runs, so there are no more of them
+    than the engine's pool_size: the overflow stays available to request threads.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = current_app.config['OVERVIEW_WORKERS']
+            pool_size = getattr(db.engine.pool, 'size', None)
+            if callable(pool_size):
+                workers = min(workers, pool_size())
+            _pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='overview')
+        return _pool
+
+
+def upcoming_statement(project_id, days):
+    today = date.today()
+    until = today + timedelta(days=days)
+    return calendar_statement(project_id).where(
+        or_(Task.start_date.between(today, until), Task.due_date.between(today, until))
+    ).order_by(Task.due_date)
+
+
+def comment_counts_statement(project_id):
+    return select(Comment.task_id, func.count()).join(
+        Task, and_(Task.id == Comment.task_id, Task.customer_id == Comment.customer_id)
+    ).where(Task.project_id == project_id).group_by(Comment.task_id)
+
+
+def recent_files_statement(project_id):
+    return files_statement(project_id=project_id).order_by(FileAttachment.created_at.desc()).limit(RECENT_FILES)
+
+
+def _fetch_section(app, tenant_id, statement, timeout):
+    """
+    Run one section's statement in its own app context, so on its own session
+    and pooled connection. There is no request here, so the caller's tenant
+    scope is applied explicitly. On PostgreSQL the server cancels the query
+    once the section's time is up. Other databases have no such limit: a
+    section that timed out keeps running, holding its pool thread and
+    connection, until the query finishes on its own.
+    """
+    with app.app_context():
+        if tenant_id is not None:
+            statement = statement.options(tenant_criteria(tenant_id))
+        if db.engine.dialect.name == 'postgresql':
+            db.session.execute(text(f'SET LOCAL statement_timeout = {int(timeout * 1000)}'))
+        return db.session.execute(statement).all()
+
+
+@overview_bp.route('/<project_id>/overview', methods=['GET'])
+@jwt_required()
+def get_project_overview(project_id):
+    """
+    Project page in one call: board columns, upcoming calendar window, recent
+    files and comment counts per task. Sections are queried in parallel; a
+    section that fails or runs past OVERVIEW_SECTION_TIMEOUT_SECONDS is null and
+    listed in "errors", and the rest are still returned ("partial": true).
+    ---
+    tags:
+      - Projects
+    security:
+      - Bearer: []
+    parameters:
+      - in: path
+        name: project_id
+        required: true
+        type: string
+      - in: query
+        name: days
+        type: integer
+        required: false
+        default: 14
+        description: Length of the upcoming calendar window, from today
+    responses:
+      200:
+        description: Project overview, possibly partial
+      400:
+        description: Invalid days
+    """
+    try:
+        days = min(max(int(request.args.get('days', DEFAULT_CALENDAR_DAYS)), 0), MAX_CALENDAR_DAYS)
+    except ValueError:
+        return jsonify({'error': 'days must be an integer'}), 400
+    sections = {
+        'board': (kanban_statement(project_id), build_board),
+        'calendar': (upcoming_statement(project_id, days), event_rows.dump_rows),
+        'recent_files': (recent_files_statement(project_id), dump_files),
+        'comment_counts': (comment_counts_statement(project_id), dict),
+    }
+    app = current_app._get_current_object()
+    tenant_id = current_tenant_scope()
+    timeout = current_app.config['OVERVIEW_SECTION_TIMEOUT_SECONDS']
+    pool = _section_pool()
+    futures = {
+        name: pool.submit(_fetch_section, app, tenant_id, statement, timeout)
+        for name, (statement, _) in sections.items()
+    }
+    wait(futures.values(), timeout=timeout)
+
+    overview = {}
+    errors = {}
+    for name, future in futures.items():
+        overview[name] = None
+        if not future.done():
+            future.cancel()
+            errors[name] = 'timeout'
+        elif future.exception() is not None:
+            current_app.logger.warning('Overview section %s of project %s failed: %s', name, project_id, future.exception())
+            errors[name] = 'failed'
+        else:
+            # Serialized here rather than on the pool thread: dump_files needs the request for url_for
+            overview[name] = sections[name][1](future.result())
+    overview['errors'] = errors
+    overview['partial'] = bool(errors)
+    return jsonify(overview)
@@ -0,0 +1,43 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from app.services.project_stats import project_stats
+
+project_stats_bp = Blueprint('project_stats_bp', __name__, url_prefix='/api/projects')
+
+DEFAULT_HISTOGRAM_DAYS = 30
+MAX_HISTOGRAM_DAYS = 365
+
+@project_stats_bp.route('/<project_id>/stats', methods=['GET'])
+@jwt_required()
+def get_project_stats(project_id):
+    """
+    Task statistics of a project: counts per status, priority and assignee,
+    progress, overdue tasks and tasks completed per day. Served from counters
+    maintained on every task write, so it costs the same for any project size.
+    ---
+    tags:
+      - Projects
+    security:
+      - Bearer: []
+    parameters:
+      - in: path
+        name: project_id
+        required: true
+        type: string
+      - in: query
+        name: days
+        type: integer
+        required: false
+        default: 30
+        description: Days of completed_per_day history, up to today
+    responses:
+      200:
+        description: Project task statistics
+      400:
+        description: Invalid days
+    """
+    try:
+        days = min(max(int(request.args.get('days', DEFAULT_HISTOGRAM_DAYS)), 1), MAX_HISTOGRAM_DAYS)
+    except ValueError:
+        return jsonify({'error': 'days must be an integer'}), 400
+    return jsonify(project_stats(project_id, days))
@@ -1,13 +1,60 @@
 import uuid
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt
+from sqlalchemy.orm.exc import StaleDataError
 from app.extensions import db
 from app.models.task import Task
+from app.schemas.serializer import RowSerializer
+from app.schemas.includes import user_include
+from app.services.events import publish_event
+from app.services.notifications import notify
+from app.services.audit import record_audit, changed_fields
+from app.services.idempotency import idempotent
+from app.services.soft_delete import soft_delete_task
+from app.services.tenancy import is_tenant_user
+from app.services.concurrency import precondition_failed, stale_write, with_etag, apply_patch, parse_date, parse_datetime
 
 subtask_bp = Blueprint('subtask_bp', __name__, url_prefix='/api/subtasks')
 
+subtask_rows = RowSerializer([
+    ('id', Task.id),
+    ('title', Task.title),
+    ('status', Task.status),
+    ('assignee_user_id', Task.assignee_user_id),
+    ('due_date', Task.due_date),
+], includes={'assignee': user_include(Task.assignee_user_id)})
+
+# Task fields whose changes are recorded in the audit log
+AUDITED_FIELDS = ('title', 'description', 'status', 'priority', 'assignee_user_id', 'due_date', 'start_date', 'completed_at')
+
+# Fields a PATCH may set, with their parsers
+UPDATABLE_FIELDS = {
+    'title': None,
+    'description': None,
+    'status': None,
+    'priority': None,
+    'assignee_user_id': None,
+    'due_date': parse_date,
+    'start_date': parse_date,
+    'completed_at': parse_datetime,
+    'position': None,
+}
+
+def _task_event(task):
+    return {
+        'id': task.id,
+        'parent_task_id': task.parent_task_id,
+        'title': task.title,
+        'status': task.status,
+        'priority': task.priority,
+        'assignee_user_id': task.assignee_user_id,
+        'due_date': task.due_date.isoformat() if task.due_date else None,
+        'position': task.position
+    }
+
 @subtask_bp.route('', methods=['POST'])
 @jwt_required()
+@idempotent
 def create_subtask():
     """
     Create a new subtask under a parent task
@@ -35,15 +82,28 @@ def create_subtask():
     responses:
       201:
         description: Subtask created
+      400:
+        description: Assignee isn't a user of the task's customer, or project_id isn't the parent's project
+      404:
+        description: Parent task not found
     """
     claims = get_jwt()
-    customer_id = claims.get('customer_id')
     user_id = claims['sub']
     data = request.json
+    # Subtasks go in the parent's customer and project. The lookup is tenant-scoped,
+    # so a parent of another customer is not found (superadmins may use any)
+    parent = db.session.query(Task.customer_id, Task.project_id).filter_by(id=data['parent_task_id']).first()
+    if parent is None:
+        return jsonify({'error': 'Parent task not found'}), 404
+    customer_id = parent.customer_id
+    if data.get('project_id') and data['project_id'] != parent.project_id:
+        return jsonify({'error': "Subtask must be in its parent task's project"}), 400
+    if data.get('assignee_user_id') and not is_tenant_user(data['assignee_user_id'], customer_id):
+        return jsonify({'error': 'Assignee must be a user of the same customer'}), 400
     subtask = Task(
         id=str(uuid.uuid4()),
         customer_id=customer_id,
-        project_id=data.get('project_id'),
+        project_id=parent.project_id,
         parent_task_id=data['parent_task_id'],
         title=data['title'],
         description=data.get('description'),
@@ -55,7 +115,9 @@ def create_subtask():
         position=data.get('position')
     )
     db.session.add(subtask)
+    record_audit('task.created', 'task', subtask.id, actor_user_id=user_id, customer_id=customer_id)
     db.session.commit()
+    publish_event(subtask.project_id, 'task.created', _task_event(subtask))
     return jsonify({'id': subtask.id, 'title': subtask.title}), 201
 
 @subtask_bp.route('', methods=['GET'])
@@ -73,15 +135,29 @@ def list_subtasks():
         name: parent_task_id
         type: string
         required: true
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: Comma-separated fields to return (id is always returned)
+      - in: query
+        name: include
+        type: string
+        required: false
+        description: Comma-separated related rows to embed (assignee)
     responses:
       200:
         description: List of subtasks
+      400:
+        description: Unknown field or include
     """
     parent_task_id = request.args.get('parent_task_id')
-    subtasks = Task.query.filter_by(parent_task_id=parent_task_id).all()
-    return jsonify([
-        {'id': t.id, 'title': t.title, 'status': t.status, 'assignee_user_id': t.assignee_user_id, 'due_date': t.due_date.isoformat() if t.due_date else None} for t in subtasks
-    ])
+    try:
+        rows = subtask_rows.for_request(request.args)
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    subtasks = rows.select(Task.query.filter_by(parent_task_id=parent_task_id))
+    return jsonify(rows.dump_rows(subtasks))
 
 @subtask_bp.route('/<subtask_id>', methods=['GET'])
 @jwt_required()
@@ -103,13 +179,14 @@ def get_subtask(subtask_id):
         description: Subtask details
     """
     subtask = Task.query.get_or_404(subtask_id)
-    return jsonify({'id': subtask.id, 'title': subtask.title, 'status': subtask.status, 'assignee_user_id': subtask.assignee_user_id, 'due_date': subtask.due_date.isoformat() if subtask.due_date else None})
+    return with_etag(jsonify({'id': subtask.id, 'title': subtask.title, 'status': subtask.status, 'assignee_user_id': subtask.assignee_user_id, 'due_date': subtask.due_date.isoformat() if subtask.due_date else None}), subtask)
 
 @subtask_bp.route('/<subtask_id>', methods=['PATCH'])
 @jwt_required()
 def update_subtask(subtask_id):
     """
-    Update a subtask
+    Update a subtask. Only the fields sent are written. Send the ETag from
+    GET as If-Match to update only if nobody changed the subtask since.
     ---
     tags:
       - Subtasks
@@ -120,6 +197,10 @@ def update_subtask(subtask_id):
         name: subtask_id
         required: true
         type: string
+      - in: header
+        name: If-Match
+        type: string
+        required: false
       - in: body
         name: body
         required: true
@@ -137,21 +218,42 @@ def update_subtask(subtask_id):
             position: {type: integer}
     responses:
       200:
-        description: Subtask updated
+        description: Subtask updated; ETag is the new version
+      400:
+        description: Invalid date, or assignee isn't a user of the task's customer
+      409:
+        description: Changed by a concurrent request
+      412:
+        description: If-Match doesn't match the current version
+      428:
+        description: If-Match required (REQUIRE_IF_MATCH)
     """
     subtask = Task.query.get_or_404(subtask_id)
-    data = request.json
-    subtask.title = data.get('title', subtask.title)
-    subtask.description = data.get('description', subtask.description)
-    subtask.status = data.get('status', subtask.status)
-    subtask.priority = data.get('priority', subtask.priority)
-    subtask.assignee_user_id = data.get('assignee_user_id', subtask.assignee_user_id)
-    subtask.due_date = data.get('due_date', subtask.due_date)
-    subtask.start_date = data.get('start_date', subtask.start_date)
-    subtask.completed_at = data.get('completed_at', subtask.completed_at)
-    subtask.position = data.get('position', subtask.position)
-    db.session.commit()
-    return jsonify({'id': subtask.id, 'title': subtask.title})
+    refused = precondition_failed(subtask)
+    if refused is not None:
+        return refused
+    data = request.get_json() or {}
+    if data.get('assignee_user_id') and not is_tenant_user(data['assignee_user_id'], subtask.customer_id):
+        return jsonify({'error': 'Assignee must be a user of the same customer'}), 400
+    previous_assignee = subtask.assignee_user_id
+    try:
+        apply_patch(subtask, data, UPDATABLE_FIELDS)
+    except ValueError:
+        return jsonify({'error': 'Dates must be ISO 8601'}), 400
+    changes = changed_fields(subtask, AUDITED_FIELDS)
+    if changes:
+        record_audit('task.updated', 'task', subtask.id, actor_user_id=get_jwt()['sub'],
+                     customer_id=subtask.customer_id, meta={'changes': changes})
+    if subtask.assignee_user_id != previous_assignee:
+        notify([subtask.assignee_user_id], 'task.assigned', subtask.customer_id, task_id=subtask.id,
+               project_id=subtask.project_id, actor_user_id=get_jwt()['sub'], message=subtask.title)
+    try:
+        db.session.commit()
+    except StaleDataError:
+        db.session.rollback()
+        return stale_write()
+    publish_event(subtask.project_id, 'task.updated', _task_event(subtask))
+    return with_etag(jsonify({'id': subtask.id, 'title': subtask.title}), subtask)
 
 @subtask_bp.route('/<subtask_id>', methods=['DELETE'])
 @jwt_required()
@@ -173,6 +275,10 @@ def delete_subtask(subtask_id):
         description: Subtask deleted
     """
     subtask = Task.query.get_or_404(subtask_id)
-    db.session.delete(subtask)
+    project_id = subtask.project_id
+    # Soft-deletes its comments, files and children too; the compaction job purges them all later
+    soft_delete_task(subtask)
+    record_audit('task.deleted', 'task', subtask.id, actor_user_id=get_jwt()['sub'], customer_id=subtask.customer_id)
     db.session.commit()
+    publish_event(project_id, 'task.deleted', {'id': subtask_id})
     return jsonify({'msg': 'Subtask deleted'})
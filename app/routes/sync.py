@@ -0,0 +1,56 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt
+from app.services.sync import changes_since, CursorExpired
+
+sync_bp = Blueprint('sync_bp', __name__, url_prefix='/api/sync')
+
+DEFAULT_SYNC_LIMIT = 500
+MAX_SYNC_LIMIT = 5000
+
+@sync_bp.route('', methods=['GET'])
+@jwt_required()
+def get_changes():
+    """
+    Tasks, comments and files of the caller's customer changed since a cursor.
+    Start with since=0 (a full sync), then pass back the returned cursor; keep
+    calling while has_more is true. Deleted records are listed under "deleted".
+    A 410 means the cursor is too old and the client must sync from 0 again.
+    ---
+    tags:
+      - Sync
+    security:
+      - Bearer: []
+    parameters:
+      - in: query
+        name: since
+        type: integer
+        required: false
+        default: 0
+      - in: query
+        name: limit
+        type: integer
+        required: false
+        default: 500
+    responses:
+      200:
+        description: Changes after the cursor
+      400:
+        description: Invalid cursor
+      410:
+        description: Cursor expired, resync from 0
+    """
+    customer_id = get_jwt().get('customer_id')
+    if not customer_id:
+        return jsonify({'error': 'Sync requires a customer account'}), 403
+    try:
+        since = int(request.args.get('since', 0))
+        limit = min(max(int(request.args.get('limit', DEFAULT_SYNC_LIMIT)), 1), MAX_SYNC_LIMIT)
+    except ValueError:
+        return jsonify({'error': 'since and limit must be integers'}), 400
+    if since < 0:
+        return jsonify({'error': 'since must not be negative'}), 400
+    try:
+        changes = changes_since(customer_id, since, limit)
+    except CursorExpired:
+        return jsonify({'error': 'Cursor expired, resync from 0'}), 410
+    return jsonify(changes)
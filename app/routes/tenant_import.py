@@ -0,0 +1,168 @@
+import os
+import uuid
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt
+from app.extensions import db
+from app.models.customer import Customer
+from app.models.import_job import ImportJob
+from app.jobs.tenant_import import run_import_job
+from app.services.tenant_import import import_stalled
+
+import_bp = Blueprint('import_bp', __name__, url_prefix='/api/customers')
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+def _can_import(claims, customer_id):
+    role = claims.get('role')
+    if role == 'superadmin':
+        return True
+    return role == 'admin' and claims.get('customer_id') == customer_id
+
+def _job_json(job):
+    return {
+        'id': job.id,
+        'status': job.status,
+        'lines_processed': job.lines_processed,
+        'rows_loaded': job.rows_loaded,
+        'rows_skipped': job.rows_skipped,
+        'error': job.error,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'completed_at': job.completed_at.isoformat() if job.completed_at else None
+    }
+
+def _queue(job):
+    try:
+        run_import_job.delay(job.id)
+    except Exception:
+        current_app.logger.warning('Could not queue import %s', job.id)
+        job.status = 'failed'
+        job.error = 'Import queue unavailable'
+        db.session.commit()
+        return False
+    return True
+
+@import_bp.route('/<customer_id>/import', methods=['POST'])
+@jwt_required()
+def import_customer_data(customer_id):
+    """
+    Import projects, tasks, comments and files from an NDJSON archive (admin only).
+    The request body is the archive, in the format produced by the export endpoint.
+    It is streamed to storage and loaded in the background; ids are remapped and
+    user references outside this customer are dropped.
+    ---
+    tags:
+      - Customers
+    security:
+      - Bearer: []
+    consumes:
+      - application/x-ndjson
+    parameters:
+      - in: path
+        name: customer_id
+        required: true
+        type: string
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: string
+    responses:
+      202:
+        description: Import job queued
+      403:
+        description: Forbidden
+      404:
+        description: Customer not found
+      503:
+        description: Import queue unavailable
+    """
+    claims = get_jwt()
+    if not _can_import(claims, customer_id):
+        return jsonify({'error': 'Forbidden'}), 403
+    if db.session.get(Customer, customer_id) is None:
+        return jsonify({'error': 'Customer not found'}), 404
+    job_id = str(uuid.uuid4())
+    path = os.path.join(current_app.config['UPLOAD_FOLDER'], 'imports', f'{job_id}.ndjson')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as out:
+        for chunk in iter(lambda: request.stream.read(UPLOAD_CHUNK_SIZE), b''):
+            out.write(chunk)
+    job = ImportJob(id=job_id, customer_id=customer_id, requested_by_user_id=claims['sub'], source_path=path)
+    db.session.add(job)
+    db.session.commit()
+    if not _queue(job):
+        return jsonify({'error': 'Import queue unavailable', 'job': _job_json(job)}), 503
+    return jsonify(_job_json(job)), 202
+
+@import_bp.route('/<customer_id>/imports/<job_id>', methods=['GET'])
+@jwt_required()
+def get_import(customer_id, job_id):
+    """
+    Get the progress of an import
+    ---
+    tags:
+      - Customers
+    security:
+      - Bearer: []
+    parameters:
+      - in: path
+        name: customer_id
+        required: true
+        type: string
+      - in: path
+        name: job_id
+        required: true
+        type: string
+    responses:
+      200:
+        description: Import job status
+      404:
+        description: Import not found
+    """
+    if not _can_import(get_jwt(), customer_id):
+        return jsonify({'error': 'Forbidden'}), 403
+    job = ImportJob.query.filter_by(id=job_id, customer_id=customer_id).first()
+    if not job:
+        return jsonify({'error': 'Import not found'}), 404
+    return jsonify(_job_json(job))
+
+@import_bp.route('/<customer_id>/imports/<job_id>/resume', methods=['POST'])
+@jwt_required()
+def resume_import(customer_id, job_id):
+    """
+    Resume a failed import, or one whose worker died (running without a
+    heartbeat for IMPORT_LEASE_SECONDS), from its last checkpoint
+    ---
+    tags:
+      - Customers
+    security:
+      - Bearer: []
+    parameters:
+      - in: path
+        name: customer_id
+        required: true
+        type: string
+      - in: path
+        name: job_id
+        required: true
+        type: string
+    responses:
+      202:
+        description: Import job queued
+      400:
+        description: Import is not resumable
+      404:
+        description: Import not found
+    """
+    if not _can_import(get_jwt(), customer_id):
+        return jsonify({'error': 'Forbidden'}), 403
+    job = ImportJob.query.filter_by(id=job_id, customer_id=customer_id).first()
+    if not job:
+        return jsonify({'error': 'Import not found'}), 404
+    if job.status != 'failed' and not import_stalled(job):
+        return jsonify({'error': f'Import is {job.status}'}), 400
+    job.status = 'pending'
+    db.session.commit()
+    if not _queue(job):
+        return jsonify({'error': 'Import queue unavailable', 'job': _job_json(job)}), 503
+    return jsonify(_job_json(job)), 202
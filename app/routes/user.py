@@ -4,9 +4,15 @@ from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from marshmallow import ValidationError
 from app.schemas.user import UserSchema
+from app.schemas.serializer import RowSerializer
+from app.schemas.includes import customer_include
 
 user_bp = Blueprint('user', __name__, url_prefix='/api/users')
 
+# Schema instances are stateless for dump/load, so build them once
+user_schema = UserSchema()
+user_rows = RowSerializer.from_schema(user_schema, User, includes={'customer': customer_include(User.customer_id)})
+
 @user_bp.route('/test', methods=['GET'])
 def test_user():
     """
@@ -52,6 +58,17 @@ def get_users():
       - Users
     security:
       - Bearer: []
+    parameters:
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: Comma-separated fields to return (id is always returned)
+      - in: query
+        name: include
+        type: string
+        required: false
+        description: Comma-separated related rows to embed (customer)
     responses:
       200:
         description: List of users
@@ -69,13 +86,18 @@ def get_users():
                 type: string
               status:
                 type: string
+      400:
+        description: Unknown field or include
     """
     # Enforce customer_id from JWT
     claims = get_jwt()
     customer_id = claims.get('customer_id')
-    users = User.query.filter_by(customer_id=customer_id).all()
-    schema = UserSchema(many=True)
-    return jsonify(schema.dump(users))
+    try:
+        rows = user_rows.for_request(request.args)
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    users = rows.select(User.query.filter_by(customer_id=customer_id))
+    return jsonify(rows.dump_rows(users))
 
 @user_bp.route('/<user_id>', methods=['GET'])
 @jwt_required()
@@ -114,11 +136,11 @@ def get_user(user_id):
     # Enforce customer_id from JWT
     claims = get_jwt()
     customer_id = claims.get('customer_id')
+    # Not cached_get: the response includes columns the record cache leaves out
     user = User.query.get(user_id)
     if not user or user.customer_id != customer_id:
         return jsonify({'error': 'User not found'}), 404
-    schema = UserSchema()
-    return jsonify(schema.dump(user))
+    return jsonify(user_schema.dump(user))
 
 @user_bp.route('/', methods=['POST'])
 @jwt_required()
@@ -187,9 +209,8 @@ def create_user():
         return jsonify({'error': 'Only admins can invite users'}), 403
     if is_superadmin_readonly(role):
         return jsonify({'error': 'Read-only role cannot invite users'}), 403
-    schema = UserSchema()
     try:
-        user_data = schema.load(request.get_json())
+        user_data = user_schema.load(request.get_json())
     except ValidationError as err:
         return jsonify({'error': err.messages}), 400
 
@@ -208,7 +229,7 @@ def create_user():
     user.set_password(user_data['password'])
     db.session.add(user)
     db.session.commit()
-    return jsonify(schema.dump(user)), 201
+    return jsonify(user_schema.dump(user)), 201
 
 @user_bp.route('/<user_id>', methods=['PUT'])
 @jwt_required()
@@ -287,8 +308,7 @@ def update_user(user_id):
     if 'password' in data:
         user.set_password(data['password'])
     db.session.commit()
-    schema = UserSchema()
-    return jsonify(schema.dump(user))
+    return jsonify(user_schema.dump(user))
 
 @user_bp.route('/<user_id>', methods=['DELETE'])
 @jwt_required()
@@ -0,0 +1,40 @@
+from sqlalchemy import false
+from app.models.customer import Customer
+from app.models.user import User
+from app.schemas.serializer import RowSerializer, Include
+from app.services.tenancy import NO_TENANT
+
+# What include= embeds for a referenced user or customer
+user_summary_rows = RowSerializer([
+    ('id', User.id),
+    ('name', User.name),
+    ('email', User.email),
+])
+customer_summary_rows = RowSerializer([
+    ('id', Customer.id),
+    ('name', Customer.name),
+    ('plan_type', Customer.plan_type),
+])
+
+
+def _within_tenant(column):
+    """
+    Users and customers aren't tenant-scoped models, so a stray id in a listed
+    row must not reveal another tenant's: confine the include to the caller's
+    customer (unscoped roles see every tenant).
+    """
+    def criteria(tenant_id):
+        if tenant_id is None:
+            return ()
+        if tenant_id is NO_TENANT:
+            return (false(),)
+        return (column == tenant_id,)
+    return criteria
+
+
+def user_include(foreign_key):
+    return Include(foreign_key, User.id, user_summary_rows, criteria=_within_tenant(User.customer_id))
+
+
+def customer_include(foreign_key):
+    return Include(foreign_key, Customer.id, customer_summary_rows, criteria=_within_tenant(Customer.id))
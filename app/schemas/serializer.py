@@ -0,0 +1,196 @@
+from datetime import date
+from sqlalchemy import select
+from marshmallow import fields as ma_fields
+from app.extensions import db
+from app.services.tenancy import current_tenant_scope
+
+# Keys per IN (...) query when loading included rows
+INCLUDE_BATCH_SIZE = 500
+
+
+def _isoformat(value):
+    return value.isoformat()
+
+
+class RowSerializer:
+    """
+    Precompiled serializer for query rows.
+
+    Built once per shape at import time from (output_name, column) pairs. Queries
+    select exactly `columns` with Query.with_entities(), and rows are turned into
+    dicts without materialising ORM objects or re-inspecting field types per row.
+    Date and datetime columns are rendered with isoformat(), matching the
+    hand-built responses and marshmallow's default DateTime format.
+
+    List endpoints narrow it per request with for_request(): fields= picks the
+    columns that are selected and include= embeds related rows (see Include).
+    Fields the endpoint adds itself are declared as computed, and wants() tells
+    whether the request asked for them.
+    """
+
+    def __init__(self, fields, includes=None, computed=()):
+        self.names = tuple(name for name, _ in fields)
+        self.columns = tuple(column for _, column in fields)
+        self.includes = includes or {}
+        self.computed = tuple(computed)
+        self._converters = tuple(
+            (index, _isoformat) for index, column in enumerate(self.columns)
+            if _python_type(column) is not None and issubclass(_python_type(column), date)
+        )
+        self._wanted = frozenset(self.computed)
+        # (include name, Include, name of its key column) embedded by expand()
+        self._expand = ()
+        # Key columns selected only for an include, dropped from the output
+        self._hidden = ()
+        self._views = {}
+
+    @classmethod
+    def from_schema(cls, schema, model, **options):
+        """Compile the dump fields of a marshmallow schema instance against model columns."""
+        return cls([
+            (name, getattr(model, field.attribute or name))
+            for name, field in schema.dump_fields.items()
+            if not isinstance(field, (ma_fields.Nested, ma_fields.Method, ma_fields.Function))
+        ], **options)
+
+    def for_request(self, args):
+        """
+        The view asked for by the comma-separated fields= and include= query
+        arguments (self if neither is given). Raises ValueError naming unknown
+        fields or includes.
+        """
+        fields = [name.strip() for name in args.get('fields', '').split(',') if name.strip()]
+        include = [name.strip() for name in args.get('include', '').split(',') if name.strip()]
+        if not fields and not include:
+            return self
+        return self.sparse(fields or None, include)
+
+    def sparse(self, fields=None, include=()):
+        """
+        A serializer of only the given fields (all if None; id is always kept)
+        that embeds the named includes. Built once per combination.
+        """
+        unknown = set(fields or ()) - set(self.names) - set(self.computed)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        unknown = set(include) - set(self.includes)
+        if unknown:
+            raise ValueError(f"Unknown includes: {', '.join(sorted(unknown))}")
+        key = (frozenset(fields) if fields is not None else None, frozenset(include))
+        view = self._views.get(key)
+        if view is None:
+            view = self._views[key] = self._narrow(fields, include)
+        return view
+
+    def _narrow(self, fields, include):
+        wanted = set(self.names) | set(self.computed) if fields is None else set(fields) | {'id'}
+        selected = [(name, column) for name, column in zip(self.names, self.columns) if name in wanted]
+        expand = []
+        hidden = []
+        for name in sorted(include):
+            related = self.includes[name]
+            key_name = next((field for field, column in selected if column is related.foreign_key), None)
+            if key_name is None:
+                key_name = f'_{name}_key'
+                selected.append((key_name, related.foreign_key))
+                hidden.append(key_name)
+            expand.append((name, related, key_name))
+        view = RowSerializer(selected, self.includes, self.computed)
+        view._wanted = frozenset(wanted & set(self.computed))
+        view._expand = tuple(expand)
+        view._hidden = tuple(hidden)
+        return view
+
+    def wants(self, computed_field):
+        return computed_field in self._wanted
+
+    def select(self, query, *extra):
+        """Restrict a query to the serialized columns, optionally prefixed by extra columns."""
+        return query.with_entities(*extra, *self.columns)
+
+    def statement(self, *extra):
+        """A select() of the serialized columns, optionally prefixed by extra columns, for any session."""
+        return select(*extra, *self.columns)
+
+    def dump_row(self, row):
+        if not self._converters:
+            return dict(zip(self.names, row))
+        values = list(row)
+        for index, convert in self._converters:
+            if values[index] is not None:
+                values[index] = convert(values[index])
+        return dict(zip(self.names, values))
+
+    def dump_rows(self, rows, expand=True):
+        dump_row = self.dump_row
+        entries = [dump_row(row) for row in rows]
+        return self.expand(entries) if expand and self._expand else entries
+
+    def expand(self, entries):
+        """
+        Embed the includes into entries dumped one by one with dump_row (dump_rows
+        already does), in place. One batched query per include, not per entry.
+        """
+        return self.embed(entries, {
+            name: related.load(keys) for name, related, keys in self.include_keys(entries)
+        })
+
+    def include_keys(self, entries):
+        """(include name, Include, keys the entries reference) per requested include."""
+        return [(name, related, [entry[key_name] for entry in entries]) for name, related, key_name in self._expand]
+
+    def embed(self, entries, loaded):
+        """Embed includes loaded elsewhere ({include name: {key: dumped row}}) into entries, in place."""
+        for name, related, key_name in self._expand:
+            rows = loaded[name]
+            for entry in entries:
+                entry[name] = rows.get(entry[key_name])
+        for key_name in self._hidden:
+            for entry in entries:
+                del entry[key_name]
+        return entries
+
+
+class Include:
+    """
+    A related row embedded with include=: the row whose target_key equals the
+    listed row's foreign_key, dumped by serializer (null when there is none).
+    criteria, if given, returns extra WHERE clauses for a tenant scope (see
+    current_tenant_scope); targets that aren't tenant-scoped models use it to
+    stay within the tenant.
+    """
+
+    def __init__(self, foreign_key, target_key, serializer, criteria=None):
+        self.foreign_key = foreign_key
+        self.target_key = target_key
+        self.serializer = serializer
+        self.criteria = criteria
+
+    def statements(self, keys, tenant_id=None):
+        """Selects of (key, *row) for the distinct non-null keys, INCLUDE_BATCH_SIZE keys each."""
+        keys = sorted(set(keys) - {None})
+        criteria = self.criteria(tenant_id) if self.criteria is not None else ()
+        return [
+            self.serializer.statement(self.target_key).where(
+                self.target_key.in_(keys[start:start + INCLUDE_BATCH_SIZE]), *criteria
+            )
+            for start in range(0, len(keys), INCLUDE_BATCH_SIZE)
+        ]
+
+    def dump(self, rows):
+        """{key: dumped row} of (key, *row) rows fetched with statements()."""
+        return {key: self.serializer.dump_row(row) for key, *row in rows}
+
+    def load(self, keys):
+        """{key: dumped row} for the distinct non-null keys, on the request's session and tenant."""
+        related = {}
+        for statement in self.statements(keys, current_tenant_scope()):
+            related.update(self.dump(db.session.execute(statement)))
+        return related
+
+
+def _python_type(column):
+    try:
+        return column.type.python_type
+    except (AttributeError, NotImplementedError):
+        return None
@@ -0,0 +1,133 @@
+import heapq
+import itertools
+import math
+import threading
+import time
+from collections import Counter
+from flask import g, request, jsonify, current_app
+from app.services.tenancy import request_caller
+
+# Lower runs first. 'user' is accounts without a customer (superadmins)
+PLAN_PRIORITY = {'enterprise': 0, 'user': 0, 'business': 1, 'free': 2, 'anonymous': 2}
+
+
+class AdmissionController:
+    """
+    Bounds the requests one worker serves at a time and orders the rest by plan.
+
+    A plan may only fill its share of the in-flight slots (ADMISSION_PLAN_SHARES),
+    so free traffic always leaves headroom for paying customers. A request that
+    can't start right away waits in a priority queue (FIFO within a priority) for
+    at most ADMISSION_QUEUE_TIMEOUT_SECONDS; if its plan's queue is already full
+    or the wait times out, it is shed with a 503.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._sequence = itertools.count()
+        self.in_flight = 0
+        self.max_in_flight = 32
+        self.shares = {}
+        self.queue_limits = {}
+        self.queue_timeout = 2.0
+        self.queued = Counter()
+        self.admitted = Counter()
+        self.shed = Counter()
+
+    def configure(self, max_in_flight, shares, queue_limits, queue_timeout):
+        self.max_in_flight = max_in_flight
+        self.shares = shares
+        self.queue_limits = queue_limits
+        self.queue_timeout = queue_timeout
+
+    def _capacity(self, plan):
+        return max(1, math.floor(self.max_in_flight * self.shares.get(plan, 1.0)))
+
+    def _admit(self, plan):
+        self.in_flight += 1
+        self.admitted[plan] += 1
+        return True
+
+    def acquire(self, plan):
+        """Take an in-flight slot, waiting if need be. Returns False if the request is shed."""
+        priority = PLAN_PRIORITY.get(plan, max(PLAN_PRIORITY.values()))
+        capacity = self._capacity(plan)
+        with self._cond:
+            # Start now unless a request of the same or higher priority is already waiting
+            if self.in_flight < capacity and not (self._waiting and self._waiting[0][0] <= priority):
+                return self._admit(plan)
+            if self.queued[plan] >= self.queue_limits.get(plan, 0):
+                self.shed[plan] += 1
+                return False
+            entry = (priority, next(self._sequence))
+            heapq.heappush(self._waiting, entry)
+            self.queued[plan] += 1
+            deadline = time.monotonic() + self.queue_timeout
+            try:
+                while True:
+                    if self._waiting[0] == entry and self.in_flight < capacity:
+                        heapq.heappop(self._waiting)
+                        return self._admit(plan)
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._waiting.remove(entry)
+                        heapq.heapify(self._waiting)
+                        self.shed[plan] += 1
+                        return False
+                    self._cond.wait(remaining)
+            finally:
+                self.queued[plan] -= 1
+                # The head of the queue may have changed
+                self._cond.notify_all()
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'in_flight': self.in_flight,
+                'max_in_flight': self.max_in_flight,
+                'queue_depth': sum(self.queued.values()),
+                'queued': {plan: count for plan, count in self.queued.items() if count},
+                'admitted': dict(self.admitted),
+                'shed': dict(self.shed),
+            }
+
+
+admission = AdmissionController()
+
+
+def _admit_request():
+    config = current_app.config
+    if not config['ADMISSION_ENABLED'] or request.endpoint in (None, 'static'):
+        return None
+    if request.endpoint in config['ADMISSION_EXEMPT_ENDPOINTS']:
+        return None
+    _, plan = request_caller()
+    if admission.acquire(plan):
+        g.admitted = True
+        return None
+    response = jsonify({'error': 'Service overloaded, retry later'})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(config['ADMISSION_RETRY_AFTER_SECONDS'])
+    return response
+
+
+def _release_request(exc):
+    if g.pop('admitted', False):
+        admission.release()
+
+
+def init_admission(app):
+    admission.configure(
+        max_in_flight=app.config['ADMISSION_MAX_IN_FLIGHT'],
+        shares=app.config['ADMISSION_PLAN_SHARES'],
+        queue_limits=app.config['ADMISSION_QUEUE_LIMITS'],
+        queue_timeout=app.config['ADMISSION_QUEUE_TIMEOUT_SECONDS'],
+    )
+    app.before_request(_admit_request)
+    app.teardown_request(_release_request)
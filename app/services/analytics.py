@@ -0,0 +1,149 @@
+import numpy as np
+from sqlalchemy import select
+from app.extensions import db
+from app.models.project import Project
+from app.models.sync_counter import SyncCounter
+from app.models.task import Task
+from app.services.cache import LRUCache
+
+CYCLE_TIME_PERCENTILES = (50, 85, 95)
+SECONDS_PER_DAY = 86400.0
+
+# (project_id, version, window, assignee) -> computed analytics
+analytics_cache = LRUCache(maxsize=256, ttl=3600)
+
+
+def project_version(project_id):
+    """
+    Version of a project's data for caching: its tenant's sync change sequence,
+    which every task write bumps. None if the project isn't visible to the caller.
+    """
+    row = db.session.execute(
+        select(Project.customer_id, SyncCounter.seq)
+        .outerjoin(SyncCounter, SyncCounter.customer_id == Project.customer_id)
+        .where(Project.id == project_id)
+    ).first()
+    if row is None:
+        return None
+    return row.seq or 0
+
+
+def task_timestamps(project_id, assignee_user_id=None):
+    """The project's live tasks as columnar arrays, from one query."""
+    statement = select(Task.created_at, Task.start_date, Task.completed_at, Task.assignee_user_id).where(
+        Task.project_id == project_id
+    )
+    if assignee_user_id:
+        statement = statement.where(Task.assignee_user_id == assignee_user_id)
+    rows = db.session.execute(statement).all()
+    created_at, start_date, completed_at, assignees = zip(*rows) if rows else ((), (), (), ())
+    return {
+        'created_at': np.array(created_at, dtype='datetime64[s]'),
+        'start_date': np.array(start_date, dtype='datetime64[D]'),
+        'completed_at': np.array(completed_at, dtype='datetime64[s]'),
+        'assignee': np.array([assignee or '' for assignee in assignees], dtype=object),
+    }
+
+
+def _count_by_day(days, values):
+    """How many of values (NaT ignored) fall on or before each day."""
+    values = values[~np.isnat(values)].astype('datetime64[D]')
+    return np.searchsorted(np.sort(values), days, side='right')
+
+
+def _percentiles(durations):
+    """Summary of durations in seconds, reported in days."""
+    if not durations.size:
+        return {'count': 0, 'mean': None, **{f'p{p}': None for p in CYCLE_TIME_PERCENTILES}}
+    days = durations / SECONDS_PER_DAY
+    values = np.percentile(days, CYCLE_TIME_PERCENTILES)
+    return {
+        'count': int(days.size),
+        'mean': round(float(days.mean()), 2),
+        **{f'p{p}': round(float(v), 2) for p, v in zip(CYCLE_TIME_PERCENTILES, values)},
+    }
+
+
+def compute_analytics(columns, start, end):
+    """
+    Daily burndown, cumulative flow and throughput over [start, end], and
+    cycle/lead time percentiles of tasks completed in that window.
+
+    Tasks have no status history, so flow states come from timestamps: a task
+    is to do from created_at, in progress from start_date and done from
+    completed_at. Tasks completed without a start_date count as started when
+    they were completed (a cycle time of 0); tasks without created_at count as
+    always in scope.
+    """
+    days = np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D') + 1)
+    created = columns['created_at'].astype('datetime64[D]')
+    created = np.where(np.isnat(created), np.datetime64('1970-01-01', 'D'), created)
+    completed = columns['completed_at']
+    completed_day = completed.astype('datetime64[D]')
+    # Started on start_date, but never after completing (nor, without one, before)
+    started = np.fmin(columns['start_date'].astype('datetime64[s]'), completed)
+
+    scope = _count_by_day(days, created)
+    done = _count_by_day(days, completed_day)
+    in_flight = _count_by_day(days, started)
+    done_before = _count_by_day(days[:1] - 1, completed_day)
+
+    finished = ~np.isnat(completed) & (completed_day >= days[0]) & (completed_day <= days[-1])
+    cycle = (completed[finished] - started[finished]).astype('float64')
+    lead = completed[finished] - columns['created_at'][finished]
+    lead = lead[~np.isnat(lead)].astype('float64')
+    assignees = columns['assignee'][finished]
+
+    by_assignee = {}
+    if assignees.size:
+        names, groups = np.unique(assignees, return_inverse=True)
+        for index, name in enumerate(names):
+            in_group = groups == index
+            by_assignee[name or 'unassigned'] = {
+                'completed': int(in_group.sum()),
+                'cycle_time': _percentiles(cycle[in_group]),
+            }
+
+    return {
+        'dates': [str(day) for day in days],
+        'burndown': {
+            'scope': scope.tolist(),
+            'completed': done.tolist(),
+            # Clamped: a task completed before its created_at counts as done before it is in scope
+            'remaining': np.maximum(scope - done, 0).tolist(),
+        },
+        'cumulative_flow': {
+            'todo': np.maximum(scope - in_flight, 0).tolist(),
+            'in_progress': np.maximum(in_flight - done, 0).tolist(),
+            'done': done.tolist(),
+        },
+        'throughput': np.diff(done, prepend=done_before).tolist(),
+        'cycle_time': _percentiles(cycle),
+        'lead_time': _percentiles(lead),
+        'by_assignee': by_assignee,
+    }
+
+
+def project_analytics(project_id, start, end, assignee_user_id=None):
+    """Analytics of a project's tasks, cached until the project's data changes. None if not found."""
+    version = project_version(project_id)
+    if version is None:
+        return None
+    key = (project_id, version, start.isoformat(), end.isoformat(), assignee_user_id)
+    analytics = analytics_cache.get(key)
+    if analytics is None:
+        analytics = {
+            'project_id': project_id,
+            'version': version,
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'assignee_user_id': assignee_user_id,
+            **compute_analytics(task_timestamps(project_id, assignee_user_id), start, end),
+        }
+        analytics_cache.set(key, analytics)
+    return analytics
+
+
+def init_analytics(app):
+    global analytics_cache
+    analytics_cache = LRUCache(maxsize=app.config['ANALYTICS_CACHE_MAXSIZE'], ttl=app.config['ANALYTICS_CACHE_TTL'])
@@ -0,0 +1,34 @@
+from datetime import date
+from sqlalchemy import inspect
+from app.extensions import db
+from app.models.audit_log import AuditLog
+
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, date) else value
+
+
+def changed_fields(instance, keys):
+    """{key: [old, new]} for the given attributes changed on instance since it was loaded."""
+    changes = {}
+    state = inspect(instance)
+    for key in keys:
+        history = state.attrs[key].history
+        if history.has_changes():
+            old = history.deleted[0] if history.deleted else None
+            new = history.added[0] if history.added else None
+            if _json_value(old) != _json_value(new):
+                changes[key] = [_json_value(old), _json_value(new)]
+    return changes
+
+
+def record_audit(action_type, target_type, target_id, actor_user_id=None, customer_id=None, meta=None):
+    """Add an audit log entry to the current transaction."""
+    db.session.add(AuditLog(
+        customer_id=customer_id,
+        actor_user_id=actor_user_id,
+        action_type=action_type,
+        target_type=target_type,
+        target_id=target_id,
+        meta=meta,
+    ))
@@ -0,0 +1,167 @@
+import hashlib
+import os
+import re
+import tempfile
+from datetime import datetime
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.models.file_blob import FileBlob
+from app.services.thumbnails import is_previewable, thumbnail_path
+
+CHUNK_SIZE = 64 * 1024
+# Blob files and the two levels of directories they are fanned out in
+BLOB_NAME = re.compile('[0-9a-f]{64}')
+FAN_OUT_NAME = re.compile('[0-9a-f]{2}')
+
+
+def blob_path(sha256):
+    """Location of a blob on disk, fanned out by hash prefix to keep directories small."""
+    return os.path.join(current_app.config['UPLOAD_FOLDER'], sha256[:2], sha256[2:4], sha256)
+
+
+def store_stream(stream):
+    """
+    Write an upload stream to a temporary file in the upload folder.
+
+    The SHA-256 is computed chunk by chunk while the body is being written, so
+    the upload is never held in memory. Take a reference on the blob
+    (acquire_blob) and then call place_blob to move the file into
+    content-addressed storage. Returns (sha256, size, temporary path).
+    """
+    tmp_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], 'tmp')
+    os.makedirs(tmp_dir, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    return digest.hexdigest(), size, tmp_path
+
+
+def place_blob(sha256, tmp_path):
+    """
+    Move an upload written by store_stream to its blob path, or discard it if
+    the blob's file is already there. Call only once a reference on the blob is
+    held: the GC removes a file only together with an unreferenced row, so the
+    existing file can then be trusted, and a file the GC removed before the
+    reference was taken is written again.
+    """
+    dest = blob_path(sha256)
+    if os.path.exists(dest):
+        os.remove(tmp_path)
+    else:
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        os.replace(tmp_path, dest)
+
+
+def acquire_blob(sha256, size, content_type=None):
+    """
+    Take a reference on a blob, creating its row on first use. Does not commit.
+    Returns True if the blob row was created by this call.
+    """
+    updated = FileBlob.query.filter_by(sha256=sha256).update(
+        {FileBlob.ref_count: FileBlob.ref_count + 1}, synchronize_session=False
+    )
+    if updated:
+        return False
+    try:
+        with db.session.begin_nested():
+            db.session.add(FileBlob(
+                sha256=sha256, size=size, content_type=content_type, ref_count=1,
+                thumbnail_status='pending' if is_previewable(content_type) else 'unsupported'
+            ))
+        return True
+    except IntegrityError:
+        # Another request created the row first; take our reference on it instead
+        FileBlob.query.filter_by(sha256=sha256).update(
+            {FileBlob.ref_count: FileBlob.ref_count + 1}, synchronize_session=False
+        )
+        return False
+
+
+def reference_blob(sha256):
+    """
+    Take a reference on an existing blob, to attach it again by hash. Does not
+    commit. Returns False if there is no row for it or its file is gone (the GC
+    removed it): the content then has to be uploaded again, and the caller must
+    roll back.
+    """
+    referenced = FileBlob.query.filter_by(sha256=sha256).update(
+        {FileBlob.ref_count: FileBlob.ref_count + 1}, synchronize_session=False
+    )
+    return bool(referenced) and os.path.exists(blob_path(sha256))
+
+
+def release_blob(sha256, count=1):
+    """Drop references on a blob. Unreferenced blobs are removed later by the GC job. Does not commit."""
+    FileBlob.query.filter_by(sha256=sha256).update(
+        {FileBlob.ref_count: FileBlob.ref_count - count, FileBlob.released_at: datetime.utcnow()},
+        synchronize_session=False
+    )
+
+
+def delete_blob_if_orphaned(sha256):
+    """
+    Delete an unreferenced blob row and its file. The DELETE is conditional on the
+    refcount still being zero so a concurrent re-attach wins over the collector,
+    and the file is removed before it commits: a reference taken meanwhile waits
+    for the row, finds it gone and writes the file again (see place_blob).
+    Returns True if the blob was removed.
+    """
+    deleted = FileBlob.query.filter(FileBlob.sha256 == sha256, FileBlob.ref_count <= 0).delete(
+        synchronize_session=False
+    )
+    if deleted:
+        _remove_blob_files(blob_path(sha256))
+    db.session.commit()
+    return bool(deleted)
+
+
+def _remove_blob_files(path):
+    for leftover in (path, thumbnail_path(path)):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+
+
+def sweep_unreferenced_files(cutoff):
+    """
+    Remove blob files without a row and temporary uploads, last modified before
+    cutoff: left behind by requests that failed between writing the file and
+    committing its row. Returns the number of files removed.
+    """
+    root = current_app.config['UPLOAD_FOLDER']
+    cutoff = cutoff.timestamp()
+    removed = 0
+    tmp_dir = os.path.join(root, 'tmp')
+    if os.path.isdir(tmp_dir):
+        for entry in os.scandir(tmp_dir):
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+    for first in _fan_out_dirs(root):
+        for second in _fan_out_dirs(first):
+            blobs = {
+                entry.name: entry.path for entry in os.scandir(second)
+                if entry.is_file() and BLOB_NAME.fullmatch(entry.name) and entry.stat().st_mtime < cutoff
+            }
+            if not blobs:
+                continue
+            referenced = {sha256 for (sha256,) in db.session.query(FileBlob.sha256).filter(FileBlob.sha256.in_(blobs))}
+            for sha256 in blobs.keys() - referenced:
+                _remove_blob_files(blobs[sha256])
+                removed += 1
+    return removed
+
+
+def _fan_out_dirs(path):
+    if not os.path.isdir(path):
+        return []
+    return [entry.path for entry in os.scandir(path) if entry.is_dir() and FAN_OUT_NAME.fullmatch(entry.name)]
@@ -0,0 +1,279 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from sqlalchemy import event, inspect
+from app.extensions import db
+from app.models.customer import Customer
+from app.models.user import User
+
+try:
+    import redis
+except ImportError:  # Redis tier is optional
+    redis = None
+
+# Models whose rows are cached by primary key. Keep this to rows that are read on
+# nearly every request and written rarely.
+CACHED_MODELS = {'customer': Customer, 'user': User}
+
+# Columns kept in the cache per model; the rest (password hashes, invitation
+# tokens) are left None on cached instances and never reach Redis
+CACHED_COLUMNS = {
+    'customer': ('id', 'name', 'slug', 'domain', 'admin_user_id', 'subdomain_url', 'plan_type', 'status', 'version_id'),
+    'user': ('id', 'customer_id', 'email', 'name', 'role', 'status', 'last_login_at'),
+}
+
+
+class LRUCache:
+    """Thread-safe LRU with a per-entry TTL, local to one worker process."""
+
+    def __init__(self, maxsize=1024, ttl=30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RecordCache:
+    """
+    Two-tier cache of model rows keyed by primary key: a per-worker LRU in front
+    of an optional shared Redis. Entries hold plain column values, never ORM
+    instances, so nothing cached is bound to a session.
+
+    Invalidations bump a generation (a per-worker counter, and a per-key counter
+    in Redis). A reader takes generation(key) before loading the row and passes
+    it to set(), which drops the entry if the key was invalidated in between, so
+    a read racing a commit can't put the old row back after its invalidation.
+    """
+
+    def __init__(self):
+        self.local = LRUCache()
+        self.redis = None
+        self.redis_ttl = 300
+        self.prefix = 'pmm:record:'
+        self._generation = 0
+        self._generation_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {'local_hits': 0, 'redis_hits': 0, 'misses': 0, 'invalidations': 0, 'redis_errors': 0}
+
+    def configure(self, maxsize, local_ttl, redis_url=None, redis_ttl=300):
+        self.local = LRUCache(maxsize=maxsize, ttl=local_ttl)
+        self.redis_ttl = redis_ttl
+        self.redis = redis.Redis.from_url(redis_url, socket_timeout=0.25) if redis_url and redis else None
+
+    def _count(self, stat):
+        with self._stats_lock:
+            self.stats[stat] += 1
+
+    def get(self, key):
+        value = self.local.get(key)
+        if value is not None:
+            self._count('local_hits')
+            return value
+        if self.redis is not None:
+            try:
+                raw = self.redis.get(self.prefix + key)
+            except redis.RedisError:
+                self._count('redis_errors')
+                raw = None
+            if raw is not None:
+                value = json.loads(raw)
+                self.local.set(key, value)
+                self._count('redis_hits')
+                return value
+        self._count('misses')
+        return None
+
+    def generation(self, key):
+        """Token to pass to set() for a value about to be read from the database."""
+        redis_generation = None
+        if self.redis is not None:
+            try:
+                redis_generation = self.redis.get(self._generation_key(key)) or b'0'
+            except redis.RedisError:
+                self._count('redis_errors')
+        return self._generation, redis_generation
+
+    def set(self, key, value, generation=None):
+        """
+        Cache value under key. With a generation from generation(), nothing is
+        stored if key has been invalidated since (and Redis is skipped if the
+        generation couldn't be read from it).
+        """
+        local_generation, redis_generation = generation or (None, None)
+        with self._generation_lock:
+            if generation is not None and local_generation != self._generation:
+                return
+            self.local.set(key, value)
+        if self.redis is None or (generation is not None and redis_generation is None):
+            return
+        try:
+            with self.redis.pipeline() as pipe:
+                if generation is not None:
+                    # The write only goes through if no invalidation bumps the generation meanwhile
+                    pipe.watch(self._generation_key(key))
+                    if (pipe.get(self._generation_key(key)) or b'0') != redis_generation:
+                        return
+                    pipe.multi()
+                pipe.set(self.prefix + key, json.dumps(value), ex=self.redis_ttl)
+                pipe.execute()
+        except redis.WatchError:
+            pass
+        except redis.RedisError:
+            self._count('redis_errors')
+
+    def invalidate(self, keys):
+        with self._generation_lock:
+            self._generation += 1
+            for key in keys:
+                self.local.delete(key)
+        if self.redis is not None and keys:
+            try:
+                with self.redis.pipeline() as pipe:
+                    for key in keys:
+                        pipe.incr(self._generation_key(key))
+                        pipe.expire(self._generation_key(key), self.redis_ttl)
+                    pipe.delete(*[self.prefix + key for key in keys])
+                    pipe.execute()
+            except redis.RedisError:
+                self._count('redis_errors')
+        with self._stats_lock:
+            self.stats['invalidations'] += len(keys)
+
+    def snapshot(self):
+        with self._stats_lock:
+            stats = dict(self.stats)
+        lookups = stats['local_hits'] + stats['redis_hits'] + stats['misses']
+        stats['hit_ratio'] = round((stats['local_hits'] + stats['redis_hits']) / lookups, 4) if lookups else None
+        stats['local_size'] = len(self.local)
+        stats['redis_enabled'] = self.redis is not None
+        return stats
+
+    def _generation_key(self, key):
+        return f'{self.prefix}gen:{key}'
+
+
+record_cache = RecordCache()
+
+
+def _cache_key(name, pk):
+    return f'{name}:{pk}'
+
+
+def _model_name(instance):
+    for name, model in CACHED_MODELS.items():
+        if isinstance(instance, model):
+            return name
+    return None
+
+
+def _encode(name, instance):
+    data = {}
+    for column in CACHED_COLUMNS[name]:
+        value = getattr(instance, column)
+        data[column] = value.isoformat() if isinstance(value, datetime) else value
+    return data
+
+
+def _decode(name, model, data):
+    """Rebuild a transient (session-less) instance from cached column values."""
+    columns = inspect(model).columns
+    values = {}
+    for column in CACHED_COLUMNS[name]:
+        value = data.get(column)
+        if value is not None and isinstance(columns[column].type, db.DateTime):
+            value = datetime.fromisoformat(value)
+        values[column] = value
+    return model(**values)
+
+
+def cached_get(model, pk):
+    """
+    Read-only lookup of a Customer or User by id through the cache.
+
+    The returned instance is not attached to the session and only has the
+    CACHED_COLUMNS set: use it for reads only, and load the row with
+    Model.query.get() when it is going to be modified or its other columns
+    (password_hash, invitation_token) are needed.
+    """
+    if pk is None:
+        return None
+    name = next(name for name, cached in CACHED_MODELS.items() if cached is model)
+    key = _cache_key(name, pk)
+    data = record_cache.get(key)
+    if data is not None:
+        return _decode(name, model, data)
+    generation = record_cache.generation(key)
+    instance = db.session.get(model, pk)
+    if instance is None:
+        return None
+    data = _encode(name, instance)
+    record_cache.set(key, data, generation)
+    # Same columns whether it came from the cache or not
+    return _decode(name, model, data)
+
+
+def _collect_invalidations(session, flush_context, instances):
+    # before_flush still sees the dirty/deleted sets; entries are only dropped
+    # once the transaction commits so a rollback leaves the cache untouched
+    pending = session.info.setdefault('record_cache_invalidations', set())
+    for instance in list(session.dirty) + list(session.deleted):
+        name = _model_name(instance)
+        if name is not None:
+            pending.add(_cache_key(name, inspect(instance).identity[0]))
+
+
+def _apply_invalidations(session):
+    pending = session.info.pop('record_cache_invalidations', None)
+    if pending:
+        record_cache.invalidate(pending)
+
+
+def _discard_invalidations(session, previous_transaction):
+    # Savepoint rollbacks (begin_nested) don't end the outer transaction
+    if previous_transaction.parent is None:
+        session.info.pop('record_cache_invalidations', None)
+
+
+def init_cache(app):
+    record_cache.configure(
+        maxsize=app.config['RECORD_CACHE_MAXSIZE'],
+        local_ttl=app.config['RECORD_CACHE_LOCAL_TTL'],
+        redis_url=app.config['RECORD_CACHE_REDIS_URL'],
+        redis_ttl=app.config['RECORD_CACHE_REDIS_TTL'],
+    )
+    if not event.contains(db.session, 'before_flush', _collect_invalidations):
+        event.listen(db.session, 'before_flush', _collect_invalidations)
+        event.listen(db.session, 'after_commit', _apply_invalidations)
+        event.listen(db.session, 'after_soft_rollback', _discard_invalidations)
@@ -0,0 +1,176 @@
+import threading
+import zlib
+from collections import Counter
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # br is only offered when installed
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # zstd is only offered when installed
+    zstandard = None
+
+COMPRESSIBLE_MIMETYPES = frozenset((
+    'application/json', 'application/x-ndjson', 'application/javascript', 'application/xml', 'image/svg+xml',
+))
+
+
+def gzip_compressor(level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+
+def brotli_compressor(quality):
+    compressor = brotli.Compressor(quality=quality)
+    return compressor.process, compressor.flush, compressor.finish
+
+
+def zstd_compressor(level):
+    compressor = zstandard.ZstdCompressor(level=level).compressobj()
+    return compressor.compress, lambda: compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK), compressor.flush
+
+
+# Content-Encoding -> factory of (compress, flush, finish) for one response, given a level
+COMPRESSORS = {'gzip': gzip_compressor}
+if brotli is not None:
+    COMPRESSORS['br'] = brotli_compressor
+if zstandard is not None:
+    COMPRESSORS['zstd'] = zstd_compressor
+
+
+def compress(data, encoding, level):
+    """data compressed in one go with the given Content-Encoding."""
+    compress_chunk, _, finish = COMPRESSORS[encoding](level)
+    return compress_chunk(data) + finish()
+
+
+def _compress_stream(source, encoding, level, flush_each_chunk, stats):
+    """
+    Compress a streamed body as it is produced. The compressor buffers across
+    chunks unless flush_each_chunk (event streams, where each event has to
+    reach the client as soon as it is sent).
+    """
+    compress_chunk, flush, finish = COMPRESSORS[encoding](level)
+    try:
+        for chunk in source:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            data = compress_chunk(chunk)
+            if flush_each_chunk:
+                data += flush()
+            stats.add(encoding, len(chunk), len(data))
+            if data:
+                yield data
+        data = finish()
+        stats.add(encoding, 0, len(data))
+        yield data
+    finally:
+        # Closing the original iterable runs its cleanup (e.g. event unsubscribes)
+        close = getattr(source, 'close', None)
+        if close is not None:
+            close()
+
+
+class CompressionStats:
+    """Per-worker bytes before and after compression, per encoding, for /api/metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = Counter()
+
+    def add(self, encoding, raw, sent):
+        with self._lock:
+            self.counts[f'{encoding}_bytes_in'] += raw
+            self.counts[f'{encoding}_bytes_out'] += sent
+
+    def count(self, stat):
+        with self._lock:
+            self.counts[stat] += 1
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.counts)
+        stats['encodings'] = sorted(COMPRESSORS)
+        return stats
+
+
+compression_stats = CompressionStats()
+
+
+class ResponseCompressor:
+    """
+    after_request hook: conditional GETs, then compression.
+
+    GET responses without an ETag get a weak one hashed from the body, and
+    If-None-Match is answered with 304 (ETags set by the view, like the row
+    versions, are honoured as they are). Bodies of at least min_size bytes, and
+    all streamed bodies, are then compressed with the client's preferred
+    encoding among `encodings` (ties go to the order of `encodings`).
+    """
+
+    def __init__(self, encodings, levels, min_size, conditional_get=True):
+        self.encodings = [encoding for encoding in encodings if encoding in COMPRESSORS]
+        self.levels = levels
+        self.min_size = min_size
+        self.conditional_get = conditional_get
+
+    def __call__(self, response):
+        if response.direct_passthrough:
+            # send_file responses stream from disk and handle their own validators
+            return response
+        compressible = bool(self.encodings) and _compressible(response)
+        if compressible:
+            # Before the 304 below too: caches must not reuse a 304 across encodings
+            response.vary.add('Accept-Encoding')
+        if self.conditional_get and request.method in ('GET', 'HEAD') and response.status_code == 200 \
+                and not response.is_streamed:
+            if 'ETag' not in response.headers:
+                response.add_etag(weak=True)
+            response.make_conditional(request)
+            if response.status_code == 304:
+                compression_stats.count('not_modified')
+                return response
+        if not compressible:
+            return response
+        if request.method == 'HEAD' or response.status_code in (204, 304) or 'Content-Encoding' in response.headers:
+            return response
+        encoding = request.accept_encodings.best_match(self.encodings)
+        if encoding is None:
+            return response
+        level = self.levels[encoding]
+        if response.is_streamed:
+            source = response.response
+            response.response = _compress_stream(
+                source, encoding, level, response.mimetype == 'text/event-stream', compression_stats
+            )
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            compressed = compress(data, encoding, level)
+            compression_stats.add(encoding, len(data), len(compressed))
+            response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+
+def _compressible(response):
+    mimetype = response.mimetype or ''
+    return mimetype.startswith('text/') or mimetype.endswith('+json') or mimetype in COMPRESSIBLE_MIMETYPES
+
+
+def init_compression(app):
+    app.after_request(ResponseCompressor(
+        encodings=app.config['COMPRESSION_ENCODINGS'] if app.config['COMPRESSION_ENABLED'] else (),
+        levels={
+            'gzip': app.config['COMPRESSION_GZIP_LEVEL'],
+            'br': app.config['COMPRESSION_BROTLI_QUALITY'],
+            'zstd': app.config['COMPRESSION_ZSTD_LEVEL'],
+        },
+        min_size=app.config['COMPRESSION_MIN_SIZE'],
+        conditional_get=app.config['CONDITIONAL_GET_ENABLED'],
+    ))
@@ -0,0 +1,58 @@
+from datetime import date, datetime
+from flask import request, jsonify, current_app
+
+
+def etag_value(instance):
+    """Entity tag of a versioned row (see version_id_col on the model): its version."""
+    return str(instance.version_id)
+
+
+def with_etag(response, instance):
+    response.set_etag(etag_value(instance))
+    return response
+
+
+def precondition_failed(instance):
+    """
+    The response refusing a write to instance, or None if it may go ahead.
+
+    An If-Match header has to name the row's current ETag (412 otherwise);
+    without one the write goes ahead unless REQUIRE_IF_MATCH is set (428).
+    """
+    if not request.if_match:
+        if current_app.config['REQUIRE_IF_MATCH']:
+            return jsonify({'error': 'If-Match header required'}), 428
+        return None
+    if not request.if_match.contains(etag_value(instance)):
+        return with_etag(jsonify({'error': 'Resource has been modified'}), instance), 412
+    return None
+
+
+def stale_write():
+    """
+    Response for a write that lost a race: the row changed between being read
+    and the UPDATE, which then matched no row at the version it was read at.
+    """
+    if request.if_match:
+        return jsonify({'error': 'Resource has been modified'}), 412
+    return jsonify({'error': 'Resource was modified by a concurrent request, retry'}), 409
+
+
+def parse_date(value):
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def parse_datetime(value):
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def apply_patch(instance, data, fields):
+    """
+    Set the fields present in data on instance, leaving the rest untouched.
+    fields maps each writable field to a parser (or None); a parser's
+    ValueError propagates. Values equal to the stored one are not written.
+    """
+    for field, parse in fields.items():
+        if field in data:
+            value = data[field]
+            setattr(instance, field, parse(value) if parse and value is not None else value)
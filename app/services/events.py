@@ -0,0 +1,179 @@
+import json
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+
+try:
+    import redis
+except ImportError:  # Redis fan-out is optional
+    redis = None
+
+REDIS_CHANNEL = 'pmm:events'
+REDIS_SEQUENCE_KEY = 'pmm:events:seq'
+
+
+class Subscription:
+    """One open event stream. The queue is bounded so a slow client can't grow memory."""
+
+    def __init__(self, project_id, maxsize):
+        self.project_id = project_id
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def offer(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            # The client has fallen behind; its stream tells it to resync and closes
+            self.overflowed = True
+
+
+class _Ring:
+    """Recent events of one project, remembering the newest id that has been evicted."""
+
+    def __init__(self, size):
+        self.events = deque(maxlen=size)
+        self.evicted = 0
+
+    def append(self, event):
+        if len(self.events) == self.events.maxlen:
+            self.evicted = self.events[0]['id']
+        self.events.append(event)
+
+
+class EventBus:
+    """
+    Per-project pub/sub for board change events.
+
+    Every worker keeps a bounded ring of recent events per project, which lets a
+    reconnecting client resume from Last-Event-ID. With a Redis URL configured,
+    events are published through Redis pub/sub and every worker (including the
+    publishing one) receives them on a listener thread, so subscribers on any
+    worker see all changes; event ids then come from a shared Redis counter.
+
+    Ids never go backwards on a worker. Without Redis (or while it is down)
+    they continue from the newest id seen, or from the current time in
+    milliseconds if that is larger, so a restarted worker doesn't reissue ids
+    clients already hold; once Redis is back its counter is moved past them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._rings = OrderedDict()
+        self._last_id = 0
+        self.ring_size = 256
+        self.max_projects = 1000
+        self.queue_size = 100
+        self.redis = None
+        self._listener = None
+
+    def configure(self, ring_size, max_projects, queue_size, redis_url=None):
+        self.ring_size = ring_size
+        self.max_projects = max_projects
+        self.queue_size = queue_size
+        if redis_url and redis and self.redis is None:
+            self.redis = redis.Redis.from_url(redis_url)
+            self._listener = threading.Thread(target=self._listen, name='event-bus-listener', daemon=True)
+            self._listener.start()
+
+    def subscribe(self, project_id):
+        subscription = Subscription(project_id, self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(project_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.project_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.project_id]
+
+    def replay(self, project_id, last_event_id):
+        """
+        Events after last_event_id still held in the ring. Returns (events, complete);
+        complete is False when some events the client missed are no longer buffered.
+        """
+        with self._lock:
+            ring = self._rings.get(project_id)
+            if ring is None:
+                return [], False
+            events = list(ring.events)
+            evicted = ring.evicted
+        return [event for event in events if event['id'] > last_event_id], last_event_id >= evicted
+
+    def publish(self, project_id, event_type, data):
+        if not project_id:
+            return
+        if self.redis is not None:
+            try:
+                event_id = self.redis.incr(REDIS_SEQUENCE_KEY)
+                if event_id <= self._last_id:
+                    event_id = self.redis.incrby(REDIS_SEQUENCE_KEY, self._last_id - event_id + 1)
+                event = {'id': event_id, 'project_id': project_id, 'type': event_type, 'data': data}
+                self.redis.publish(REDIS_CHANNEL, json.dumps(event, default=str))
+                return
+            except redis.RedisError:
+                pass  # Fall back to delivering to this worker's subscribers only
+        event = {'id': self._next_local_id(), 'project_id': project_id, 'type': event_type, 'data': data}
+        self._dispatch(event)
+
+    def _next_local_id(self):
+        with self._lock:
+            self._last_id = max(self._last_id + 1, int(time.time() * 1000))
+            return self._last_id
+
+    def _dispatch(self, event):
+        project_id = event['project_id']
+        with self._lock:
+            self._last_id = max(self._last_id, event['id'])
+            ring = self._rings.get(project_id)
+            if ring is None:
+                ring = self._rings[project_id] = _Ring(self.ring_size)
+                while len(self._rings) > self.max_projects:
+                    self._rings.popitem(last=False)
+            else:
+                self._rings.move_to_end(project_id)
+            ring.append(event)
+            subscribers = list(self._subscribers.get(project_id, ()))
+        for subscription in subscribers:
+            subscription.offer(event)
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(REDIS_CHANNEL)
+                for message in pubsub.listen():
+                    self._dispatch(json.loads(message['data']))
+            except redis.RedisError:
+                threading.Event().wait(1)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'projects_with_subscribers': len(self._subscribers),
+                'subscribers': sum(len(subscribers) for subscribers in self._subscribers.values()),
+                'buffered_projects': len(self._rings),
+                'redis_enabled': self.redis is not None,
+            }
+
+
+event_bus = EventBus()
+
+
+def publish_event(project_id, event_type, data):
+    """Announce a change on a project board. Call after the change has been committed."""
+    event_bus.publish(project_id, event_type, data)
+
+
+def init_events(app):
+    event_bus.configure(
+        ring_size=app.config['EVENTS_RING_SIZE'],
+        max_projects=app.config['EVENTS_MAX_PROJECTS'],
+        queue_size=app.config['EVENTS_SUBSCRIBER_QUEUE_SIZE'],
+        redis_url=app.config['EVENTS_REDIS_URL'],
+    )
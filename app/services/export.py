@@ -0,0 +1,118 @@
+import csv
+import io
+import zipfile
+from flask import current_app
+from app.models.project import Project
+from app.models.task import Task
+from app.models.comment import Comment
+from app.models.file_attachment import FileAttachment
+from app.schemas.serializer import RowSerializer
+
+EXPORT_BATCH_SIZE = 1000
+# Flush streamed output to the client/file in chunks of about this many bytes
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+# Exported record types, in dependency order (parents before children)
+EXPORT_MODELS = (
+    ('project', Project),
+    ('task', Task),
+    ('comment', Comment),
+    ('file', FileAttachment),
+)
+
+EXPORT_SERIALIZERS = {
+    name: RowSerializer([(column.key, getattr(model, column.key)) for column in model.__table__.columns])
+    for name, model in EXPORT_MODELS
+}
+
+
+def _sections(customer_id):
+    """
+    Yield (type name, serializer, rows) per record type. Rows are fetched in
+    batches of EXPORT_BATCH_SIZE through yield_per, which uses a server-side
+    cursor on PostgreSQL, so a tenant of any size is exported in constant memory.
+    """
+    for name, model in EXPORT_MODELS:
+        serializer = EXPORT_SERIALIZERS[name]
+        query = serializer.select(model.query.filter(model.customer_id == customer_id))
+        yield name, serializer, query.yield_per(EXPORT_BATCH_SIZE)
+
+
+def iter_ndjson(customer_id, progress=None):
+    """
+    Stream a tenant's data as newline-delimited JSON, one record per line:
+    {"type": "task", "data": {...}}. Rows written are counted into progress['rows'].
+    """
+    dumps = current_app.json.dumps
+    chunk = []
+    chunk_size = 0
+    rows = 0
+    for name, serializer, query in _sections(customer_id):
+        for row in query:
+            line = dumps({'type': name, 'data': serializer.dump_row(row)}) + '\n'
+            chunk.append(line)
+            chunk_size += len(line)
+            rows += 1
+            if chunk_size >= EXPORT_CHUNK_SIZE:
+                yield ''.join(chunk).encode()
+                chunk = []
+                chunk_size = 0
+    if chunk:
+        yield ''.join(chunk).encode()
+    if progress is not None:
+        progress['rows'] = rows
+
+
+class _StreamBuffer(io.RawIOBase):
+    """Unseekable sink zipfile writes into; its contents are drained as they are produced."""
+
+    def __init__(self):
+        self._chunks = []
+        self.size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        self.size = 0
+        return data
+
+
+def iter_csv_zip(customer_id, progress=None):
+    """
+    Stream a zip archive holding one CSV per record type (projects.csv, tasks.csv, ...).
+    zipfile supports unseekable outputs, so the archive is built on the fly.
+    """
+    buffer = _StreamBuffer()
+    rows = 0
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, serializer, query in _sections(customer_id):
+            with archive.open(f'{name}s.csv', 'w', force_zip64=True) as entry:
+                text = io.TextIOWrapper(entry, encoding='utf-8', newline='')
+                writer = csv.writer(text)
+                writer.writerow(serializer.names)
+                for row in query:
+                    writer.writerow(serializer.dump_row(row).values())
+                    rows += 1
+                    if buffer.size >= EXPORT_CHUNK_SIZE:
+                        text.flush()
+                        yield buffer.drain()
+                text.flush()
+                text.detach()
+            yield buffer.drain()
+    yield buffer.drain()
+    if progress is not None:
+        progress['rows'] = rows
+
+
+EXPORT_FORMATS = {
+    'ndjson': (iter_ndjson, 'application/x-ndjson', 'ndjson'),
+    'csv': (iter_csv_zip, 'application/zip', 'zip'),
+}
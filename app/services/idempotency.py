@@ -0,0 +1,226 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter
+from functools import wraps
+from flask import request, jsonify, current_app
+from app.services.cache import LRUCache
+from app.services.tenancy import request_claims
+
+try:
+    import redis
+except ImportError:  # Redis backend is optional
+    redis = None
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+REDIS_KEY_PREFIX = 'pmm:idem:'
+# Redis value of a key whose first request is still running
+IN_FLIGHT = b'in-flight'
+
+
+def request_fingerprint():
+    """Hash of what the request asks for, so a key reused for a different request is caught."""
+    digest = hashlib.sha256(f'{request.method} {request.path}'.encode())
+    if request.files:
+        digest.update(json.dumps(sorted(request.form.items(multi=True))).encode())
+        for field, upload in sorted(request.files.items(multi=True)):
+            upload.stream.seek(0, os.SEEK_END)
+            size = upload.stream.tell()
+            upload.stream.seek(0)
+            digest.update(f'{field}:{upload.filename}:{upload.mimetype}:{size}'.encode())
+    else:
+        digest.update(request.get_data(cache=True))
+    return digest.hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Responses of requests sent with an Idempotency-Key, so retries replay them.
+
+    Completed responses live in a per-worker LRU and, when IDEMPOTENCY_REDIS_URL
+    is set, in Redis for every worker, for IDEMPOTENCY_TTL_SECONDS. While the
+    first request with a key runs, the key is claimed (locally, and with SET NX
+    in Redis); duplicates wait up to IDEMPOTENCY_WAIT_SECONDS for its response.
+    """
+
+    def __init__(self):
+        self.local = LRUCache(maxsize=10000, ttl=86400)
+        self.redis = None
+        self.ttl = 86400
+        self.wait_seconds = 10.0
+        self.lock_seconds = 60
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self.stats = Counter()
+
+    def configure(self, maxsize, ttl, wait_seconds, lock_seconds, redis_url=None):
+        self.local = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.ttl = ttl
+        self.wait_seconds = wait_seconds
+        self.lock_seconds = lock_seconds
+        self.redis = redis.Redis.from_url(redis_url, socket_timeout=0.25) if redis_url and redis else None
+
+    def count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _get(self, key):
+        record = self.local.get(key)
+        if record is not None or self.redis is None:
+            return record
+        try:
+            raw = self.redis.get(REDIS_KEY_PREFIX + key)
+        except redis.RedisError:
+            self.count('redis_errors')
+            return None
+        if raw is None or raw == IN_FLIGHT:
+            return None
+        record = json.loads(raw)
+        record['body'] = base64.b64decode(record['body'])
+        self.local.set(key, record)
+        return record
+
+    def _claim(self, key):
+        with self._lock:
+            if key in self._in_flight:
+                return False
+            self._in_flight[key] = threading.Event()
+        if self.redis is not None:
+            try:
+                if self.redis.set(REDIS_KEY_PREFIX + key, IN_FLIGHT, nx=True, ex=self.lock_seconds):
+                    return True
+            except redis.RedisError:
+                # Degrade to deduplicating within this worker only
+                self.count('redis_errors')
+                return True
+            self._release(key)
+            return False
+        return True
+
+    def _release(self, key):
+        with self._lock:
+            event = self._in_flight.pop(key, None)
+        if event is not None:
+            event.set()
+
+    def begin(self, key, fingerprint):
+        """
+        'run' if this request should execute (the key is now claimed), else
+        ('replay', record), 'mismatch' when the key was used for another
+        request, or 'in_flight' if the first request didn't finish in time.
+        """
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            record = self._get(key)
+            if record is not None:
+                return ('replay', record) if record['fingerprint'] == fingerprint else ('mismatch', None)
+            if self._claim(key):
+                return 'run', None
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return 'in_flight', None
+            self.count('waited')
+            with self._lock:
+                event = self._in_flight.get(key)
+            # Same worker: wake when it finishes; other workers: poll Redis
+            if event is not None:
+                event.wait(remaining)
+            else:
+                time.sleep(min(0.05, remaining))
+
+    def finish(self, key, record):
+        self.local.set(key, record)
+        if self.redis is not None:
+            try:
+                self.redis.set(REDIS_KEY_PREFIX + key,
+                               json.dumps({**record, 'body': base64.b64encode(record['body']).decode()}), ex=self.ttl)
+            except redis.RedisError:
+                self.count('redis_errors')
+        self._release(key)
+
+    def abandon(self, key):
+        """Drop the claim without a response (the handler failed), so a retry runs again."""
+        if self.redis is not None:
+            try:
+                self.redis.delete(REDIS_KEY_PREFIX + key)
+            except redis.RedisError:
+                self.count('redis_errors')
+        self._release(key)
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['in_flight'] = len(self._in_flight)
+        stats['local_size'] = len(self.local)
+        stats['redis_enabled'] = self.redis is not None
+        return stats
+
+
+idempotency_store = IdempotencyStore()
+
+
+def idempotent(view):
+    """
+    Honour an Idempotency-Key header on a POST view: the first request runs and
+    its response (unless a 5xx) is stored; repeats of the same request with the
+    same key get that response back, marked Idempotent-Replayed, without
+    running the view. Keys are scoped to the caller and the endpoint.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return view(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return jsonify({'error': f'{HEADER} must be at most {MAX_KEY_LENGTH} characters'}), 400
+        caller = request_claims().get('sub') or request.remote_addr
+        scoped_key = f'{caller}:{request.endpoint}:{key}'
+        fingerprint = request_fingerprint()
+        outcome, record = idempotency_store.begin(scoped_key, fingerprint)
+        if outcome == 'replay':
+            idempotency_store.count('replayed')
+            response = current_app.response_class(record['body'], status=record['status'], mimetype=record['mimetype'])
+            if record.get('location'):
+                response.headers['Location'] = record['location']
+            response.headers['Idempotent-Replayed'] = 'true'
+            return response
+        if outcome == 'mismatch':
+            idempotency_store.count('mismatched')
+            return jsonify({'error': f'{HEADER} was already used for a different request'}), 422
+        if outcome == 'in_flight':
+            idempotency_store.count('conflicts')
+            response = jsonify({'error': f'A request with this {HEADER} is still being processed'})
+            response.status_code = 409
+            response.headers['Retry-After'] = '1'
+            return response
+        try:
+            response = current_app.make_response(view(*args, **kwargs))
+        except BaseException:
+            idempotency_store.abandon(scoped_key)
+            raise
+        if response.status_code >= 500 or response.is_streamed:
+            idempotency_store.abandon(scoped_key)
+            return response
+        idempotency_store.finish(scoped_key, {
+            'fingerprint': fingerprint,
+            'status': response.status_code,
+            'mimetype': response.mimetype,
+            'location': response.headers.get('Location'),
+            'body': response.get_data(),
+        })
+        return response
+    return wrapper
+
+
+def init_idempotency(app):
+    idempotency_store.configure(
+        maxsize=app.config['IDEMPOTENCY_MAX_KEYS'],
+        ttl=app.config['IDEMPOTENCY_TTL_SECONDS'],
+        wait_seconds=app.config['IDEMPOTENCY_WAIT_SECONDS'],
+        lock_seconds=app.config['IDEMPOTENCY_LOCK_SECONDS'],
+        redis_url=app.config['IDEMPOTENCY_REDIS_URL'],
+    )
@@ -0,0 +1,101 @@
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.models.comment import Comment
+from app.models.notification import Notification
+from app.models.notification_counter import NotificationCounter
+from app.models.project import Project
+from app.models.task import Task
+from app.models.user import User
+
+
+def task_watchers(task_id):
+    """Users following a task: its assignee, its project's owner and everyone who commented on it."""
+    watchers = set()
+    row = db.session.execute(
+        select(Task.assignee_user_id, Project.owner_user_id)
+        .outerjoin(Project, Project.id == Task.project_id)
+        .where(Task.id == task_id)
+    ).first()
+    if row is not None:
+        watchers.update(row)
+    watchers.update(db.session.scalars(select(Comment.author_user_id).where(Comment.task_id == task_id).distinct()))
+    watchers.discard(None)
+    return watchers
+
+
+def _add_unread(connection, user_ids, delta):
+    """Add delta to the unread counters of user_ids, creating missing counters."""
+    counters = NotificationCounter.__table__
+    connection.execute(
+        counters.update().where(counters.c.user_id.in_(user_ids)).values(unread=counters.c.unread + delta)
+    )
+    existing = set(connection.execute(select(counters.c.user_id).where(counters.c.user_id.in_(user_ids))).scalars())
+    for user_id in user_ids:
+        if user_id in existing:
+            continue
+        try:
+            with connection.begin_nested():
+                connection.execute(counters.insert().values(user_id=user_id, unread=max(delta, 0)))
+        except IntegrityError:
+            connection.execute(
+                counters.update().where(counters.c.user_id == user_id).values(unread=counters.c.unread + delta)
+            )
+
+
+def notify(user_ids, kind, customer_id, task_id=None, project_id=None, actor_user_id=None, message=None):
+    """
+    Fan a notification out to each user's inbox, in the caller's transaction.
+    Rows are bulk-inserted NOTIFICATION_BATCH_SIZE at a time and each batch
+    bumps its recipients' unread counters. The actor is never notified, and
+    neither are users outside customer_id: their inbox is scoped to their own
+    tenant, so the row would count towards the badge but never be listed.
+    """
+    recipients = sorted(set(user_ids) - {actor_user_id, None})
+    if not recipients:
+        return 0
+    recipients = sorted(db.session.scalars(
+        select(User.id).where(User.id.in_(recipients), User.customer_id == customer_id)
+    ))
+    if not recipients:
+        return 0
+    batch_size = current_app.config['NOTIFICATION_BATCH_SIZE']
+    connection = db.session.connection()
+    now = datetime.utcnow()
+    for start in range(0, len(recipients), batch_size):
+        batch = recipients[start:start + batch_size]
+        connection.execute(Notification.__table__.insert(), [
+            {
+                'user_id': user_id, 'customer_id': customer_id, 'kind': kind, 'task_id': task_id,
+                'project_id': project_id, 'actor_user_id': actor_user_id, 'message': message, 'created_at': now,
+            }
+            for user_id in batch
+        ])
+        _add_unread(connection, batch, 1)
+    return len(recipients)
+
+
+def notify_task_watchers(task_id, kind, customer_id, actor_user_id=None, message=None):
+    project_id = db.session.query(Task.project_id).filter_by(id=task_id).scalar()
+    return notify(task_watchers(task_id), kind, customer_id, task_id=task_id, project_id=project_id,
+                  actor_user_id=actor_user_id, message=message)
+
+
+def unread_count(user_id):
+    return db.session.execute(
+        select(NotificationCounter.unread).where(NotificationCounter.user_id == user_id)
+    ).scalar() or 0
+
+
+def mark_read(user_id, ids=None):
+    """Mark the user's unread notifications (all, or those in ids) read. Returns how many changed."""
+    notifications = Notification.__table__
+    statement = update(notifications).where(notifications.c.user_id == user_id, notifications.c.read_at.is_(None))
+    if ids is not None:
+        statement = statement.where(notifications.c.id.in_(ids))
+    marked = db.session.execute(statement.values(read_at=datetime.utcnow())).rowcount
+    if marked:
+        _add_unread(db.session.connection(), [user_id], -marked)
+    return marked
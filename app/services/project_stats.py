@@ -0,0 +1,201 @@
+from collections import Counter
+from datetime import date, timedelta
+from sqlalchemy import event, select, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import attributes
+from app.extensions import db
+from app.models.project import Project
+from app.models.project_stat import ProjectStat
+from app.models.task import Task
+
+# Dimensions counted per project, over its live tasks:
+#   status, priority   the task's value
+#   assignee           assignee_user_id, '' when unassigned
+#   completed_on       day of completed_at (YYYY-MM-DD)
+#   open_due           due date of tasks not done, so overdue = buckets before today
+STAT_DIMENSIONS = ('status', 'priority', 'assignee', 'completed_on', 'open_due')
+
+# Task columns a task's contribution depends on
+TRACKED_ATTRIBUTES = ('customer_id', 'project_id', 'status', 'priority', 'assignee_user_id',
+                      'completed_at', 'due_date', 'deleted_at')
+
+
+def _day(value):
+    # Dates may still be ISO strings from request JSON at flush time
+    return str(value)[:10] if value is not None else None
+
+
+def _contributions(values):
+    """The (dimension, bucket) counters a task with these column values adds 1 to."""
+    if not values['project_id'] or not values['customer_id'] or values['deleted_at'] is not None:
+        return []
+    status = values['status'] or Task.__table__.c.status.default.arg
+    priority = values['priority'] or Task.__table__.c.priority.default.arg
+    buckets = [('status', status), ('priority', priority), ('assignee', values['assignee_user_id'] or '')]
+    if values['completed_at'] is not None:
+        buckets.append(('completed_on', _day(values['completed_at'])))
+    if values['due_date'] is not None and status != 'done':
+        buckets.append(('open_due', _day(values['due_date'])))
+    return buckets
+
+
+def _committed_values(instance):
+    values = {}
+    for key in TRACKED_ATTRIBUTES:
+        history = attributes.get_history(instance, key)
+        old = history.deleted or history.unchanged
+        values[key] = old[0] if old else None
+    return values
+
+
+def _current_values(instance):
+    return {key: getattr(instance, key) for key in TRACKED_ATTRIBUTES}
+
+
+def lock_projects(connection, project_ids, exclusive=False):
+    """
+    Lock the rows of the given projects until the transaction ends, in id order.
+    Writers moving counters take a shared (KEY SHARE) lock, so they don't block
+    each other; a recompute takes an exclusive one, so it waits for writers in
+    flight to commit before counting and writers wait for it to finish. Other
+    databases than PostgreSQL serialize writes anyway and take no row locks.
+    """
+    if not project_ids or connection.dialect.name != 'postgresql':
+        return
+    projects = Project.__table__
+    statement = select(projects.c.id).where(projects.c.id.in_(sorted(project_ids))).order_by(projects.c.id)
+    connection.execute(statement.with_for_update() if exclusive else statement.with_for_update(read=True, key_share=True))
+
+
+def apply_stat_deltas(connection, deltas):
+    """
+    Add {(customer_id, project_id, dimension, bucket): delta} to the counters on
+    the given connection. Keys are applied in sorted order so concurrent writers
+    lock counter rows in the same order.
+    """
+    lock_projects(connection, {key[1] for key, delta in deltas.items() if delta})
+    stats = ProjectStat.__table__
+    for (customer_id, project_id, dimension, bucket), delta in sorted(deltas.items()):
+        if not delta:
+            continue
+        match = (stats.c.project_id == project_id, stats.c.dimension == dimension, stats.c.bucket == bucket)
+        bumped = connection.execute(stats.update().where(*match).values(count=stats.c.count + delta))
+        if bumped.rowcount:
+            continue
+        try:
+            with connection.begin_nested():
+                connection.execute(stats.insert().values(
+                    customer_id=customer_id, project_id=project_id, dimension=dimension, bucket=bucket, count=delta
+                ))
+        except IntegrityError:
+            connection.execute(stats.update().where(*match).values(count=stats.c.count + delta))
+
+
+def _track_task_stats(session, flush_context, instances):
+    """Move the project counters of every task created, changed or deleted in this flush."""
+    deltas = Counter()
+
+    def count(values, sign):
+        for dimension, bucket in _contributions(values):
+            deltas[(values['customer_id'], values['project_id'], dimension, bucket)] += sign
+
+    for instance in session.new:
+        if isinstance(instance, Task):
+            count(_current_values(instance), 1)
+    for instance in session.dirty:
+        if isinstance(instance, Task) and session.is_modified(instance):
+            count(_committed_values(instance), -1)
+            count(_current_values(instance), 1)
+    for instance in session.deleted:
+        if isinstance(instance, Task):
+            count(_committed_values(instance), -1)
+    if any(deltas.values()):
+        apply_stat_deltas(session.connection(), deltas)
+
+
+def untrack_tasks(connection, task_ids):
+    """
+    Take the given tasks off their project counters, for tasks about to be
+    soft-deleted with a bulk UPDATE, which bypasses the flush hook. Deleted tasks
+    already count for nothing.
+    """
+    tasks = Task.__table__
+    deltas = Counter()
+    for row in connection.execute(select(*(tasks.c[key] for key in TRACKED_ATTRIBUTES)).where(tasks.c.id.in_(task_ids))):
+        values = dict(zip(TRACKED_ATTRIBUTES, row))
+        for dimension, bucket in _contributions(values):
+            deltas[(values['customer_id'], values['project_id'], dimension, bucket)] -= 1
+    if any(deltas.values()):
+        apply_stat_deltas(connection, deltas)
+
+
+def recompute_project_stats(project_ids):
+    """
+    Rebuild the counters of the given projects from their live tasks, in the
+    current transaction. Used by the repair job and after bulk loads, which
+    bypass the flush hook. The projects are locked first (see lock_projects),
+    so a task write committing meanwhile can't be counted and then overwritten.
+    """
+    if not project_ids:
+        return 0
+    lock_projects(db.session.connection(), project_ids, exclusive=True)
+    tasks = Task.__table__
+    live = (tasks.c.project_id.in_(project_ids), tasks.c.deleted_at.is_(None), tasks.c.customer_id.isnot(None))
+    status = func.coalesce(tasks.c.status, Task.__table__.c.status.default.arg)
+    groupings = {
+        'status': (status, ()),
+        'priority': (func.coalesce(tasks.c.priority, Task.__table__.c.priority.default.arg), ()),
+        'assignee': (func.coalesce(tasks.c.assignee_user_id, ''), ()),
+        'completed_on': (func.date(tasks.c.completed_at), (tasks.c.completed_at.isnot(None),)),
+        'open_due': (tasks.c.due_date, (tasks.c.due_date.isnot(None), status != 'done')),
+    }
+    rows = []
+    for dimension, (bucket, conditions) in groupings.items():
+        grouped = db.session.execute(
+            select(tasks.c.customer_id, tasks.c.project_id, bucket, func.count())
+            .where(*live, *conditions)
+            .group_by(tasks.c.customer_id, tasks.c.project_id, bucket)
+        )
+        rows.extend(
+            {'customer_id': customer_id, 'project_id': project_id, 'dimension': dimension,
+             'bucket': _day(value) if dimension in ('completed_on', 'open_due') else value, 'count': total}
+            for customer_id, project_id, value, total in grouped
+        )
+    stats = ProjectStat.__table__
+    db.session.execute(stats.delete().where(stats.c.project_id.in_(project_ids)))
+    if rows:
+        db.session.execute(stats.insert(), rows)
+    return len(rows)
+
+
+def project_stats(project_id, days=30):
+    """Task statistics of a project, read from its counters."""
+    counters = {dimension: {} for dimension in STAT_DIMENSIONS}
+    for dimension, bucket, total in db.session.execute(
+        select(ProjectStat.dimension, ProjectStat.bucket, ProjectStat.count)
+        .where(ProjectStat.project_id == project_id, ProjectStat.count > 0)
+    ):
+        if dimension in counters:
+            counters[dimension][bucket] = total
+    today = date.today().isoformat()
+    since = (date.today() - timedelta(days=days - 1)).isoformat()
+    total = sum(counters['status'].values())
+    done = counters['status'].get('done', 0)
+    by_assignee = dict(counters['assignee'])
+    unassigned = by_assignee.pop('', 0)
+    return {
+        'project_id': project_id,
+        'total': total,
+        'progress': round(done / total, 4) if total else 0.0,
+        'by_status': counters['status'],
+        'by_priority': counters['priority'],
+        'by_assignee': by_assignee,
+        'unassigned': unassigned,
+        'overdue': sum(n for day, n in counters['open_due'].items() if day < today),
+        'completed_per_day': {day: n for day, n in sorted(counters['completed_on'].items()) if day >= since},
+    }
+
+
+def init_project_stats(app):
+    if not event.contains(db.session, 'before_flush', _track_task_stats):
+        event.listen(db.session, 'before_flush', _track_task_stats)
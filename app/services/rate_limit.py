@@ -0,0 +1,215 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from flask import request, jsonify, current_app
+from app.services.tenancy import request_caller, request_claims
+
+try:
+    import redis
+except ImportError:  # Redis backend is optional
+    redis = None
+
+REDIS_KEY_PREFIX = 'pmm:rl:'
+
+# Refill, take one token if available, and return {allowed, seconds until a token is available}.
+# Uses the Redis clock so every worker agrees on elapsed time.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return {allowed, tostring(wait)}
+"""
+
+# Give back a token taken from a bucket, without going over its burst.
+REFUND_SCRIPT = """
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+if tokens then
+    redis.call('HSET', KEYS[1], 'tokens', tostring(math.min(tonumber(ARGV[1]), tokens + 1)))
+end
+return 0
+"""
+
+
+class MemoryBackend:
+    """Token buckets local to one worker process, bounded to the most recently used keys."""
+
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                allowed, wait = True, 0.0
+                tokens -= 1
+            else:
+                allowed, wait = False, (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return allowed, wait
+
+    def refund(self, key, burst):
+        with self._lock:
+            if key in self._buckets:
+                tokens, updated = self._buckets[key]
+                self._buckets[key] = (min(burst, tokens + 1), updated)
+
+
+class RedisBackend:
+    """Token buckets shared by all workers; each take is one atomic Lua script call."""
+
+    def __init__(self, client):
+        self.redis = client
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+        self._refund = client.register_script(REFUND_SCRIPT)
+
+    def take(self, key, rate, burst):
+        allowed, wait = self._script(keys=[REDIS_KEY_PREFIX + key], args=[rate, burst])
+        return bool(allowed), float(wait)
+
+    def refund(self, key, burst):
+        self._refund(keys=[REDIS_KEY_PREFIX + key], args=[burst])
+
+
+class RateLimiter:
+    """
+    Token-bucket limits per endpoint and plan.
+
+    Callers are identified by their customer (the whole tenant shares a budget),
+    else by user id for accounts without a customer, else by client IP. Limits
+    come from RATE_LIMITS: {endpoint or '*': {plan: (requests per second, burst)}},
+    where plan is the customer's plan_type, 'user' or 'anonymous'. Users of a
+    customer are also limited on their own by RATE_LIMITS_PER_USER (same shape,
+    keyed by the customer's plan), so one user can't spend the whole tenant's
+    budget. A request needs a token from every bucket that applies to it: the
+    '*' and endpoint buckets of its tenant and of its user. If any of them is
+    empty the request is refused and the tokens already taken are given back.
+    """
+
+    def __init__(self):
+        self.limits = {}
+        self.user_limits = {}
+        self.memory = MemoryBackend()
+        self.backend = self.memory
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.limited = 0
+        self.backend_errors = 0
+
+    def configure(self, limits, user_limits=None, redis_url=None, maxsize=100000):
+        self.limits = limits
+        self.user_limits = user_limits or {}
+        self.memory.maxsize = maxsize
+        if redis_url and redis and self.backend is self.memory:
+            self.backend = RedisBackend(redis.Redis.from_url(redis_url, socket_timeout=0.1))
+
+    def _take(self, key, rate, burst):
+        if self.backend is not self.memory:
+            try:
+                return self.backend.take(key, rate, burst)
+            except redis.RedisError:
+                # Degrade to per-worker limits rather than failing or letting everything through
+                with self._lock:
+                    self.backend_errors += 1
+        return self.memory.take(key, rate, burst)
+
+    def _refund(self, key, burst):
+        if self.backend is not self.memory:
+            try:
+                return self.backend.refund(key, burst)
+            except redis.RedisError:
+                with self._lock:
+                    self.backend_errors += 1
+        self.memory.refund(key, burst)
+
+    def _buckets(self, endpoint, identity, plan, user_id):
+        """(key, (rate, burst)) of every bucket a request draws from."""
+        buckets = []
+        for scope in (endpoint, '*'):
+            limit = self.limits.get(scope, {}).get(plan)
+            if limit is not None:
+                buckets.append((f'{scope}:{identity}', limit))
+            limit = self.user_limits.get(scope, {}).get(plan) if user_id else None
+            if limit is not None:
+                buckets.append((f'{scope}:{identity}:user:{user_id}', limit))
+        return buckets
+
+    def check(self, endpoint, identity, plan, user_id=None):
+        """
+        Take tokens for a request to endpoint by the caller (identity, plan), and
+        by user_id when the caller is a customer. Returns None, or seconds to wait
+        when limited.
+        """
+        taken = []
+        wait = 0.0
+        for key, limit in self._buckets(endpoint, identity, plan, user_id):
+            allowed, wait = self._take(key, *limit)
+            if not allowed:
+                for taken_key, taken_limit in taken:
+                    self._refund(taken_key, taken_limit[1])
+                break
+            taken.append((key, limit))
+        with self._lock:
+            if wait:
+                self.limited += 1
+            else:
+                self.allowed += 1
+        return wait or None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'allowed': self.allowed,
+                'limited': self.limited,
+                'backend': 'redis' if self.backend is not self.memory else 'memory',
+                'backend_errors': self.backend_errors,
+            }
+
+
+rate_limiter = RateLimiter()
+
+
+def _enforce_rate_limit():
+    if not current_app.config['RATE_LIMIT_ENABLED'] or request.endpoint in (None, 'static'):
+        return None
+    identity, plan = request_caller()
+    user_id = request_claims().get('sub') if identity.startswith('customer:') else None
+    wait = rate_limiter.check(request.endpoint, identity, plan, user_id)
+    if wait is None:
+        return None
+    response = jsonify({'error': 'Too many requests'})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(max(1, math.ceil(wait)))
+    return response
+
+
+def init_rate_limit(app):
+    rate_limiter.configure(
+        limits=app.config['RATE_LIMITS'],
+        user_limits=app.config['RATE_LIMITS_PER_USER'],
+        redis_url=app.config['RATE_LIMIT_REDIS_URL'],
+        maxsize=app.config['RATE_LIMIT_MAX_KEYS'],
+    )
+    app.before_request(_enforce_rate_limit)
@@ -0,0 +1,87 @@
+from sqlalchemy import event, select
+from sqlalchemy.orm import with_loader_criteria
+from app.extensions import db
+from app.models.comment import Comment
+from app.models.file_attachment import FileAttachment
+from app.models.soft_delete import SoftDeleteMixin
+from app.models.task import Task
+from app.models.tombstone import Tombstone
+from app.services.project_stats import untrack_tasks
+from app.services.sync import next_change_seq
+
+
+def live_rows_criteria():
+    """Loader option hiding soft-deleted rows, for sessions without the default scope."""
+    return with_loader_criteria(SoftDeleteMixin, lambda cls: cls.deleted_at.is_(None), include_aliases=True)
+
+
+def _hide_deleted_rows(orm_execute_state):
+    """
+    Default scope: ORM selects skip soft-deleted rows. Pass the execution option
+    include_deleted=True to see them. Column and relationship loads are left
+    alone so already-loaded objects can still be refreshed.
+    """
+    if (
+        orm_execute_state.is_select
+        and not orm_execute_state.is_column_load
+        and not orm_execute_state.is_relationship_load
+        and not orm_execute_state.execution_options.get('include_deleted', False)
+    ):
+        orm_execute_state.statement = orm_execute_state.statement.options(live_rows_criteria())
+
+
+def _live_ids(model, column, keys, customer_id):
+    """Ids of the caller-visible live rows of model whose column is one of keys."""
+    if not keys:
+        return []
+    return list(db.session.execute(
+        select(model.id).where(column.in_(keys), model.customer_id == customer_id)
+    ).scalars())
+
+
+def soft_delete_task(task):
+    """
+    Soft-delete a task along with its subtask tree and their comments and files,
+    in the caller's transaction, so nothing under it stays visible until the
+    compaction job's cascade runs. The task itself goes through the ORM; the
+    rows under it are found by id, one query per tree level, then marked with a
+    single UPDATE per table, all stamped with one change sequence, their
+    tombstones inserted at once and their project counters moved together.
+    """
+    task.soft_delete()
+    task_ids = []
+    level = [task.id]
+    while level:
+        level = _live_ids(Task, Task.parent_task_id, level, task.customer_id)
+        task_ids.extend(level)
+    owners = [task.id, *task_ids]
+    deleted = {
+        'task': task_ids,
+        'comment': _live_ids(Comment, Comment.task_id, owners, task.customer_id),
+        'file': _live_ids(FileAttachment, FileAttachment.task_id, owners, task.customer_id),
+    }
+    if not any(deleted.values()):
+        return
+    connection = db.session.connection()
+    seq = next_change_seq(connection, task.customer_id)
+    if task_ids:
+        untrack_tasks(connection, task_ids)
+    for entity_type, model in (('task', Task), ('comment', Comment), ('file', FileAttachment)):
+        ids = deleted[entity_type]
+        if not ids:
+            continue
+        table = model.__table__
+        values = {'deleted_at': task.deleted_at, 'change_seq': seq}
+        if 'version_id' in table.c:
+            # Writers holding an older copy must fail like after an ORM update
+            values['version_id'] = table.c.version_id + 1
+        connection.execute(table.update().where(table.c.id.in_(ids)).values(**values))
+        connection.execute(Tombstone.__table__.insert(), [
+            {'customer_id': task.customer_id, 'entity_type': entity_type, 'entity_id': entity_id, 'change_seq': seq}
+            for entity_id in ids
+        ])
+
+
+def init_soft_delete(app):
+    if not event.contains(db.session, 'do_orm_execute', _hide_deleted_rows):
+        event.listen(db.session, 'do_orm_execute', _hide_deleted_rows)
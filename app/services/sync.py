@@ -0,0 +1,194 @@
+from sqlalchemy import event, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import attributes
+from app.extensions import db
+from app.models.task import Task
+from app.models.comment import Comment
+from app.models.file_attachment import FileAttachment
+from app.models.sync_counter import SyncCounter
+from app.models.tombstone import Tombstone
+from app.schemas.serializer import RowSerializer
+
+# Synced entity type -> model
+SYNCED_MODELS = {'task': Task, 'comment': Comment, 'file': FileAttachment}
+
+SYNC_SERIALIZERS = {
+    'task': RowSerializer([
+        ('id', Task.id),
+        ('project_id', Task.project_id),
+        ('parent_task_id', Task.parent_task_id),
+        ('title', Task.title),
+        ('description', Task.description),
+        ('status', Task.status),
+        ('priority', Task.priority),
+        ('assignee_user_id', Task.assignee_user_id),
+        ('due_date', Task.due_date),
+        ('start_date', Task.start_date),
+        ('completed_at', Task.completed_at),
+        ('position', Task.position),
+        ('created_at', Task.created_at),
+        ('updated_at', Task.updated_at),
+    ]),
+    'comment': RowSerializer([
+        ('id', Comment.id),
+        ('task_id', Comment.task_id),
+        ('author_user_id', Comment.author_user_id),
+        ('content', Comment.content),
+        ('created_at', Comment.created_at),
+        ('updated_at', Comment.updated_at),
+    ]),
+    'file': RowSerializer([
+        ('id', FileAttachment.id),
+        ('task_id', FileAttachment.task_id),
+        ('project_id', FileAttachment.project_id),
+        ('file_url', FileAttachment.file_url),
+        ('file_name', FileAttachment.file_name),
+        ('uploaded_by_user_id', FileAttachment.uploaded_by_user_id),
+        ('created_at', FileAttachment.created_at),
+    ]),
+}
+
+
+class CursorExpired(Exception):
+    """The cursor predates tombstones that have been compacted; the client must resync fully."""
+
+
+def next_change_seq(connection, customer_id):
+    """
+    Bump and return the tenant's change sequence on the given connection. The
+    counter row stays locked until the transaction ends, so seq order matches
+    commit order for a tenant.
+    """
+    counters = SyncCounter.__table__
+    bumped = connection.execute(
+        counters.update().where(counters.c.customer_id == customer_id).values(seq=counters.c.seq + 1)
+    )
+    if bumped.rowcount == 0:
+        try:
+            with connection.begin_nested():
+                connection.execute(counters.insert().values(customer_id=customer_id, seq=1, purged_seq=0))
+            return 1
+        except IntegrityError:
+            connection.execute(
+                counters.update().where(counters.c.customer_id == customer_id).values(seq=counters.c.seq + 1)
+            )
+    return connection.execute(select(counters.c.seq).where(counters.c.customer_id == customer_id)).scalar_one()
+
+
+def _entity_type(instance):
+    for name, model in SYNCED_MODELS.items():
+        if isinstance(instance, model):
+            return name
+    return None
+
+
+def _stamp_changes(session, flush_context, instances):
+    """
+    Give every task, comment and file written in this flush the tenant's next
+    change sequence, and leave a tombstone for every one being deleted (soft or
+    hard). One counter bump per tenant per flush.
+    """
+    changed = {}
+    deleted = {}
+    for instance in session.new:
+        if _entity_type(instance) and instance.customer_id:
+            changed.setdefault(instance.customer_id, []).append(instance)
+    for instance in session.dirty:
+        entity_type = _entity_type(instance)
+        if not entity_type or not instance.customer_id or not session.is_modified(instance):
+            continue
+        if instance.deleted_at is not None and attributes.get_history(instance, 'deleted_at').added:
+            deleted.setdefault(instance.customer_id, []).append((entity_type, instance.id))
+        changed.setdefault(instance.customer_id, []).append(instance)
+    for instance in session.deleted:
+        entity_type = _entity_type(instance)
+        # Compacting a soft-deleted row needs no second tombstone
+        if entity_type and instance.customer_id and instance.deleted_at is None:
+            deleted.setdefault(instance.customer_id, []).append((entity_type, instance.id))
+    if not changed and not deleted:
+        return
+    connection = session.connection()
+    for customer_id in set(changed) | set(deleted):
+        seq = next_change_seq(connection, customer_id)
+        for instance in changed.get(customer_id, ()):
+            instance.change_seq = seq
+        for entity_type, entity_id in deleted.get(customer_id, ()):
+            session.add(Tombstone(customer_id=customer_id, entity_type=entity_type, entity_id=entity_id, change_seq=seq))
+
+
+def _changed_rows(entity_type, customer_id, since, upper, limit=None):
+    serializer = SYNC_SERIALIZERS[entity_type]
+    model = SYNCED_MODELS[entity_type]
+    query = serializer.select(
+        model.query.filter(model.customer_id == customer_id, model.change_seq > since, model.change_seq <= upper),
+        model.change_seq
+    ).order_by(model.change_seq)
+    if limit is not None:
+        query = query.limit(limit)
+    return [(seq, row) for seq, *row in query]
+
+
+def _deleted_rows(customer_id, since, upper, limit=None):
+    query = (
+        Tombstone.query
+        .with_entities(Tombstone.change_seq, Tombstone.entity_type, Tombstone.entity_id)
+        .filter(Tombstone.customer_id == customer_id, Tombstone.change_seq > since, Tombstone.change_seq <= upper)
+        .order_by(Tombstone.change_seq)
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    return [(seq, (entity_type, entity_id)) for seq, entity_type, entity_id in query]
+
+
+def changes_since(customer_id, since, limit):
+    """
+    Everything a tenant changed after cursor `since`, at most about `limit` rows
+    per entity type. Returns a payload with the next cursor and has_more.
+
+    The window is cut at a sequence boundary so that a client never sees part of
+    a transaction's changes; a single transaction larger than the limit is
+    returned whole.
+    """
+    counter = db.session.get(SyncCounter, customer_id)
+    if counter is None:
+        return {'cursor': str(since), 'has_more': False, 'changes': {name: [] for name in SYNC_SERIALIZERS}, 'deleted': []}
+    # A full sync (since=0) needs no tombstones, so it never expires
+    if since and since < counter.purged_seq:
+        raise CursorExpired()
+    upper = counter.seq
+
+    def fetch(source, since, upper, limit=None):
+        return _deleted_rows(customer_id, since, upper, limit) if source == 'deleted' else _changed_rows(source, customer_id, since, upper, limit)
+
+    sources = list(SYNC_SERIALIZERS) + ['deleted']
+    fetched = {source: fetch(source, since, upper, limit + 1) for source in sources}
+    has_more = False
+    for source, rows in fetched.items():
+        if len(rows) > limit:
+            has_more = True
+            # Stop just before the first sequence this page could only partly include
+            boundary = rows[limit][0] - 1
+            if boundary <= since:
+                boundary = rows[limit][0]
+            upper = min(upper, boundary)
+    for source, rows in fetched.items():
+        if len(rows) > limit and rows[-1][0] <= upper:
+            # One oversized transaction: fetch all of its rows
+            fetched[source] = fetch(source, since, upper)
+        else:
+            fetched[source] = [(seq, row) for seq, row in rows if seq <= upper]
+
+    return {
+        'cursor': str(upper),
+        'has_more': has_more,
+        'changes': {
+            name: SYNC_SERIALIZERS[name].dump_rows(row for _, row in fetched[name])
+            for name in SYNC_SERIALIZERS
+        },
+        'deleted': [{'type': entity_type, 'id': entity_id} for _, (entity_type, entity_id) in fetched['deleted']],
+    }
+
+
+def init_sync(app):
+    if not event.contains(db.session, 'before_flush', _stamp_changes):
+        event.listen(db.session, 'before_flush', _stamp_changes)
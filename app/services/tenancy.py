@@ -0,0 +1,112 @@
+from flask import g, request, has_request_context
+from flask_jwt_extended import verify_jwt_in_request, get_jwt
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import PyJWTError
+from sqlalchemy import event, false
+from sqlalchemy.orm import with_loader_criteria
+from app.extensions import db
+from app.models.customer import Customer
+from app.models.tenant import TenantScopedMixin
+from app.models.user import User
+from app.services.cache import cached_get
+
+# Roles that see every tenant
+UNSCOPED_ROLES = ('superadmin', 'superadmin_readonly')
+
+# g.tenant_scope when the request may not see any tenant's rows
+NO_TENANT = object()
+
+
+def request_claims():
+    """
+    Claims of the request's JWT, or {} when there is none or it is invalid (the
+    view's own jwt_required then rejects it). Decoded once per request.
+    """
+    if 'jwt_claims' not in g:
+        try:
+            g.jwt_claims = get_jwt() if verify_jwt_in_request(optional=True, verify_type=False) else {}
+        except (JWTExtendedException, PyJWTError):
+            g.jwt_claims = {}
+    return g.jwt_claims
+
+
+def request_caller():
+    """
+    (identity, plan) of the request's caller: the customer and its plan_type,
+    else the user id and 'user' for accounts without a customer, else the client
+    IP and 'anonymous'. Used to key rate limits and prioritize admission.
+    """
+    if 'caller' not in g:
+        claims = request_claims()
+        customer_id = claims.get('customer_id')
+        if customer_id:
+            customer = cached_get(Customer, customer_id)
+            g.caller = (f'customer:{customer_id}', (customer.plan_type if customer else None) or 'free')
+        elif claims.get('sub'):
+            g.caller = (f"user:{claims['sub']}", 'user')
+        else:
+            g.caller = (f'ip:{request.remote_addr}', 'anonymous')
+    return g.caller
+
+
+def is_tenant_user(user_id, customer_id):
+    """
+    Whether user_id is an account of customer_id. Users aren't tenant-scoped, so
+    user ids taken from a request body (assignees) are checked with this before
+    being stored on a tenant's rows.
+    """
+    user = cached_get(User, user_id)
+    return user is not None and user.customer_id == customer_id
+
+
+def tenant_scope_for(claims):
+    """Tenant scope of a principal: its customer_id, None for unscoped roles, or NO_TENANT."""
+    if claims.get('role') in UNSCOPED_ROLES:
+        return None
+    return claims.get('customer_id') or NO_TENANT
+
+
+def _bind_tenant():
+    """Resolve the request principal's tenant once per request, before the view runs."""
+    g.tenant_scope = tenant_scope_for(request_claims())
+
+
+def current_tenant_scope():
+    """
+    The customer_id queries are confined to, NO_TENANT if none may be seen, or
+    None when unscoped (superadmins, and code running outside a request such as
+    Celery jobs and scripts).
+    """
+    if not has_request_context():
+        return None
+    return g.get('tenant_scope', NO_TENANT)
+
+
+def _scope_to_tenant(orm_execute_state):
+    """
+    Add customer_id = <caller's customer> to every ORM select, update and delete
+    touching a tenant-owned model. Pass the execution option all_tenants=True to
+    opt a statement out.
+    """
+    if not (orm_execute_state.is_select or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    if orm_execute_state.is_column_load or orm_execute_state.is_relationship_load:
+        return
+    if orm_execute_state.execution_options.get('all_tenants', False):
+        return
+    tenant_id = current_tenant_scope()
+    if tenant_id is not None:
+        orm_execute_state.statement = orm_execute_state.statement.options(tenant_criteria(tenant_id))
+
+
+def tenant_criteria(tenant_id):
+    """Loader option confining tenant-owned models to tenant_id (NO_TENANT: to nothing)."""
+    if tenant_id is NO_TENANT:
+        return with_loader_criteria(TenantScopedMixin, lambda cls: false(), include_aliases=True)
+    return with_loader_criteria(TenantScopedMixin, lambda cls: cls.customer_id == tenant_id, include_aliases=True)
+
+
+def init_tenancy(app):
+    app.before_request(_bind_tenant)
+    if not event.contains(db.session, 'do_orm_execute', _scope_to_tenant):
+        event.listen(db.session, 'do_orm_execute', _scope_to_tenant)
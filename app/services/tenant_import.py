@@ -0,0 +1,367 @@
+import io
+import json
+import uuid
+from datetime import date, datetime, timedelta
+from sqlalchemy import exists, select
+from sqlalchemy.exc import DBAPIError, IntegrityError, DataError
+from app.extensions import db
+from app.models.user import User
+from app.models.task import Task
+from app.models.file_attachment import FileAttachment
+from app.models.file_blob import FileBlob
+from app.services.export import EXPORT_MODELS
+from app.services.sync import SYNCED_MODELS, next_change_seq
+from app.services.project_stats import recompute_project_stats
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+IMPORT_BATCH_SIZE = 5000
+# A running import whose heartbeat is older than this lost its worker and may be taken over
+IMPORT_LEASE_SECONDS = 600
+
+IMPORT_MODELS = dict(EXPORT_MODELS)
+
+# Columns holding ids of other imported records, remapped to the new ids
+ID_REFERENCES = {
+    'project': {},
+    'task': {'project_id': 'project', 'parent_task_id': 'task'},
+    'comment': {'task_id': 'task'},
+    'file': {'task_id': 'task', 'project_id': 'project'},
+}
+
+# Columns holding user ids; kept only when the user belongs to the target tenant
+USER_REFERENCES = {
+    'project': ('owner_user_id',),
+    'task': ('assignee_user_id',),
+    'comment': ('author_user_id',),
+    'file': ('uploaded_by_user_id',),
+}
+
+
+class InvalidRecord(ValueError):
+    pass
+
+
+def _coerce(column, value):
+    """Validate a raw JSON value against a column, returning the Python value to load."""
+    if value is None:
+        return None
+    column_type = column.type
+    if isinstance(column_type, db.Enum):
+        return value if value in column_type.enums else None
+    if isinstance(column_type, db.DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column_type, db.Date):
+        return date.fromisoformat(value[:10])
+    if isinstance(column_type, db.Integer):
+        return int(value)
+    if isinstance(column_type, db.String):
+        if not isinstance(value, str):
+            raise InvalidRecord(f'{column.key} must be a string')
+        if column_type.length is not None and len(value) > column_type.length:
+            raise InvalidRecord(f'{column.key} is longer than {column_type.length} characters')
+    return value
+
+
+def _copy_value(value):
+    """Render a value in PostgreSQL COPY text format."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
+
+def load_rows(table, columns, rows):
+    """
+    Bulk-insert row tuples. On PostgreSQL this streams them through COPY FROM
+    STDIN on the session's connection (so it shares the batch transaction);
+    other databases get a single executemany INSERT.
+    """
+    if not rows:
+        return
+    connection = db.session.connection()
+    if connection.dialect.name == 'postgresql':
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write('\t'.join(_copy_value(value) for value in row))
+            buffer.write('\n')
+        buffer.seek(0)
+        statement = f'COPY {table.name} ({", ".join(columns)}) FROM STDIN'
+        dbapi = connection.dialect.loaded_dbapi
+        cursor = connection.connection.driver_connection.cursor()
+        try:
+            cursor.copy_expert(statement, buffer)
+        except dbapi.Error as exc:
+            # Raise driver errors as SQLAlchemy's, like the INSERT path
+            raise DBAPIError.instance(statement, None, exc, dbapi.Error) from exc
+        finally:
+            cursor.close()
+    else:
+        connection.execute(table.insert(), [dict(zip(columns, row)) for row in rows])
+
+
+class TenantImporter:
+    """
+    Loads an NDJSON archive in the export format ({"type": ..., "data": {...}}
+    per line) into a tenant.
+
+    Every id in the archive is remapped with uuid5(job id, original id), so
+    references resolve without holding an id map in memory, whatever order the
+    records come in, and re-running a job after a crash produces the same ids.
+    Rows are loaded in batches; each batch commits together with the job's line
+    checkpoint, so a resumed job skips exactly what was already loaded. Records
+    that aren't valid, or that the database refuses (e.g. a duplicate id), are
+    counted as skipped rather than failing the job.
+    """
+
+    def __init__(self, job, batch_size=IMPORT_BATCH_SIZE):
+        self.job = job
+        self.customer_id = job.customer_id
+        self.namespace = uuid.UUID(job.id)
+        self.batch_size = batch_size
+        self.columns = {
+            name: [column.key for column in model.__table__.columns]
+            for name, model in IMPORT_MODELS.items()
+        }
+        self.buffers = {name: [] for name in IMPORT_MODELS}
+        self.buffered = 0
+        self.skipped = 0
+        self.lines = job.lines_processed
+        self._tenant_users = {}
+        self.started_at = datetime.utcnow()
+
+    def remap(self, record_type, old_id):
+        return str(uuid.uuid5(self.namespace, f'{record_type}:{old_id}'))
+
+    def run(self, stream):
+        """Import from a binary line stream, resuming after job.lines_processed lines."""
+        for line_number, line in enumerate(stream):
+            if line_number < self.job.lines_processed:
+                continue
+            self.lines = line_number + 1
+            if not line.strip():
+                continue
+            try:
+                self.add(_loads(line))
+            except (InvalidRecord, ValueError, TypeError, KeyError):
+                self.skipped += 1
+            if self.buffered >= self.batch_size:
+                self.flush()
+        self.flush()
+        self.finalize()
+
+    def add(self, record):
+        if not isinstance(record, dict) or not isinstance(record.get('data'), dict):
+            raise InvalidRecord('Record must be an object with a data object')
+        record_type = record.get('type')
+        model = IMPORT_MODELS.get(record_type) if isinstance(record_type, str) else None
+        if model is None:
+            raise InvalidRecord(f'Unknown record type {record_type!r}')
+        data = record['data']
+        references = ID_REFERENCES[record_type]
+        values = {}
+        for column in model.__table__.columns:
+            key = column.key
+            value = data.get(key)
+            if key == 'id':
+                if not value:
+                    raise InvalidRecord('Record without id')
+                value = self.remap(record_type, value)
+            elif key == 'customer_id':
+                value = self.customer_id
+            elif key == 'change_seq':
+                value = None  # Assigned per batch in flush
+            elif key == 'deleted_at':
+                value = None  # Exports only contain live rows
+            elif key == 'version_id':
+                value = 1  # A new row, whatever version it had at the source
+            elif key in references:
+                value = self.remap(references[key], value) if value else None
+            else:
+                value = _coerce(column, value)
+            if value is None:
+                value = self._default(column)
+            if value is None and not column.nullable:
+                raise InvalidRecord(f'{record_type}.{key} is required')
+            values[key] = value
+        self.buffers[record_type].append(values)
+        self.buffered += 1
+
+    def _default(self, column):
+        if column.key in ('created_at', 'updated_at'):
+            return self.started_at
+        if column.default is not None and column.default.is_scalar:
+            return column.default.arg
+        return None
+
+    def _resolve_users(self):
+        """Check every user id referenced by the batch against the tenant, one query per batch."""
+        unseen = {
+            values[key]
+            for name, rows in self.buffers.items()
+            for values in rows
+            for key in USER_REFERENCES[name]
+            if values.get(key) and values[key] not in self._tenant_users
+        }
+        if unseen:
+            owned = {
+                user_id for (user_id,) in User.query
+                .with_entities(User.id)
+                .filter(User.id.in_(unseen), User.customer_id == self.customer_id)
+            }
+            for user_id in unseen:
+                self._tenant_users[user_id] = user_id in owned
+        for name, rows in self.buffers.items():
+            for values in rows:
+                for key in USER_REFERENCES[name]:
+                    if values.get(key) and not self._tenant_users[values[key]]:
+                        values[key] = None
+
+    def _resolve_blobs(self):
+        """
+        Keep a file's stored blob only if the tenant already references it. The
+        references are taken by _reference_blobs once the files are loaded.
+        """
+        files = self.buffers['file']
+        wanted = {values['blob_sha256'] for values in files if values.get('blob_sha256')}
+        held = set()
+        if wanted:
+            held = {
+                sha256 for (sha256,) in FileAttachment.query
+                .with_entities(FileAttachment.blob_sha256)
+                .filter(FileAttachment.customer_id == self.customer_id, FileAttachment.blob_sha256.in_(wanted))
+                .distinct()
+            }
+        for values in files:
+            sha256 = values.get('blob_sha256')
+            if not sha256:
+                continue
+            if sha256 in held:
+                # Same path as the download_file route
+                values['file_url'] = f"/api/files/{values['id']}/content"
+            else:
+                values['blob_sha256'] = None
+
+    def _reference_blobs(self, files):
+        """Take the blob references of loaded files, in one UPDATE per blob."""
+        new_refs = {}
+        for values in files:
+            if values.get('blob_sha256'):
+                new_refs[values['blob_sha256']] = new_refs.get(values['blob_sha256'], 0) + 1
+        for sha256, count in new_refs.items():
+            FileBlob.query.filter_by(sha256=sha256).update(
+                {FileBlob.ref_count: FileBlob.ref_count + count}, synchronize_session=False
+            )
+
+    def _load(self, one_by_one=False):
+        """
+        Insert the buffered rows, or with one_by_one each row in a savepoint of its
+        own, counting the rows the database refuses as skipped. Returns the number
+        of rows loaded.
+        """
+        if any(self.buffers[name] for name in SYNCED_MODELS):
+            # Bulk inserts bypass the session's flush hook, so stamp the batch here
+            seq = next_change_seq(db.session.connection(), self.customer_id)
+            for name in SYNCED_MODELS:
+                for values in self.buffers[name]:
+                    values['change_seq'] = seq
+        loaded = {}
+        for name, model in IMPORT_MODELS.items():
+            columns = self.columns[name]
+            if not one_by_one:
+                load_rows(model.__table__, columns, [tuple(values[key] for key in columns) for values in self.buffers[name]])
+                loaded[name] = self.buffers[name]
+                continue
+            loaded[name] = []
+            for values in self.buffers[name]:
+                try:
+                    with db.session.begin_nested():
+                        load_rows(model.__table__, columns, [tuple(values[key] for key in columns)])
+                except (IntegrityError, DataError):
+                    self.skipped += 1
+                    continue
+                loaded[name].append(values)
+        self._reference_blobs(loaded['file'])
+        return sum(len(rows) for rows in loaded.values())
+
+    def flush(self):
+        self._resolve_users()
+        self._resolve_blobs()
+        try:
+            loaded = self._load()
+        except (IntegrityError, DataError):
+            # Retrying the batch as a whole would fail the same way on every resume
+            db.session.rollback()
+            loaded = self._load(one_by_one=True)
+        for name in self.buffers:
+            self.buffers[name] = []
+        self.buffered = 0
+        self.job.lines_processed = self.lines
+        self.job.heartbeat_at = datetime.utcnow()
+        self.job.rows_loaded += loaded
+        self.job.rows_skipped += self.skipped
+        self.skipped = 0
+        db.session.commit()
+
+    def finalize(self):
+        """
+        Clear references to records that never arrived (a task's parent or project,
+        the task of a comment or file...), so nothing dangles, and count the loaded
+        tasks into their projects' stats.
+        """
+        seq = next_change_seq(db.session.connection(), self.customer_id)
+        for name, references in ID_REFERENCES.items():
+            table = IMPORT_MODELS[name].__table__
+            for key, target in references.items():
+                targets = IMPORT_MODELS[target].__table__.alias('targets')
+                statement = table.update().where(
+                    table.c.customer_id == self.customer_id,
+                    table.c[key].isnot(None),
+                    ~exists().where(targets.c.id == table.c[key])
+                ).values({key: None})
+                if name in SYNCED_MODELS:
+                    statement = statement.values(change_seq=seq)
+                db.session.execute(statement)
+        tasks = Task.__table__
+        project_ids = db.session.scalars(
+            select(tasks.c.project_id).where(tasks.c.customer_id == self.customer_id, tasks.c.project_id.isnot(None)).distinct()
+        ).all()
+        recompute_project_stats(project_ids)
+        db.session.commit()
+
+
+def import_stalled(job):
+    """Whether a running import's worker stopped heartbeating (it crashed), so the job can be resumed."""
+    cutoff = datetime.utcnow() - timedelta(seconds=IMPORT_LEASE_SECONDS)
+    return job.status == 'running' and (job.heartbeat_at or job.updated_at or datetime.min) < cutoff
+
+
+def run_import(job):
+    """Run (or resume) an import job to completion, recording its outcome on the job row."""
+    job.status = 'running'
+    job.error = None
+    job.heartbeat_at = datetime.utcnow()
+    db.session.commit()
+    try:
+        with open(job.source_path, 'rb') as stream:
+            TenantImporter(job).run(stream)
+    except Exception as exc:
+        db.session.rollback()
+        job.status = 'failed'
+        job.error = str(exc)
+        db.session.commit()
+        raise
+    job.status = 'done'
+    job.completed_at = datetime.utcnow()
+    db.session.commit()
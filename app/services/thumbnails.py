@@ -0,0 +1,59 @@
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; blobs are marked unsupported without it
+    Image = None
+
+try:
+    import fitz  # PyMuPDF, optional, enables PDF first-page previews
+except ImportError:
+    fitz = None
+
+THUMBNAIL_FORMAT = 'PNG'
+THUMBNAIL_MIMETYPE = 'image/png'
+
+
+def thumbnail_path(blob_file_path):
+    """Thumbnails live next to the blob they were rendered from."""
+    return blob_file_path + '.thumb.png'
+
+
+def can_render(content_type):
+    if not content_type:
+        return False
+    if content_type.startswith('image/'):
+        return Image is not None
+    if content_type == 'application/pdf':
+        return Image is not None and fitz is not None
+    return False
+
+
+def render_thumbnail(src_path, content_type, size):
+    """
+    Render a thumbnail of at most size=(width, height) next to src_path.
+
+    Runs in pool threads, so it only takes plain arguments and touches no
+    application state. Returns the resulting thumbnail status.
+    """
+    if not can_render(content_type):
+        return 'unsupported'
+    try:
+        if content_type == 'application/pdf':
+            with fitz.open(src_path) as doc:
+                pix = doc.load_page(0).get_pixmap()
+                image = Image.frombytes('RGB', (pix.width, pix.height), pix.samples)
+        else:
+            image = Image.open(src_path)
+            # Decode at reduced scale for large JPEGs instead of the full image
+            image.draft('RGB', size)
+        image.thumbnail(size)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA')
+        image.save(thumbnail_path(src_path), THUMBNAIL_FORMAT)
+    except Exception:
+        return 'failed'
+    return 'ready'
+
+
+def is_previewable(content_type):
+    """Whether a blob of this type should be queued for a thumbnail at all."""
+    return bool(content_type) and (content_type.startswith('image/') or content_type == 'application/pdf')
@@ -0,0 +1,38 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; without it Flask's stdlib encoder is used
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    jsonify() backed by orjson when it is installed. Output parses to the same
+    value as the default provider's, with the same sorted keys, compact
+    separators and debug-mode indentation, but isn't byte-identical: non-ASCII
+    text is written as UTF-8 rather than \\u escapes.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs.get('cls') is not None:
+            return super().dumps(obj, **kwargs)
+        return self._orjson_dumps(obj, indent=bool(kwargs.get('indent'))).decode()
+
+    def _orjson_dumps(self, obj, indent=False):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        # Flask formats datetimes as HTTP dates; fall back to its encoder for them
+        # (and anything else orjson doesn't know) so they decode to the same values.
+        option |= orjson.OPT_PASSTHROUGH_DATETIME
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self._orjson_dumps(obj, indent=indent) + b'\n', mimetype=self.mimetype)
@@ -0,0 +1,3 @@
+from app.async_api import create_async_app
+
+application = create_async_app()
@@ -0,0 +1,34 @@
+"""Add per-project task counters
+
+Revision ID: 0a7d3e5c9b61
+Revises: f6c29d8e1b43
+Create Date: 2026-10-19 18:41:07.230954
+
+The table starts empty; run app.jobs.project_stats.repair_project_stats once
+after upgrading (it also runs nightly) to count existing tasks.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a7d3e5c9b61'
+down_revision = 'f6c29d8e1b43'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('project_stats',
+    sa.Column('customer_id', sa.String(length=36), nullable=True),
+    sa.Column('project_id', sa.String(length=36), nullable=False),
+    sa.Column('dimension', sa.String(length=16), nullable=False),
+    sa.Column('bucket', sa.String(length=36), nullable=False),
+    sa.Column('count', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('project_id', 'dimension', 'bucket')
+    )
+
+
+def downgrade():
+    op.drop_table('project_stats')
@@ -0,0 +1,28 @@
+"""Index live tasks by customer, assignee and status
+
+Revision ID: 1b8e4f6a2d93
+Revises: 0a7d3e5c9b61
+Create Date: 2026-10-19 19:12:44.861302
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1b8e4f6a2d93'
+down_revision = '0a7d3e5c9b61'
+branch_labels = None
+depends_on = None
+
+LIVE_ROWS = sa.text('deleted_at IS NULL')
+
+
+def upgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.create_index('ix_tasks_live_assignee', ['customer_id', 'assignee_user_id', 'status'], unique=False, postgresql_where=LIVE_ROWS, sqlite_where=LIVE_ROWS)
+
+
+def downgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_tasks_live_assignee')
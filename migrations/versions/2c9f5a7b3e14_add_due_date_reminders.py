@@ -0,0 +1,47 @@
+"""Add due-date reminder claims, job cursors and the open-tasks due_date index
+
+Revision ID: 2c9f5a7b3e14
+Revises: 1b8e4f6a2d93
+Create Date: 2026-10-19 19:48:30.117592
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2c9f5a7b3e14'
+down_revision = '1b8e4f6a2d93'
+branch_labels = None
+depends_on = None
+
+OPEN_ROWS = sa.text("deleted_at IS NULL AND status != 'done'")
+
+
+def upgrade():
+    op.create_table('task_reminders',
+    sa.Column('task_id', sa.String(length=36), nullable=False),
+    sa.Column('kind', sa.Enum('due_tomorrow', 'overdue', name='task_reminder_kind_enum'), nullable=False),
+    sa.Column('due_date', sa.Date(), nullable=False),
+    sa.Column('customer_id', sa.String(length=36), nullable=True),
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('claimed_at', sa.DateTime(), nullable=True),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('task_id', 'kind', 'due_date')
+    )
+    op.create_table('job_cursors',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('position', sa.String(length=64), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.create_index('ix_tasks_open_due_date', ['due_date'], unique=False, postgresql_where=OPEN_ROWS, sqlite_where=OPEN_ROWS)
+
+
+def downgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_tasks_open_due_date')
+    op.drop_table('job_cursors')
+    op.drop_table('task_reminders')
+    sa.Enum(name='task_reminder_kind_enum').drop(op.get_bind(), checkfirst=True)
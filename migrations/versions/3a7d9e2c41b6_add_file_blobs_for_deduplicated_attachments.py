@@ -0,0 +1,59 @@
+"""Add file_blobs for content-addressed deduplicated attachments
+
+Revision ID: 3a7d9e2c41b6
+Revises: 1cec8cbbbc4b
+Create Date: 2026-10-19 09:12:44.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3a7d9e2c41b6'
+down_revision = '1cec8cbbbc4b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('file_blobs',
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('content_type', sa.String(length=128), nullable=True),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('released_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('sha256')
+    )
+    op.create_index('ix_file_blobs_orphaned', 'file_blobs', ['ref_count', 'released_at'], unique=False)
+    # file_attachments was previously only created by db.create_all()
+    if 'file_attachments' not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table('file_attachments',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('customer_id', sa.String(length=36), nullable=True),
+        sa.Column('task_id', sa.String(length=36), nullable=True),
+        sa.Column('project_id', sa.String(length=36), nullable=True),
+        sa.Column('uploaded_by_user_id', sa.String(length=36), nullable=True),
+        sa.Column('file_url', sa.String(length=512), nullable=False),
+        sa.Column('file_name', sa.String(length=256), nullable=False),
+        sa.Column('blob_sha256', sa.String(length=64), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['blob_sha256'], ['file_blobs.sha256'], name='fk_file_attachments_blob_sha256'),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_file_attachments_blob_sha256'), 'file_attachments', ['blob_sha256'], unique=False)
+        return
+    with op.batch_alter_table('file_attachments', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('blob_sha256', sa.String(length=64), nullable=True))
+        batch_op.create_index(batch_op.f('ix_file_attachments_blob_sha256'), ['blob_sha256'], unique=False)
+        batch_op.create_foreign_key('fk_file_attachments_blob_sha256', 'file_blobs', ['blob_sha256'], ['sha256'])
+
+
+def downgrade():
+    with op.batch_alter_table('file_attachments', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_file_attachments_blob_sha256', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_file_attachments_blob_sha256'))
+        batch_op.drop_column('blob_sha256')
+    op.drop_index('ix_file_blobs_orphaned', table_name='file_blobs')
+    op.drop_table('file_blobs')
@@ -0,0 +1,48 @@
+"""Add notification inbox and unread counters
+
+Revision ID: 3d1a6b8c4f25
+Revises: 2c9f5a7b3e14
+Create Date: 2026-10-19 20:26:51.640283
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3d1a6b8c4f25'
+down_revision = '2c9f5a7b3e14'
+branch_labels = None
+depends_on = None
+
+UNREAD_ROWS = sa.text('read_at IS NULL')
+
+
+def upgrade():
+    op.create_table('notifications',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+    sa.Column('customer_id', sa.String(length=36), nullable=True),
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('kind', sa.String(length=32), nullable=False),
+    sa.Column('task_id', sa.String(length=36), nullable=True),
+    sa.Column('project_id', sa.String(length=36), nullable=True),
+    sa.Column('actor_user_id', sa.String(length=36), nullable=True),
+    sa.Column('message', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('read_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_notifications_user_id', 'notifications', ['user_id', 'id'], unique=False)
+    op.create_index('ix_notifications_user_unread', 'notifications', ['user_id', 'id'], unique=False, postgresql_where=UNREAD_ROWS, sqlite_where=UNREAD_ROWS)
+    op.create_table('notification_counters',
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('unread', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade():
+    op.drop_table('notification_counters')
+    op.drop_index('ix_notifications_user_unread', table_name='notifications')
+    op.drop_index('ix_notifications_user_id', table_name='notifications')
+    op.drop_table('notifications')
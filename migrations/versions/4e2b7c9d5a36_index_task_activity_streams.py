@@ -0,0 +1,40 @@
+"""Index comments, files and audit logs for task activity timelines
+
+Revision ID: 4e2b7c9d5a36
+Revises: 3d1a6b8c4f25
+Create Date: 2026-10-19 20:58:14.302871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4e2b7c9d5a36'
+down_revision = '3d1a6b8c4f25'
+branch_labels = None
+depends_on = None
+
+LIVE_ROWS = sa.text('deleted_at IS NULL')
+
+
+def upgrade():
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.drop_index('ix_comments_live_task')
+        batch_op.create_index('ix_comments_live_task', ['customer_id', 'task_id', 'created_at'], unique=False, postgresql_where=LIVE_ROWS, sqlite_where=LIVE_ROWS)
+    with op.batch_alter_table('file_attachments', schema=None) as batch_op:
+        batch_op.drop_index('ix_file_attachments_live_task')
+        batch_op.create_index('ix_file_attachments_live_task', ['customer_id', 'task_id', 'created_at'], unique=False, postgresql_where=LIVE_ROWS, sqlite_where=LIVE_ROWS)
+    with op.batch_alter_table('audit_logs', schema=None) as batch_op:
+        batch_op.create_index('ix_audit_logs_target', ['target_type', 'target_id', 'timestamp'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('audit_logs', schema=None) as batch_op:
+        batch_op.drop_index('ix_audit_logs_target')
+    with op.batch_alter_table('file_attachments', schema=None) as batch_op:
+        batch_op.drop_index('ix_file_attachments_live_task')
+        batch_op.create_index('ix_file_attachments_live_task', ['customer_id', 'task_id'], unique=False, postgresql_where=LIVE_ROWS, sqlite_where=LIVE_ROWS)
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.drop_index('ix_comments_live_task')
+        batch_op.create_index('ix_comments_live_task', ['customer_id', 'task_id'], unique=False, postgresql_where=LIVE_ROWS, sqlite_where=LIVE_ROWS)
@@ -0,0 +1,37 @@
+"""Add thumbnail_status to file_blobs
+
+Revision ID: 5c1e8f0a9d27
+Revises: 3a7d9e2c41b6
+Create Date: 2026-10-19 11:05:31.902117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c1e8f0a9d27'
+down_revision = '3a7d9e2c41b6'
+branch_labels = None
+depends_on = None
+
+thumbnail_status_enum = sa.Enum('pending', 'ready', 'failed', 'unsupported', name='thumbnail_status_enum')
+
+
+def upgrade():
+    thumbnail_status_enum.create(op.get_bind(), checkfirst=True)
+    with op.batch_alter_table('file_blobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('thumbnail_status', thumbnail_status_enum, nullable=False, server_default='unsupported'))
+        batch_op.create_index(batch_op.f('ix_file_blobs_thumbnail_status'), ['thumbnail_status'], unique=False)
+    # Existing image and PDF blobs get picked up by the thumbnail backlog job
+    op.execute(
+        "UPDATE file_blobs SET thumbnail_status = 'pending' "
+        "WHERE content_type LIKE 'image/%' OR content_type = 'application/pdf'"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('file_blobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_file_blobs_thumbnail_status'))
+        batch_op.drop_column('thumbnail_status')
+    thumbnail_status_enum.drop(op.get_bind(), checkfirst=True)
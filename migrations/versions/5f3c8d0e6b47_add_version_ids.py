@@ -0,0 +1,34 @@
+"""Add version_id to tasks, comments and customers for optimistic concurrency
+
+Revision ID: 5f3c8d0e6b47
+Revises: 4e2b7c9d5a36
+Create Date: 2026-10-19 22:41:37.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f3c8d0e6b47'
+down_revision = '4e2b7c9d5a36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version_id', sa.Integer(), server_default='1', nullable=False))
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version_id', sa.Integer(), server_default='1', nullable=False))
+    with op.batch_alter_table('customers', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version_id', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('customers', schema=None) as batch_op:
+        batch_op.drop_column('version_id')
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.drop_column('version_id')
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_column('version_id')
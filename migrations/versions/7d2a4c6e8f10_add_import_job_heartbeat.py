@@ -0,0 +1,26 @@
+"""Add heartbeat_at to import_jobs so stalled imports can be taken over
+
+Revision ID: 7d2a4c6e8f10
+Revises: 5f3c8d0e6b47
+Create Date: 2026-10-20 09:14:52.301877
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d2a4c6e8f10'
+down_revision = '5f3c8d0e6b47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.drop_column('heartbeat_at')
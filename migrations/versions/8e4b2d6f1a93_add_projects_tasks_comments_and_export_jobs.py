@@ -0,0 +1,84 @@
+"""Add projects, tasks, comments (when missing) and export_jobs
+
+Revision ID: 8e4b2d6f1a93
+Revises: 5c1e8f0a9d27
+Create Date: 2026-10-19 11:10:02.551873
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e4b2d6f1a93'
+down_revision = '5c1e8f0a9d27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # projects/tasks/comments were previously only created by db.create_all()
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    if 'projects' not in existing:
+        op.create_table('projects',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('customer_id', sa.String(length=36), nullable=True),
+        sa.Column('name', sa.String(length=128), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('owner_user_id', sa.String(length=36), nullable=True),
+        sa.Column('status', sa.Enum('active', 'archived', name='project_status_enum'), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+    if 'tasks' not in existing:
+        op.create_table('tasks',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('customer_id', sa.String(length=36), nullable=True),
+        sa.Column('project_id', sa.String(length=36), nullable=True),
+        sa.Column('parent_task_id', sa.String(length=36), nullable=True),
+        sa.Column('title', sa.String(length=256), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('status', sa.Enum('todo', 'in_progress', 'done', 'blocked', name='task_status_enum'), nullable=True),
+        sa.Column('priority', sa.Enum('high', 'medium', 'low', name='task_priority_enum'), nullable=True),
+        sa.Column('assignee_user_id', sa.String(length=36), nullable=True),
+        sa.Column('due_date', sa.Date(), nullable=True),
+        sa.Column('start_date', sa.Date(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.Column('position', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+    if 'comments' not in existing:
+        op.create_table('comments',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('customer_id', sa.String(length=36), nullable=True),
+        sa.Column('task_id', sa.String(length=36), nullable=True),
+        sa.Column('author_user_id', sa.String(length=36), nullable=True),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+    op.create_table('export_jobs',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('customer_id', sa.String(length=36), nullable=False),
+    sa.Column('requested_by_user_id', sa.String(length=36), nullable=True),
+    sa.Column('format', sa.Enum('ndjson', 'csv', name='export_format_enum'), nullable=False),
+    sa.Column('status', sa.Enum('pending', 'running', 'done', 'failed', name='export_status_enum'), nullable=False),
+    sa.Column('file_path', sa.String(length=512), nullable=True),
+    sa.Column('row_count', sa.Integer(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_export_jobs_customer_id'), 'export_jobs', ['customer_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_export_jobs_customer_id'), table_name='export_jobs')
+    op.drop_table('export_jobs')
+    sa.Enum(name='export_status_enum').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='export_format_enum').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,41 @@
+"""Add import_jobs
+
+Revision ID: a91c3f5e7b20
+Revises: 8e4b2d6f1a93
+Create Date: 2026-10-19 11:12:40.117624
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a91c3f5e7b20'
+down_revision = '8e4b2d6f1a93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('import_jobs',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('customer_id', sa.String(length=36), nullable=False),
+    sa.Column('requested_by_user_id', sa.String(length=36), nullable=True),
+    sa.Column('status', sa.Enum('pending', 'running', 'done', 'failed', name='import_status_enum'), nullable=False),
+    sa.Column('source_path', sa.String(length=512), nullable=False),
+    sa.Column('lines_processed', sa.Integer(), nullable=False),
+    sa.Column('rows_loaded', sa.Integer(), nullable=False),
+    sa.Column('rows_skipped', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_import_jobs_customer_id'), 'import_jobs', ['customer_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_import_jobs_customer_id'), table_name='import_jobs')
+    op.drop_table('import_jobs')
+    sa.Enum(name='import_status_enum').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,74 @@
+"""Add delta sync change sequences and tombstones
+
+Revision ID: c47e2a9b5d18
+Revises: a91c3f5e7b20
+Create Date: 2026-10-19 13:05:21.448213
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c47e2a9b5d18'
+down_revision = 'a91c3f5e7b20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('sync_counters',
+    sa.Column('customer_id', sa.String(length=36), nullable=False),
+    sa.Column('seq', sa.BigInteger(), nullable=False),
+    sa.Column('purged_seq', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('customer_id')
+    )
+    op.create_table('tombstones',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+    sa.Column('customer_id', sa.String(length=36), nullable=False),
+    sa.Column('entity_type', sa.String(length=32), nullable=False),
+    sa.Column('entity_id', sa.String(length=36), nullable=False),
+    sa.Column('change_seq', sa.BigInteger(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_tombstones_customer_seq', 'tombstones', ['customer_id', 'change_seq'], unique=False)
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('change_seq', sa.BigInteger(), nullable=True))
+        batch_op.create_index('ix_tasks_customer_change_seq', ['customer_id', 'change_seq'], unique=False)
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('change_seq', sa.BigInteger(), nullable=True))
+        batch_op.create_index('ix_comments_customer_change_seq', ['customer_id', 'change_seq'], unique=False)
+    with op.batch_alter_table('file_attachments', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('change_seq', sa.BigInteger(), nullable=True))
+        batch_op.create_index('ix_file_attachments_customer_change_seq', ['customer_id', 'change_seq'], unique=False)
+    backfill_change_seqs()
+
+
+def backfill_change_seqs():
+    """
+    Put every existing row at change sequence 1 and start each customer's
+    counter there, so a full sync (and any delta from cursor 0) includes the
+    rows written before change sequences existed.
+    """
+    for table in ('tasks', 'comments', 'file_attachments'):
+        op.execute(f'UPDATE {table} SET change_seq = 1 WHERE change_seq IS NULL')
+    op.execute(
+        'INSERT INTO sync_counters (customer_id, seq, purged_seq) '
+        'SELECT id, 1, 0 FROM customers WHERE id NOT IN (SELECT customer_id FROM sync_counters)'
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('file_attachments', schema=None) as batch_op:
+        batch_op.drop_index('ix_file_attachments_customer_change_seq')
+        batch_op.drop_column('change_seq')
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.drop_index('ix_comments_customer_change_seq')
+        batch_op.drop_column('change_seq')
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_tasks_customer_change_seq')
+        batch_op.drop_column('change_seq')
+    op.drop_index('ix_tombstones_customer_seq', table_name='tombstones')
+    op.drop_table('tombstones')
+    op.drop_table('sync_counters')
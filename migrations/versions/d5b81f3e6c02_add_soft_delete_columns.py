@@ -0,0 +1,51 @@
+"""Add soft delete columns and partial indexes on live rows
+
+Revision ID: d5b81f3e6c02
+Revises: c47e2a9b5d18
+Create Date: 2026-10-19 14:22:09.731552
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5b81f3e6c02'
+down_revision = 'c47e2a9b5d18'
+branch_labels = None
+depends_on = None
+
+LIVE_ROWS = sa.text('deleted_at IS NULL')
+DELETED_ROWS = sa.text('deleted_at IS NOT NULL')
+
+
+def upgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_tasks_live_project', ['project_id'], unique=False, postgresql_where=LIVE_ROWS, sqlite_where=LIVE_ROWS)
+        batch_op.create_index('ix_tasks_live_parent', ['parent_task_id'], unique=False, postgresql_where=LIVE_ROWS, sqlite_where=LIVE_ROWS)
+        batch_op.create_index('ix_tasks_deleted_at', ['deleted_at'], unique=False, postgresql_where=DELETED_ROWS, sqlite_where=DELETED_ROWS)
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_comments_live_task', ['task_id'], unique=False, postgresql_where=LIVE_ROWS, sqlite_where=LIVE_ROWS)
+        batch_op.create_index('ix_comments_deleted_at', ['deleted_at'], unique=False, postgresql_where=DELETED_ROWS, sqlite_where=DELETED_ROWS)
+    with op.batch_alter_table('file_attachments', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_file_attachments_live_task', ['task_id'], unique=False, postgresql_where=LIVE_ROWS, sqlite_where=LIVE_ROWS)
+        batch_op.create_index('ix_file_attachments_deleted_at', ['deleted_at'], unique=False, postgresql_where=DELETED_ROWS, sqlite_where=DELETED_ROWS)
+
+
+def downgrade():
+    with op.batch_alter_table('file_attachments', schema=None) as batch_op:
+        batch_op.drop_index('ix_file_attachments_deleted_at')
+        batch_op.drop_index('ix_file_attachments_live_task')
+        batch_op.drop_column('deleted_at')
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.drop_index('ix_comments_deleted_at')
+        batch_op.drop_index('ix_comments_live_task')
+        batch_op.drop_column('deleted_at')
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_tasks_deleted_at')
+        batch_op.drop_index('ix_tasks_live_parent')
+        batch_op.drop_index('ix_tasks_live_project')
+        batch_op.drop_column('deleted_at')
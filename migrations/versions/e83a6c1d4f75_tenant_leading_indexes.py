@@ -0,0 +1,52 @@
+"""Lead live-row indexes with customer_id for tenant-scoped queries
+
+Revision ID: e83a6c1d4f75
+Revises: d5b81f3e6c02
+Create Date: 2026-10-19 15:40:33.218764
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e83a6c1d4f75'
+down_revision = 'd5b81f3e6c02'
+branch_labels = None
+depends_on = None
+
+LIVE_ROWS = sa.text('deleted_at IS NULL')
+
+
+def upgrade():
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.create_index('ix_projects_customer_status', ['customer_id', 'status'], unique=False)
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_tasks_live_project')
+        batch_op.drop_index('ix_tasks_live_parent')
+        batch_op.create_index('ix_tasks_live_project', ['customer_id', 'project_id', 'status'], unique=False, postgresql_where=LIVE_ROWS, sqlite_where=LIVE_ROWS)
+        batch_op.create_index('ix_tasks_live_parent', ['customer_id', 'parent_task_id'], unique=False, postgresql_where=LIVE_ROWS, sqlite_where=LIVE_ROWS)
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.drop_index('ix_comments_live_task')
+        batch_op.create_index('ix_comments_live_task', ['customer_id', 'task_id'], unique=False, postgresql_where=LIVE_ROWS, sqlite_where=LIVE_ROWS)
+    with op.batch_alter_table('file_attachments', schema=None) as batch_op:
+        batch_op.drop_index('ix_file_attachments_live_task')
+        batch_op.create_index('ix_file_attachments_live_task', ['customer_id', 'task_id'], unique=False, postgresql_where=LIVE_ROWS, sqlite_where=LIVE_ROWS)
+        batch_op.create_index('ix_file_attachments_live_project', ['customer_id', 'project_id'], unique=False, postgresql_where=LIVE_ROWS, sqlite_where=LIVE_ROWS)
+
+
+def downgrade():
+    with op.batch_alter_table('file_attachments', schema=None) as batch_op:
+        batch_op.drop_index('ix_file_attachments_live_project')
+        batch_op.drop_index('ix_file_attachments_live_task')
+        batch_op.create_index('ix_file_attachments_live_task', ['task_id'], unique=False, postgresql_where=LIVE_ROWS, sqlite_where=LIVE_ROWS)
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.drop_index('ix_comments_live_task')
+        batch_op.create_index('ix_comments_live_task', ['task_id'], unique=False, postgresql_where=LIVE_ROWS, sqlite_where=LIVE_ROWS)
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_tasks_live_parent')
+        batch_op.drop_index('ix_tasks_live_project')
+        batch_op.create_index('ix_tasks_live_parent', ['parent_task_id'], unique=False, postgresql_where=LIVE_ROWS, sqlite_where=LIVE_ROWS)
+        batch_op.create_index('ix_tasks_live_project', ['project_id'], unique=False, postgresql_where=LIVE_ROWS, sqlite_where=LIVE_ROWS)
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.drop_index('ix_projects_customer_status')
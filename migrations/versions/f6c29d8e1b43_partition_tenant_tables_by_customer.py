@@ -0,0 +1,136 @@
+"""Hash-partition tasks, comments and file_attachments by customer_id
+
+Revision ID: f6c29d8e1b43
+Revises: e83a6c1d4f75
+Create Date: 2026-10-19 16:58:12.504117
+
+On PostgreSQL each table is rebuilt as a table partitioned by
+HASH (customer_id) with 16 partitions and primary key (id, customer_id); rows
+are copied over inside the migration transaction, so run it in a maintenance
+window on large databases. Other databases only get the composite primary key.
+
+Rows left without a customer after the backfill (no task or project to take it
+from) can't be partitioned: they are moved to <table>_orphaned and reported,
+and downgrade puts them back.
+
+"""
+import logging
+from alembic import op
+import sqlalchemy as sa
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6c29d8e1b43'
+down_revision = 'e83a6c1d4f75'
+branch_labels = None
+depends_on = None
+
+PARTITIONS = 16
+
+LIVE_ROWS = 'WHERE deleted_at IS NULL'
+DELETED_ROWS = 'WHERE deleted_at IS NOT NULL'
+
+# Indexes to rebuild on each table: (name, columns, predicate)
+INDEXES = {
+    'tasks': [
+        ('ix_tasks_customer_change_seq', 'customer_id, change_seq', ''),
+        ('ix_tasks_live_project', 'customer_id, project_id, status', LIVE_ROWS),
+        ('ix_tasks_live_parent', 'customer_id, parent_task_id', LIVE_ROWS),
+        ('ix_tasks_deleted_at', 'deleted_at', DELETED_ROWS),
+    ],
+    'comments': [
+        ('ix_comments_customer_change_seq', 'customer_id, change_seq', ''),
+        ('ix_comments_live_task', 'customer_id, task_id', LIVE_ROWS),
+        ('ix_comments_deleted_at', 'deleted_at', DELETED_ROWS),
+    ],
+    'file_attachments': [
+        ('ix_file_attachments_blob_sha256', 'blob_sha256', ''),
+        ('ix_file_attachments_customer_change_seq', 'customer_id, change_seq', ''),
+        ('ix_file_attachments_live_task', 'customer_id, task_id', LIVE_ROWS),
+        ('ix_file_attachments_live_project', 'customer_id, project_id', LIVE_ROWS),
+        ('ix_file_attachments_deleted_at', 'deleted_at', DELETED_ROWS),
+    ],
+}
+
+# Rows created without a customer take it from their task or project
+BACKFILL = [
+    'UPDATE tasks SET customer_id = projects.customer_id FROM projects '
+    'WHERE tasks.customer_id IS NULL AND projects.id = tasks.project_id',
+    'UPDATE comments SET customer_id = tasks.customer_id FROM tasks '
+    'WHERE comments.customer_id IS NULL AND tasks.id = comments.task_id',
+    'UPDATE file_attachments SET customer_id = tasks.customer_id FROM tasks '
+    'WHERE file_attachments.customer_id IS NULL AND tasks.id = file_attachments.task_id',
+    'UPDATE file_attachments SET customer_id = projects.customer_id FROM projects '
+    'WHERE file_attachments.customer_id IS NULL AND projects.id = file_attachments.project_id',
+]
+
+
+def _quarantine_orphans(table):
+    """Move rows without a customer_id to {table}_orphaned."""
+    orphans = op.get_bind().execute(sa.text(f'SELECT COUNT(*) FROM {table} WHERE customer_id IS NULL')).scalar()
+    if not orphans:
+        return
+    op.execute(f'CREATE TABLE {table}_orphaned AS SELECT * FROM {table} WHERE customer_id IS NULL')
+    op.execute(f'DELETE FROM {table} WHERE customer_id IS NULL')
+    logger.warning('Moved %d %s rows without a customer to %s_orphaned', orphans, table, table)
+
+
+def _restore_orphans(table):
+    if f'{table}_orphaned' in sa.inspect(op.get_bind()).get_table_names():
+        op.execute(f'INSERT INTO {table} SELECT * FROM {table}_orphaned')
+        op.execute(f'DROP TABLE {table}_orphaned')
+
+
+def _rebuild(table, partitioned):
+    """Copy a table into a new (partitioned or plain) table of the same columns and swap it in."""
+    staging = f'{table}_rebuild'
+    partition_clause = ' PARTITION BY HASH (customer_id)' if partitioned else ''
+    primary_key = 'id, customer_id' if partitioned else 'id'
+    op.execute(f'CREATE TABLE {staging} (LIKE {table} INCLUDING DEFAULTS){partition_clause}')
+    op.execute(f'ALTER TABLE {staging} ALTER COLUMN customer_id SET NOT NULL' if partitioned
+               else f'ALTER TABLE {staging} ALTER COLUMN customer_id DROP NOT NULL')
+    op.execute(f'ALTER TABLE {staging} ADD CONSTRAINT {staging}_pkey PRIMARY KEY ({primary_key})')
+    if partitioned:
+        for remainder in range(PARTITIONS):
+            op.execute(
+                f'CREATE TABLE {table}_p{remainder} PARTITION OF {staging} '
+                f'FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {remainder})'
+            )
+    op.execute(f'INSERT INTO {staging} SELECT * FROM {table}')
+    op.execute(f'DROP TABLE {table}')
+    op.execute(f'ALTER TABLE {staging} RENAME TO {table}')
+    op.execute(f'ALTER TABLE {table} RENAME CONSTRAINT {staging}_pkey TO {table}_pkey')
+    for name, columns, predicate in INDEXES[table]:
+        op.execute(f'CREATE INDEX {name} ON {table} ({columns}) {predicate}')
+    if table == 'file_attachments':
+        op.create_foreign_key('fk_file_attachments_blob_sha256', 'file_attachments', 'file_blobs', ['blob_sha256'], ['sha256'])
+
+
+def upgrade():
+    for statement in BACKFILL:
+        op.execute(statement)
+    for table in INDEXES:
+        _quarantine_orphans(table)
+    if op.get_bind().dialect.name != 'postgresql':
+        for table in INDEXES:
+            with op.batch_alter_table(table, schema=None, recreate='always') as batch_op:
+                batch_op.alter_column('customer_id', existing_type=sa.String(length=36), nullable=False)
+                batch_op.create_primary_key(f'pk_{table}', ['id', 'customer_id'])
+        return
+    for table in INDEXES:
+        _rebuild(table, partitioned=True)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        for table in INDEXES:
+            with op.batch_alter_table(table, schema=None, recreate='always') as batch_op:
+                batch_op.create_primary_key(f'pk_{table}', ['id'])
+                batch_op.alter_column('customer_id', existing_type=sa.String(length=36), nullable=True)
+    else:
+        for table in INDEXES:
+            _rebuild(table, partitioned=False)
+    for table in INDEXES:
+        _restore_orphans(table)
@@ -0,0 +1,113 @@
+"""
+Compare response encodings on list payloads shaped like the API's:
+
+  kanban    board of task cards (get_kanban_board)
+  users     customer users (get_customer_users)
+  comments  comments of one task (list_comments)
+
+For each payload, encoding and level: compressed size, ratio, compression time
+and throughput (best of repeats), and the time to decompress. "stream" rows
+compress the comments payload chunk by chunk as a streamed response would,
+buffered, and flushed per chunk like an event stream.
+
+Usage: python scripts/bench_compression.py [rows] [repeats]
+"""
+import gzip
+import importlib.util
+import json
+import os
+import sys
+import time
+
+# Load compression.py on its own: importing it through the app package would run
+# app/__init__ and need the whole app's dependencies and configuration
+_spec = importlib.util.spec_from_file_location(
+    'compression', os.path.join(os.path.dirname(__file__), os.pardir, 'app', 'services', 'compression.py')
+)
+_compression = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_compression)
+COMPRESSORS, compress = _compression.COMPRESSORS, _compression.compress
+_compress_stream, CompressionStats = _compression._compress_stream, _compression.CompressionStats
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+LEVELS = {'gzip': (1, 6, 9), 'br': (1, 4, 6, 11), 'zstd': (1, 3, 9, 19)}
+STATUSES = ('todo', 'in_progress', 'done', 'blocked')
+
+
+def _payloads(rows):
+    board = {status: [] for status in STATUSES}
+    for i in range(rows):
+        board[STATUSES[i % 4]].append({
+            'assignee_user_id': f'7b2f5e5e-6c0a-4f9b-8c7e-{i % 40:012d}', 'due_date': f'2026-{i % 12 + 1:02d}-{i % 28 + 1:02d}',
+            'id': f'3c1e8f0a-9d27-4a5b-b6c4-{i:012d}', 'title': f'Task {i}: update the onboarding checklist',
+        })
+    users = [
+        {'email': f'user{i}@example.com', 'id': f'0f4b2d6f-1a93-4c8e-9b2d-{i:012d}', 'name': f'User {i}',
+         'role': ('user', 'manager', 'viewer')[i % 3], 'status': 'active'}
+        for i in range(rows)
+    ]
+    comments = [
+        {'author_user_id': f'7b2f5e5e-6c0a-4f9b-8c7e-{i % 40:012d}', 'content': f'Comment {i}: looks good, merging after review.',
+         'created_at': f'2026-10-19T10:{i % 60:02d}:{i % 60:02d}.{i:06d}', 'id': f'5c1e8f0a-9d27-4f2e-8a6c-{i:012d}'}
+        for i in range(rows)
+    ]
+    encode = lambda value: (json.dumps(value, sort_keys=True, separators=(',', ':')) + '\n').encode()
+    return {'kanban': encode(board), 'users': encode(users), 'comments': encode(comments)}, comments
+
+
+def _decompress(data, encoding):
+    if encoding == 'gzip':
+        return gzip.decompress(data)
+    if encoding == 'br':
+        return brotli.decompress(data)
+    return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+
+def _time(fn, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(rows=2000, repeats=5):
+    payloads, comments = _payloads(rows)
+    print(f'{rows} rows, best of {repeats}')
+    print(f'  {"payload":9} {"encoding":10} {"bytes":>9} {"ratio":>6} {"compress":>10} {"MB/s":>7} {"decompress":>10}')
+    for name, data in payloads.items():
+        print(f'  {name:9} {"identity":10} {len(data):9d}')
+        for encoding in COMPRESSORS:
+            for level in LEVELS[encoding]:
+                seconds, compressed = _time(lambda: compress(data, encoding, level), repeats)
+                unpack, restored = _time(lambda: _decompress(compressed, encoding), repeats)
+                assert restored == data
+                print(f'  {name:9} {f"{encoding}-{level}":10} {len(compressed):9d} {len(data) / len(compressed):6.1f}'
+                      f' {seconds * 1000:8.2f}ms {len(data) / seconds / 1e6:7.1f} {unpack * 1000:8.2f}ms')
+
+    chunks = [json.dumps(comment) + '\n' for comment in comments]
+    raw = ''.join(chunks).encode()
+    print(f'  stream of {len(chunks)} chunks, {len(raw)} bytes')
+    for encoding in COMPRESSORS:
+        level = {'gzip': 6, 'br': 4, 'zstd': 3}[encoding]
+        for mode, flush_each_chunk in (('buffered', False), ('flushed', True)):
+            seconds, body = _time(
+                lambda: b''.join(_compress_stream(iter(chunks), encoding, level, flush_each_chunk, CompressionStats())),
+                repeats,
+            )
+            assert _decompress(body, encoding) == raw
+            print(f'  {mode:9} {f"{encoding}-{level}":10} {len(body):9d} {len(raw) / len(body):6.1f} {seconds * 1000:8.2f}ms')
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
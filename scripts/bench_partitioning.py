@@ -0,0 +1,136 @@
+"""
+Compare kanban and comment-list latency on plain vs hash-partitioned tables in
+PostgreSQL:
+
+  flat         tasks/comments as single tables
+  partitioned  the same tables PARTITION BY HASH (customer_id), 16 partitions
+
+Both layouts get the same (customer_id, ...) partial indexes the app uses, and
+rows are spread over tenants with a heavy skew, so a few large customers own
+most of the data. Data is generated server-side into the bench_flat and
+bench_partitioned schemas (dropped first); expect the default 50M rows per table
+to take a while and a lot of disk.
+
+Usage: python scripts/bench_partitioning.py <postgresql-url> [rows] [tenants] [samples]
+"""
+import random
+import statistics
+import sys
+import time
+from sqlalchemy import create_engine, text
+
+PARTITIONS = 16
+PROJECTS_PER_TENANT = 20
+
+# Customer of task number n: deterministic and skewed towards low customer numbers
+CUSTOMER = "'c' || floor({tenants} * power(((n * 7919) % 10007) / 10007.0, 3))::int"
+
+SCHEMA = """
+CREATE TABLE {schema}.tasks (
+    id varchar(36) NOT NULL,
+    customer_id varchar(36) NOT NULL,
+    project_id varchar(36),
+    title varchar(256) NOT NULL,
+    status varchar(16),
+    position integer,
+    deleted_at timestamp,
+    PRIMARY KEY (id, customer_id)
+){partition};
+CREATE TABLE {schema}.comments (
+    id varchar(36) NOT NULL,
+    customer_id varchar(36) NOT NULL,
+    task_id varchar(36),
+    content text NOT NULL,
+    created_at timestamp,
+    deleted_at timestamp,
+    PRIMARY KEY (id, customer_id)
+){partition};
+"""
+
+INDEXES = """
+CREATE INDEX ON {schema}.tasks (customer_id, project_id, status) WHERE deleted_at IS NULL;
+CREATE INDEX ON {schema}.comments (customer_id, task_id) WHERE deleted_at IS NULL;
+"""
+
+KANBAN = ('SELECT id, title, status, position FROM {schema}.tasks '
+          'WHERE customer_id = :customer_id AND project_id = :key AND deleted_at IS NULL')
+COMMENTS = ('SELECT id, content, created_at FROM {schema}.comments '
+            'WHERE customer_id = :customer_id AND task_id = :key AND deleted_at IS NULL')
+
+
+def build(connection, schema, partitioned, rows, tenants):
+    connection.execute(text(f'DROP SCHEMA IF EXISTS {schema} CASCADE'))
+    connection.execute(text(f'CREATE SCHEMA {schema}'))
+    partition = ' PARTITION BY HASH (customer_id)' if partitioned else ''
+    connection.execute(text(SCHEMA.format(schema=schema, partition=partition)))
+    if partitioned:
+        for table in ('tasks', 'comments'):
+            for remainder in range(PARTITIONS):
+                connection.execute(text(
+                    f'CREATE TABLE {schema}.{table}_p{remainder} PARTITION OF {schema}.{table} '
+                    f'FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {remainder})'
+                ))
+    customer = CUSTOMER.format(tenants=tenants)
+    connection.execute(text(
+        f"INSERT INTO {schema}.tasks "
+        f"SELECT 't' || n, {customer}, {customer} || '-p' || (n % {PROJECTS_PER_TENANT}), 'Task ' || n, "
+        f"(ARRAY['todo', 'in_progress', 'done', 'blocked'])[1 + n % 4], n % 100, "
+        f"CASE WHEN n % 50 = 0 THEN now() END "
+        f"FROM generate_series(1, {rows}) AS n"
+    ))
+    # Comment m belongs to task n = 1 + m * 31 % rows, in that task's customer
+    connection.execute(text(
+        f"INSERT INTO {schema}.comments "
+        f"SELECT 'm' || m, {customer}, 't' || n, 'Comment ' || m, now(), NULL "
+        f"FROM (SELECT m, 1 + (m::bigint * 31) % {rows} AS n FROM generate_series(1, {rows}) AS m) AS s"
+    ))
+    connection.execute(text(INDEXES.format(schema=schema)))
+
+
+def sample_keys(connection, samples, rows, tenants):
+    """(customer_id, project_id) and (customer_id, task_id) pairs of randomly picked tasks."""
+    customer = CUSTOMER.format(tenants=tenants)
+    picked = [random.randint(1, rows) for _ in range(samples)]
+    tasks = connection.execute(
+        text(f"SELECT {customer}, {customer} || '-p' || (n % {PROJECTS_PER_TENANT}), 't' || n "
+             f"FROM unnest(CAST(:picked AS bigint[])) AS n"),
+        {'picked': picked}
+    ).all()
+    return [(c, p) for c, p, _ in tasks], [(c, t) for c, _, t in tasks]
+
+
+def measure(connection, sql, keys):
+    timings = []
+    statement = text(sql)
+    for customer_id, key in keys:
+        start = time.perf_counter()
+        connection.execute(statement, {'customer_id': customer_id, 'key': key}).all()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1], timings[-1]
+
+
+def main(url, rows=50_000_000, tenants=1000, samples=500):
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        for schema, partitioned in (('bench_flat', False), ('bench_partitioned', True)):
+            started = time.perf_counter()
+            build(connection, schema, partitioned, rows, tenants)
+            print(f'built {schema} in {time.perf_counter() - started:.0f} s')
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+        for schema in ('bench_flat', 'bench_partitioned'):
+            connection.execute(text(f'VACUUM ANALYZE {schema}.tasks'))
+            connection.execute(text(f'VACUUM ANALYZE {schema}.comments'))
+        project_keys, task_keys = sample_keys(connection, samples, rows, tenants)
+        print(f'{rows} rows per table, {tenants} tenants, {samples} samples (ms: p50 / p95 / max)')
+        for label, sql, keys in (('kanban', KANBAN, project_keys), ('comments', COMMENTS, task_keys)):
+            for schema in ('bench_flat', 'bench_partitioned'):
+                measure(connection, sql.format(schema=schema), keys[:20])  # warm the cache
+                p50, p95, worst = measure(connection, sql.format(schema=schema), keys)
+                print(f'  {label:<9} {schema:<18} {p50:8.2f} {p95:8.2f} {worst:8.2f}')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    main(sys.argv[1], *(int(arg) for arg in sys.argv[2:]))
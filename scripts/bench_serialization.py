@@ -0,0 +1,73 @@
+"""
+Compare list serialization paths on an in-memory SQLite database:
+
+  orm+marshmallow  User.query.all() -> UserSchema(many=True).dump() -> stdlib jsonify
+  rows+compiled    with_entities() row tuples -> RowSerializer -> FastJSONProvider
+
+Both paths must decode to the same JSON before anything is timed; the bytes
+differ where names are non-ASCII, which orjson writes as UTF-8. Timings depend
+on the machine and the installed orjson, so compare the ratio, not the numbers.
+
+Run from the repository root, where the app package imports:
+
+  python -m scripts.bench_serialization [rows] [repeats]
+"""
+import json
+import sys
+import time
+
+
+def _time(fn, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(rows=5000, repeats=5):
+    # Imported here so that importing this module doesn't import (and configure) the app package
+    from flask import Flask
+    from flask.json.provider import DefaultJSONProvider
+    from app.extensions import db
+    from app.models import User
+    from app.schemas.user import UserSchema
+    from app.routes.user import user_rows
+    from app.utils.json_provider import FastJSONProvider
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        db.session.execute(User.__table__.insert(), [
+            {'id': f'u{i:08d}', 'customer_id': 'bench', 'email': f'user{i}@example.com', 'name': f'User {i}' if i % 10 else f'Zoë {i}',
+             'role': 'user', 'status': 'active', 'password_hash': 'x'}
+            for i in range(rows)
+        ])
+        db.session.commit()
+        query = User.query.filter_by(customer_id='bench')
+
+        def current_path():
+            app.json = DefaultJSONProvider(app)
+            with app.test_request_context():
+                db.session.expunge_all()
+                return app.json.response(UserSchema(many=True).dump(query.all())).get_data()
+
+        def compiled_path():
+            app.json = FastJSONProvider(app)
+            with app.test_request_context():
+                db.session.expunge_all()
+                return app.json.response(user_rows.dump_rows(user_rows.select(query))).get_data()
+
+        assert json.loads(current_path()) == json.loads(compiled_path())
+        baseline = _time(current_path, repeats)
+        compiled = _time(compiled_path, repeats)
+    print(f'{rows} rows, best of {repeats}')
+    print(f'  orm+marshmallow  {baseline * 1000:8.1f} ms')
+    print(f'  rows+compiled    {compiled * 1000:8.1f} ms  ({baseline / compiled:.1f}x)')
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
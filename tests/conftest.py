@@ -0,0 +1,75 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.config.settings import TestingConfig
+from app.extensions import db
+from app.models import Customer, User, Project, Task
+
+
+@pytest.fixture
+def make_config(tmp_path):
+    """A TestingConfig on a fresh SQLite file; keyword arguments override config values."""
+    def make(**overrides):
+        return type('Config', (TestingConfig,), {
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path}/test.db',
+            'UPLOAD_FOLDER': str(tmp_path / 'uploads'),
+            'RATE_LIMIT_ENABLED': False,
+            'ADMISSION_ENABLED': False,
+            **overrides,
+        })
+    return make
+
+
+@pytest.fixture
+def make_app(make_config):
+    """Build an app on a fresh SQLite file; keyword arguments override config values."""
+    def make(**overrides):
+        app = create_app(make_config(**overrides))
+        with app.app_context():
+            db.create_all()
+        return app
+    return make
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth(app):
+    """Authorization headers for a caller with the given user, customer and role."""
+    def headers(user_id, customer_id, role='admin'):
+        with app.app_context():
+            token = create_access_token(identity=user_id, additional_claims={'role': role, 'customer_id': customer_id})
+        return {'Authorization': f'Bearer {token}'}
+    return headers
+
+
+@pytest.fixture
+def tenants(app):
+    """
+    Two customers, each with an admin and a project holding one task:
+    {'a': {...ids}, 'b': {...ids}}.
+    """
+    seeded = {}
+    with app.app_context():
+        for key in ('a', 'b'):
+            customer = Customer(name=f'Customer {key}', slug=f'customer-{key}')
+            db.session.add(customer)
+            db.session.flush()
+            user = User(email=f'admin-{key}@example.com', name=f'Admin {key}', role='admin', customer_id=customer.id)
+            user.set_password('secret123')
+            project = Project(name=f'Project {key}', customer_id=customer.id)
+            db.session.add_all([user, project])
+            db.session.flush()
+            task = Task(title=f'Task {key}', project_id=project.id, customer_id=customer.id, assignee_user_id=user.id)
+            db.session.add(task)
+            db.session.commit()
+            seeded[key] = {'customer': customer.id, 'user': user.id, 'project': project.id, 'task': task.id}
+    return seeded
@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models import AuditLog, Comment, FileAttachment
+
+TIE = datetime(2026, 3, 1, 12, 0, 0)
+
+
+def _seed(app, task, customer):
+    """Three entries per stream at one shared timestamp, plus one older and one newer each."""
+    with app.app_context():
+        for index in range(5):
+            created_at = TIE + timedelta(minutes={0: -1, 4: 1}.get(index, 0))
+            db.session.add_all([
+                Comment(id=f'c{index}', task_id=task, customer_id=customer, content=f'Comment {index}', created_at=created_at),
+                FileAttachment(id=f'f{index}', task_id=task, customer_id=customer, file_url=f'https://example.com/{index}',
+                               file_name=f'{index}.txt', created_at=created_at),
+                AuditLog(id=f'a{index}', customer_id=customer, action_type='task.updated', target_type='task',
+                         target_id=task, timestamp=created_at),
+            ])
+        db.session.commit()
+
+
+def _pages(client, url, headers, limit):
+    entries, cursor = [], None
+    while True:
+        response = client.get(url + (f'?limit={limit}&cursor={cursor}' if cursor else f'?limit={limit}'), headers=headers)
+        assert response.status_code == 200
+        body = response.get_json()
+        entries.extend(body['activity'])
+        cursor = body['next_cursor']
+        if cursor is None:
+            return entries
+
+
+def test_keyset_pages_have_no_duplicates_or_gaps_across_timestamp_ties(app, client, auth, tenants):
+    a = tenants['a']
+    _seed(app, a['task'], a['customer'])
+    headers = auth(a['user'], a['customer'])
+    url = f"/api/tasks/{a['task']}/activity"
+    everything = client.get(url + '?limit=200', headers=headers).get_json()
+    assert everything['next_cursor'] is None and len(everything['activity']) == 15
+    keys = [(entry['created_at'], entry['type'], entry['id']) for entry in everything['activity']]
+    assert keys == sorted(keys, reverse=True)
+    for limit in (1, 2, 4, 7):
+        paged = _pages(client, url, headers, limit)
+        assert [(entry['type'], entry['id']) for entry in paged] == [(entry['type'], entry['id']) for entry in everything['activity']]
+
+
+def test_activity_stays_within_the_tasks_tenant(app, client, auth, tenants):
+    a, b = tenants['a'], tenants['b']
+    _seed(app, a['task'], a['customer'])
+    with app.app_context():
+        db.session.add(AuditLog(customer_id=b['customer'], action_type='task.updated', target_type='task',
+                                target_id=a['task'], timestamp=TIE))
+        db.session.commit()
+    url = f"/api/tasks/{a['task']}/activity?limit=200"
+    assert len(client.get(url, headers=auth('root', None, 'superadmin')).get_json()['activity']) == 15
+    assert client.get(url, headers=auth(b['user'], b['customer'])).status_code == 404
+
+
+def test_invalid_cursor_is_rejected(client, auth, tenants):
+    a = tenants['a']
+    response = client.get(f"/api/tasks/{a['task']}/activity?cursor=nope", headers=auth(a['user'], a['customer']))
+    assert response.status_code == 400
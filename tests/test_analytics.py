@@ -0,0 +1,31 @@
+from datetime import date, datetime
+import numpy as np
+from app.services.analytics import compute_analytics
+
+
+def _columns(*tasks):
+    created_at, start_date, completed_at = zip(*tasks)
+    return {
+        'created_at': np.array(created_at, dtype='datetime64[s]'),
+        'start_date': np.array(start_date, dtype='datetime64[D]'),
+        'completed_at': np.array(completed_at, dtype='datetime64[s]'),
+        'assignee': np.array([''] * len(tasks), dtype=object),
+    }
+
+
+def test_cycle_time_of_tasks_without_a_start_date_is_zero():
+    analytics = compute_analytics(_columns(
+        (datetime(2026, 3, 1, 9), None, datetime(2026, 3, 3, 18)),
+        (datetime(2026, 3, 1, 9), date(2026, 3, 2), datetime(2026, 3, 3)),
+    ), date(2026, 3, 1), date(2026, 3, 5))
+    assert analytics['cycle_time']['count'] == 2
+    assert analytics['cycle_time']['mean'] == 0.5
+    assert analytics['cumulative_flow']['in_progress'] == [0, 1, 0, 0, 0]
+
+
+def test_remaining_never_goes_negative():
+    analytics = compute_analytics(_columns(
+        (datetime(2026, 3, 4), None, datetime(2026, 3, 2)),
+    ), date(2026, 3, 1), date(2026, 3, 5))
+    assert analytics['burndown']['remaining'] == [0, 0, 0, 0, 0]
+    assert analytics['burndown']['completed'] == [0, 1, 1, 1, 1]
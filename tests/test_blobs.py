@@ -0,0 +1,111 @@
+import io
+import os
+import time
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.jobs.blob_gc import gc_orphaned_blobs
+from app.jobs.compaction import _purge_batch
+from app.models import FileAttachment, FileBlob
+from app.services.blob_storage import blob_path
+
+
+def _upload(client, headers, task_id, content=b'hello world'):
+    return client.post('/api/files', headers=headers, content_type='multipart/form-data', data={
+        'task_id': task_id, 'file': (io.BytesIO(content), 'notes.txt', 'text/plain'),
+    })
+
+
+def _ref_count(app, sha256):
+    with app.app_context():
+        blob = db.session.get(FileBlob, sha256)
+        return blob.ref_count if blob else None
+
+
+def test_identical_uploads_share_one_blob(app, client, auth, tenants):
+    a = tenants['a']
+    headers = auth(a['user'], a['customer'])
+    first = _upload(client, headers, a['task']).get_json()
+    second = _upload(client, headers, a['task']).get_json()
+    assert first['sha256'] == second['sha256']
+    assert _ref_count(app, first['sha256']) == 2
+    response = client.post('/api/files', headers=headers, json={
+        'sha256': first['sha256'], 'file_name': 'copy.txt', 'task_id': a['task'],
+    })
+    assert response.status_code == 201
+    assert _ref_count(app, first['sha256']) == 3
+
+
+def test_attach_by_hash_needs_a_blob_the_tenant_holds(app, client, auth, tenants):
+    a, b = tenants['a'], tenants['b']
+    sha256 = _upload(client, auth(a['user'], a['customer']), a['task']).get_json()['sha256']
+    response = client.post('/api/files', headers=auth(b['user'], b['customer']), json={
+        'sha256': sha256, 'file_name': 'probe.txt', 'task_id': b['task'],
+    })
+    assert response.status_code == 404
+    assert response.get_json()['upload_required'] is True
+    assert _ref_count(app, sha256) == 1
+
+
+def test_attach_by_hash_of_a_collected_blob_asks_for_the_upload(app, client, auth, tenants):
+    a = tenants['a']
+    headers = auth(a['user'], a['customer'])
+    sha256 = _upload(client, headers, a['task']).get_json()['sha256']
+    with app.app_context():
+        FileBlob.query.filter_by(sha256=sha256).delete()
+        db.session.commit()
+    response = client.post('/api/files', headers=headers, json={
+        'sha256': sha256, 'file_name': 'copy.txt', 'task_id': a['task'],
+    })
+    assert response.status_code == 404
+    assert _ref_count(app, sha256) is None
+
+
+def test_gc_removes_blobs_once_unreferenced(app, client, auth, tenants):
+    a = tenants['a']
+    headers = auth(a['user'], a['customer'])
+    upload = _upload(client, headers, a['task']).get_json()
+    assert client.delete(f"/api/files/{upload['id']}", headers=headers).status_code == 200
+    app.config['BLOB_GC_GRACE_SECONDS'] = 0
+    with app.app_context():
+        path = blob_path(upload['sha256'])
+        assert os.path.exists(path)
+        assert _purge_batch(FileAttachment, datetime.utcnow() + timedelta(seconds=1), 100) == 1
+        assert db.session.get(FileBlob, upload['sha256']).ref_count == 0
+        assert gc_orphaned_blobs() == {'candidates': 1, 'removed': 1, 'files_swept': 0}
+        assert db.session.get(FileBlob, upload['sha256']) is None
+        assert not os.path.exists(path)
+
+
+def test_upload_rewrites_a_file_the_gc_removed(app, client, auth, tenants):
+    a = tenants['a']
+    headers = auth(a['user'], a['customer'])
+    upload = _upload(client, headers, a['task']).get_json()
+    with app.app_context():
+        # The GC removed the file of a released blob but its row survived (or was recreated)
+        os.remove(blob_path(upload['sha256']))
+    response = client.post('/api/files', headers=headers, json={
+        'sha256': upload['sha256'], 'file_name': 'copy.txt', 'task_id': a['task'],
+    })
+    assert response.status_code == 404 and response.get_json()['upload_required'] is True
+    assert _ref_count(app, upload['sha256']) == 1
+    second = _upload(client, headers, a['task']).get_json()
+    assert _ref_count(app, upload['sha256']) == 2
+    assert client.get(f"/api/files/{second['id']}/content", headers=headers).get_data() == b'hello world'
+
+
+def test_gc_sweeps_files_without_a_row(app, client, auth, tenants):
+    a = tenants['a']
+    kept = _upload(client, auth(a['user'], a['customer']), a['task']).get_json()['sha256']
+    app.config['BLOB_GC_GRACE_SECONDS'] = 60
+    with app.app_context():
+        stray, recent = blob_path('ab' * 32), blob_path('cd' * 32)
+        temporary = os.path.join(app.config['UPLOAD_FOLDER'], 'tmp', 'upload')
+        for path in (stray, recent, temporary):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, 'wb').close()
+        old = time.time() - 120
+        for path in (stray, temporary, blob_path(kept)):
+            os.utime(path, (old, old))
+        assert gc_orphaned_blobs()['files_swept'] == 2
+        assert not os.path.exists(stray) and not os.path.exists(temporary)
+        assert os.path.exists(recent) and os.path.exists(blob_path(kept))
@@ -0,0 +1,38 @@
+from app.extensions import db
+from app.models import Customer, User
+from app.services.cache import cached_get, record_cache
+
+
+def test_cached_users_leave_secrets_out(app, tenants):
+    user_id = tenants['a']['user']
+    with app.app_context():
+        db.session.get(User, user_id).invitation_token = 'invite-me'
+        db.session.commit()
+        db.session.remove()
+        user = cached_get(User, user_id)
+        assert user.email == 'admin-a@example.com'
+        assert user.password_hash is None and user.invitation_token is None
+        cached = record_cache.local.get(f'user:{user_id}')
+        assert cached['role'] == 'admin'
+        assert 'password_hash' not in cached and 'invitation_token' not in cached
+
+
+def test_commit_invalidates_cached_rows(app, tenants):
+    customer_id = tenants['a']['customer']
+    with app.app_context():
+        assert cached_get(Customer, customer_id).name == 'Customer a'
+        db.session.get(Customer, customer_id).name = 'Renamed'
+        db.session.rollback()
+        assert cached_get(Customer, customer_id).name == 'Customer a'
+        db.session.get(Customer, customer_id).name = 'Renamed'
+        db.session.commit()
+        assert cached_get(Customer, customer_id).name == 'Renamed'
+
+
+def test_read_racing_an_invalidation_is_not_cached(app):
+    generation = record_cache.generation('customer:c1')
+    record_cache.invalidate({'customer:c1'})
+    record_cache.set('customer:c1', {'id': 'c1', 'name': 'Stale'}, generation)
+    assert record_cache.local.get('customer:c1') is None
+    record_cache.set('customer:c1', {'id': 'c1', 'name': 'Fresh'}, record_cache.generation('customer:c1'))
+    assert record_cache.local.get('customer:c1')['name'] == 'Fresh'
@@ -0,0 +1,24 @@
+import gzip
+import json
+
+
+def test_large_lists_are_compressed(make_app, auth, tenants):
+    a = tenants['a']
+    client = make_app(COMPRESSION_ENCODINGS=('gzip',), COMPRESSION_MIN_SIZE=10).test_client()
+    headers = {**auth(a['user'], a['customer']), 'Accept-Encoding': 'gzip'}
+    response = client.get(f"/api/kanban/{a['project']}", headers=headers)
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert json.loads(gzip.decompress(response.get_data()))['todo'][0]['id'] == a['task']
+
+
+def test_not_modified_keeps_the_vary_header(make_app, auth, tenants):
+    a = tenants['a']
+    client = make_app(COMPRESSION_ENCODINGS=('gzip',), COMPRESSION_MIN_SIZE=10).test_client()
+    headers = auth(a['user'], a['customer'])
+    board = f"/api/kanban/{a['project']}"
+    etag = client.get(board, headers=headers).headers['ETag']
+    response = client.get(board, headers={**headers, 'If-None-Match': etag, 'Accept-Encoding': 'gzip'})
+    assert response.status_code == 304
+    assert not response.get_data() and 'Content-Encoding' not in response.headers
+    assert 'Accept-Encoding' in response.headers['Vary']
@@ -0,0 +1,80 @@
+from app.extensions import db
+from app.models import Customer, Task, User
+from app.routes import subtask as subtask_routes
+
+
+def _subtask(client, headers, tenant):
+    response = client.post('/api/subtasks', headers=headers, json={
+        'parent_task_id': tenant['task'], 'project_id': tenant['project'], 'title': 'Sub',
+    })
+    return f"/api/subtasks/{response.get_json()['id']}"
+
+
+def test_if_match_must_name_the_current_version(client, auth, tenants):
+    a = tenants['a']
+    headers = auth(a['user'], a['customer'])
+    url = _subtask(client, headers, a)
+    etag = client.get(url, headers=headers).headers['ETag']
+    response = client.patch(url, headers={**headers, 'If-Match': etag}, json={'title': 'First'})
+    assert response.status_code == 200 and response.headers['ETag'] != etag
+    response = client.patch(url, headers={**headers, 'If-Match': etag}, json={'title': 'Second'})
+    assert response.status_code == 412
+    assert client.get(url, headers=headers).get_json()['title'] == 'First'
+    response = client.patch(url, headers={**headers, 'If-Match': response.headers['ETag']}, json={'title': 'Second'})
+    assert response.status_code == 200
+
+
+def test_if_match_can_be_required(make_app, auth, tenants):
+    a = tenants['a']
+    client = make_app(REQUIRE_IF_MATCH=True).test_client()
+    headers = auth(a['user'], a['customer'])
+    url = _subtask(client, headers, a)
+    assert client.patch(url, headers=headers, json={'title': 'Renamed'}).status_code == 428
+
+
+def test_write_racing_another_is_refused(app, client, auth, tenants, monkeypatch):
+    a = tenants['a']
+    headers = auth(a['user'], a['customer'])
+    url = _subtask(client, headers, a)
+    etag = client.get(url, headers=headers).headers['ETag']
+    changed_fields = subtask_routes.changed_fields
+
+    def concurrent_write(instance, fields):
+        with db.engine.begin() as connection:
+            tasks = Task.__table__
+            connection.execute(tasks.update().where(tasks.c.id == instance.id).values(version_id=tasks.c.version_id + 1))
+        return changed_fields(instance, fields)
+
+    monkeypatch.setattr(subtask_routes, 'changed_fields', concurrent_write)
+    assert client.patch(url, headers=headers, json={'title': 'Lost'}).status_code == 409
+    # With If-Match the client learns its copy is stale
+    etag = client.get(url, headers=headers).headers['ETag']
+    assert client.patch(url, headers={**headers, 'If-Match': etag}, json={'title': 'Lost'}).status_code == 412
+
+
+def test_customer_etag_changes_with_its_admin(app, client, auth, tenants):
+    a = tenants['a']
+    headers = auth(a['user'], a['customer'])
+    url = f"/api/customers/{a['customer']}"
+    with app.app_context():
+        db.session.get(Customer, a['customer']).admin_user_id = a['user']
+        db.session.commit()
+    etag = client.get(url, headers=headers).headers['ETag']
+    with app.app_context():
+        db.session.get(User, a['user']).name = 'New admin name'
+        db.session.commit()
+    response = client.get(url, headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['admin']['name'] == 'New admin name'
+
+
+def test_customer_version_is_the_if_match_value(client, auth, tenants):
+    a = tenants['a']
+    headers = auth(a['user'], a['customer'])
+    url = f"/api/customers/{a['customer']}"
+    version = client.get(url, headers=headers).get_json()['version_id']
+    response = client.patch(url, headers={**headers, 'If-Match': f'"{version}"'}, json={'name': 'Renamed'})
+    assert response.status_code == 200
+    assert client.get(url, headers=headers).get_json()['version_id'] == version + 1
+    response = client.patch(url, headers={**headers, 'If-Match': f'"{version}"'}, json={'name': 'Again'})
+    assert response.status_code == 412
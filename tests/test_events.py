@@ -0,0 +1,22 @@
+import time
+from app.services.events import EventBus
+
+
+def _ids(bus, count):
+    subscription = bus.subscribe('p1')
+    for _ in range(count):
+        bus.publish('p1', 'task.updated', {})
+    return [subscription.queue.get_nowait()['id'] for _ in range(count)]
+
+
+def test_ids_keep_increasing_across_restarts():
+    first = _ids(EventBus(), 3)
+    assert first == sorted(set(first))
+    time.sleep(0.01)
+    assert _ids(EventBus(), 1)[0] > first[-1]
+
+
+def test_local_ids_continue_past_the_newest_id_seen():
+    bus = EventBus()
+    bus._dispatch({'id': 10 ** 15, 'project_id': 'p1', 'type': 'task.updated', 'data': {}})
+    assert _ids(bus, 1) == [10 ** 15 + 1]
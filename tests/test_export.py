@@ -0,0 +1,97 @@
+import csv
+import io
+import json
+import zipfile
+from app.extensions import db
+from app.jobs.export import run_export
+from app.models import Comment, FileAttachment, Task
+
+
+def _seed(app, tenants):
+    """A live comment and file on tenant a's task, and a deleted subtask and comment that must not be exported."""
+    a, b = tenants['a'], tenants['b']
+    with app.app_context():
+        gone_task = Task(id='gone-task', title='Gone', project_id=a['project'], customer_id=a['customer'], parent_task_id=a['task'])
+        gone_comment = Comment(id='gone-comment', task_id=a['task'], customer_id=a['customer'], content='Gone')
+        db.session.add_all([
+            Comment(id='comment-a', task_id=a['task'], customer_id=a['customer'], author_user_id=a['user'], content='Hi, "there"\nsecond line'),
+            FileAttachment(id='file-a', task_id=a['task'], customer_id=a['customer'], file_url='https://example.com/a', file_name='a.txt'),
+            Comment(id='comment-b', task_id=b['task'], customer_id=b['customer'], content='Theirs'),
+            gone_task, gone_comment,
+        ])
+        db.session.flush()
+        gone_task.soft_delete()
+        gone_comment.soft_delete()
+        db.session.commit()
+    return {
+        'project': {a['project']},
+        'task': {a['task']},
+        'comment': {'comment-a'},
+        'file': {'file-a'},
+    }
+
+
+def _ndjson_records(body):
+    records = {}
+    for line in body.decode().splitlines():
+        record = json.loads(line)
+        records.setdefault(record['type'], {})[record['data']['id']] = record['data']
+    return records
+
+
+def test_ndjson_export_round_trips_only_the_tenants_live_rows(app, client, auth, tenants):
+    a = tenants['a']
+    expected = _seed(app, tenants)
+    response = client.get(f"/api/customers/{a['customer']}/export", headers=auth(a['user'], a['customer']))
+    assert response.status_code == 200 and response.mimetype == 'application/x-ndjson'
+    records = _ndjson_records(response.get_data())
+    assert {name: set(rows) for name, rows in records.items()} == expected
+    comment = records['comment']['comment-a']
+    assert comment['content'] == 'Hi, "there"\nsecond line'
+    assert (comment['task_id'], comment['customer_id'], comment['author_user_id']) == (a['task'], a['customer'], a['user'])
+    assert records['task'][a['task']]['title'] == 'Task a' and records['task'][a['task']]['deleted_at'] is None
+
+
+def test_csv_zip_export_round_trips_only_the_tenants_live_rows(app, client, auth, tenants):
+    a = tenants['a']
+    expected = _seed(app, tenants)
+    response = client.get(f"/api/customers/{a['customer']}/export?format=csv", headers=auth(a['user'], a['customer']))
+    assert response.status_code == 200 and response.mimetype == 'application/zip'
+    with zipfile.ZipFile(io.BytesIO(response.get_data())) as archive:
+        assert sorted(archive.namelist()) == ['comments.csv', 'files.csv', 'projects.csv', 'tasks.csv']
+        tables = {
+            name[:-len('s.csv')]: list(csv.DictReader(io.TextIOWrapper(archive.open(name), encoding='utf-8', newline='')))
+            for name in archive.namelist()
+        }
+    assert {name: {row['id'] for row in rows} for name, rows in tables.items()} == expected
+    assert tables['comment'][0]['content'] == 'Hi, "there"\nsecond line'
+    assert tables['file'][0]['file_name'] == 'a.txt'
+
+
+def test_async_export_writes_the_same_records(app, client, auth, tenants, monkeypatch):
+    a = tenants['a']
+    expected = _seed(app, tenants)
+    headers = auth(a['user'], a['customer'])
+    queued = []
+    monkeypatch.setattr(run_export, 'delay', queued.append)
+    response = client.get(f"/api/customers/{a['customer']}/export?mode=async", headers=headers)
+    assert response.status_code == 202 and response.get_json()['status'] == 'pending'
+    job_url = f"/api/customers/{a['customer']}/exports/{queued[0]}"
+
+    with app.app_context():
+        assert run_export(queued[0]) == {'rows': 4}
+    job = client.get(job_url, headers=headers).get_json()
+    assert (job['status'], job['row_count']) == ('done', 4)
+    download = client.get(job['download_url'], headers=headers)
+    assert download.status_code == 200
+    records = _ndjson_records(download.get_data())
+    assert {name: set(rows) for name, rows in records.items()} == expected
+    streamed = client.get(f"/api/customers/{a['customer']}/export", headers=headers).get_data()
+    assert records == _ndjson_records(streamed)
+
+
+def test_export_is_refused_to_other_tenants(client, auth, tenants):
+    a, b = tenants['a'], tenants['b']
+    headers = auth(b['user'], b['customer'])
+    assert client.get(f"/api/customers/{a['customer']}/export", headers=headers).status_code == 403
+    assert client.get(f"/api/customers/{a['customer']}/export?format=xml", headers=auth(a['user'], a['customer'])).status_code == 400
@@ -0,0 +1,41 @@
+from app.models import Comment
+
+
+def _comment(client, headers, task_id, content='Hi', key='retry-1'):
+    return client.post('/api/comments', headers={**headers, 'Idempotency-Key': key},
+                       json={'task_id': task_id, 'content': content})
+
+
+def _comments(app, task_id):
+    with app.app_context():
+        return Comment.query.filter_by(task_id=task_id).count()
+
+
+def test_retry_replays_the_first_response(app, client, auth, tenants):
+    a = tenants['a']
+    headers = auth(a['user'], a['customer'])
+    first = _comment(client, headers, a['task'])
+    retry = _comment(client, headers, a['task'])
+    assert first.status_code == retry.status_code == 201
+    assert retry.get_json() == first.get_json()
+    assert retry.headers['Idempotent-Replayed'] == 'true' and 'Idempotent-Replayed' not in first.headers
+    assert _comments(app, a['task']) == 1
+    assert _comment(client, headers, a['task'], key='retry-2').status_code == 201
+    assert _comments(app, a['task']) == 2
+
+
+def test_key_reused_for_another_request_is_rejected(app, client, auth, tenants):
+    a = tenants['a']
+    headers = auth(a['user'], a['customer'])
+    assert _comment(client, headers, a['task']).status_code == 201
+    response = _comment(client, headers, a['task'], content='Something else')
+    assert response.status_code == 422
+    assert _comments(app, a['task']) == 1
+
+
+def test_keys_are_scoped_to_the_caller(app, client, auth, tenants):
+    a, b = tenants['a'], tenants['b']
+    assert _comment(client, auth(a['user'], a['customer']), a['task']).status_code == 201
+    response = _comment(client, auth(b['user'], b['customer']), b['task'])
+    assert response.status_code == 201 and 'Idempotent-Replayed' not in response.headers
+    assert _comments(app, b['task']) == 1
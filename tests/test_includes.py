@@ -0,0 +1,86 @@
+from starlette.testclient import TestClient
+from app.async_api import create_async_app
+from app.extensions import db
+from app.models import Task
+
+
+def _assign(app, task_id, user_id):
+    with app.app_context():
+        task = db.session.get(Task, task_id, execution_options={'all_tenants': True})
+        task.assignee_user_id = user_id
+        db.session.commit()
+
+
+def _card(board, task_id):
+    return next(card for column in board.values() for card in column if card['id'] == task_id)
+
+
+def test_fields_and_include_shape_the_board(client, auth, tenants):
+    a = tenants['a']
+    response = client.get(f"/api/kanban/{a['project']}?fields=title&include=assignee", headers=auth(a['user'], a['customer']))
+    assert response.status_code == 200
+    assert _card(response.get_json(), a['task']) == {
+        'id': a['task'],
+        'title': 'Task a',
+        'assignee': {'id': a['user'], 'name': 'Admin a', 'email': 'admin-a@example.com'},
+    }
+
+
+def test_unknown_fields_and_includes_are_rejected(client, auth, tenants):
+    a = tenants['a']
+    response = client.get(f"/api/kanban/{a['project']}?fields=title,secret", headers=auth(a['user'], a['customer']))
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Unknown fields: secret'}
+    response = client.get(f"/api/kanban/{a['project']}?include=owner", headers=auth(a['user'], a['customer']))
+    assert response.status_code == 400
+
+
+def test_include_does_not_reveal_another_tenants_user(app, client, auth, tenants):
+    a, b = tenants['a'], tenants['b']
+    _assign(app, a['task'], b['user'])
+    response = client.get(f"/api/kanban/{a['project']}?include=assignee", headers=auth(a['user'], a['customer']))
+    assert _card(response.get_json(), a['task'])['assignee'] is None
+    response = client.get(f"/api/kanban/{a['project']}?include=assignee", headers=auth('root', None, 'superadmin'))
+    assert _card(response.get_json(), a['task'])['assignee']['id'] == b['user']
+
+
+def test_assignee_from_another_tenant_is_rejected(client, auth, tenants):
+    a, b = tenants['a'], tenants['b']
+    headers = auth(a['user'], a['customer'])
+    response = client.post('/api/subtasks', headers=headers, json={
+        'parent_task_id': a['task'], 'project_id': a['project'], 'title': 'Sub', 'assignee_user_id': b['user'],
+    })
+    assert response.status_code == 400
+    response = client.post('/api/subtasks', headers=headers, json={
+        'parent_task_id': a['task'], 'project_id': a['project'], 'title': 'Sub', 'assignee_user_id': a['user'],
+    })
+    assert response.status_code == 201
+    subtask_id = response.get_json()['id']
+    response = client.patch(f'/api/subtasks/{subtask_id}', headers=headers, json={'assignee_user_id': b['user']})
+    assert response.status_code == 400
+
+
+def test_async_api_matches_flask_for_fields_and_include(make_config, app, client, auth, tenants):
+    a, b = tenants['a'], tenants['b']
+    headers = auth(a['user'], a['customer'])
+    assert client.post('/api/comments', headers=headers, json={'task_id': a['task'], 'content': 'Hi'}).status_code == 201
+    other = client.post('/api/subtasks', headers=headers, json={
+        'parent_task_id': a['task'], 'project_id': a['project'], 'title': 'Sub',
+    }).get_json()['id']
+    _assign(app, a['task'], a['user'])
+    _assign(app, other, b['user'])
+    assert client.patch(f'/api/subtasks/{other}', headers=headers, json={'due_date': '2026-05-01'}).status_code == 200
+    paths = [
+        f"/api/kanban/{a['project']}",
+        f"/api/kanban/{a['project']}?fields=title&include=assignee",
+        f"/api/kanban/{a['project']}?fields=title,secret",
+        f"/api/calendar/{a['project']}?include=assignee",
+        f"/api/comments?task_id={a['task']}&fields=content&include=author",
+        f"/api/files?task_id={a['task']}&fields=file_name,thumbnail_url&include=uploaded_by",
+        f"/api/files?task_id={a['task']}&include=owner",
+    ]
+    with TestClient(create_async_app(make_config())) as async_client:
+        for path in paths:
+            expected = client.get(path, headers=headers)
+            response = async_client.get(path, headers=headers)
+            assert (response.status_code, response.json()) == (expected.status_code, expected.get_json()), path
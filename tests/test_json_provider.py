@@ -0,0 +1,29 @@
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+import pytest
+from flask.json.provider import DefaultJSONProvider
+from app.utils.json_provider import FastJSONProvider
+
+pytest.importorskip('orjson')
+
+PAYLOAD = {
+    'name': 'Zoë — 東京',
+    'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    'created_at': datetime(2026, 3, 1, 12, 30, 5),
+    'due_date': date(2026, 3, 2),
+    'budget': Decimal('12.50'),
+    'counts': {3: 1, 1: 2},
+    'tags': ['a', None, True, 1.5],
+}
+
+
+@pytest.mark.parametrize('debug', [False, True])
+def test_fast_provider_decodes_like_the_default(app, debug):
+    app.debug = debug
+    with app.test_request_context():
+        fast = FastJSONProvider(app).response(PAYLOAD).get_data()
+        default = DefaultJSONProvider(app).response(PAYLOAD).get_data()
+    assert json.loads(fast) == json.loads(default)
+    assert 'Zoë'.encode() in fast
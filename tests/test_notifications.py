@@ -0,0 +1,16 @@
+from app.extensions import db
+from app.models import Comment, Notification
+from app.services.notifications import notify_task_watchers, unread_count
+
+
+def test_watchers_in_another_tenant_are_not_notified(app, client, auth, tenants):
+    a, b = tenants['a'], tenants['b']
+    with app.app_context():
+        db.session.add(Comment(task_id=a['task'], customer_id=a['customer'], author_user_id=b['user'], content='Hi'))
+        db.session.commit()
+        assert notify_task_watchers(a['task'], 'task.updated', a['customer'], actor_user_id='someone') == 1
+        db.session.commit()
+        assert unread_count(b['user']) == 0
+        assert Notification.query.filter_by(user_id=b['user']).count() == 0
+    response = client.get('/api/notifications', headers=auth(a['user'], a['customer']))
+    assert response.get_json()['unread'] == len(response.get_json()['notifications']) == 1
@@ -0,0 +1,14 @@
+def test_overview_returns_every_section(client, auth, tenants):
+    a = tenants['a']
+    response = client.get(f"/api/projects/{a['project']}/overview", headers=auth(a['user'], a['customer']))
+    assert response.status_code == 200
+    overview = response.get_json()
+    assert overview['partial'] is False and overview['errors'] == {}
+    assert [card['id'] for card in overview['board']['todo']] == [a['task']]
+    assert overview['recent_files'] == [] and overview['comment_counts'] == {}
+
+
+def test_overview_is_confined_to_the_callers_tenant(client, auth, tenants):
+    a, b = tenants['a'], tenants['b']
+    response = client.get(f"/api/projects/{b['project']}/overview", headers=auth(a['user'], a['customer']))
+    assert all(not column for column in response.get_json()['board'].values())
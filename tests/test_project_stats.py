@@ -0,0 +1,51 @@
+from datetime import date, timedelta
+from app.extensions import db
+from app.models import Task
+from app.services.project_stats import project_stats, recompute_project_stats
+
+
+def _stats(app, project_id):
+    with app.app_context():
+        return project_stats(project_id)
+
+
+def test_task_writes_move_the_counters(app, tenants):
+    a = tenants['a']
+    yesterday = date.today() - timedelta(days=1)
+    with app.app_context():
+        db.session.add_all([
+            Task(title='Late', project_id=a['project'], customer_id=a['customer'], priority='high', due_date=yesterday),
+            Task(title='Unassigned', project_id=a['project'], customer_id=a['customer'], status='in_progress'),
+        ])
+        db.session.commit()
+    stats = _stats(app, a['project'])
+    assert stats['total'] == 3
+    assert stats['by_status'] == {'todo': 2, 'in_progress': 1}
+    assert stats['by_priority'] == {'medium': 2, 'high': 1}
+    assert stats['by_assignee'] == {a['user']: 1} and stats['unassigned'] == 2
+    assert stats['overdue'] == 1
+
+    with app.app_context():
+        late = Task.query.filter_by(title='Late').one()
+        late.status = 'done'
+        late.completed_at = late.created_at
+        db.session.get(Task, a['task']).soft_delete()
+        db.session.commit()
+    stats = _stats(app, a['project'])
+    assert stats['total'] == 2
+    assert stats['by_status'] == {'done': 1, 'in_progress': 1}
+    assert stats['overdue'] == 0
+    assert sum(stats['completed_per_day'].values()) == 1
+    assert stats['progress'] == 0.5
+
+
+def test_recompute_matches_the_counters(app, tenants):
+    a = tenants['a']
+    with app.app_context():
+        db.session.add(Task(title='Second', project_id=a['project'], customer_id=a['customer'], status='blocked'))
+        db.session.commit()
+    tracked = _stats(app, a['project'])
+    with app.app_context():
+        assert recompute_project_stats([a['project']]) > 0
+        db.session.commit()
+    assert _stats(app, a['project']) == tracked
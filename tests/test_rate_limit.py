@@ -0,0 +1,74 @@
+import pytest
+from starlette.testclient import TestClient
+from app.async_api import create_async_app
+from app.services.admission import AdmissionController, admission
+
+
+@pytest.fixture
+def limited_client(make_app, tenants):
+    def client(limits, user_limits=None, **overrides):
+        app = make_app(RATE_LIMIT_ENABLED=True, RATE_LIMITS=limits, RATE_LIMITS_PER_USER=user_limits or {}, **overrides)
+        return app.test_client()
+    return client
+
+
+def test_endpoint_limit_leaves_other_endpoints_usable(limited_client, auth, tenants):
+    a = tenants['a']
+    client = limited_client({'*': {'free': (0.001, 2)}, 'kanban_bp.get_kanban_board': {'free': (0.001, 1)}})
+    headers = auth(a['user'], a['customer'])
+    board = f"/api/kanban/{a['project']}"
+    assert client.get(board, headers=headers).status_code == 200
+    response = client.get(board, headers=headers)
+    assert response.status_code == 429 and int(response.headers['Retry-After']) >= 1
+    assert client.get('/api/notifications', headers=headers).status_code == 200
+    assert client.get('/api/notifications', headers=headers).status_code == 429
+
+
+def test_users_are_limited_and_refusals_cost_the_tenant_nothing(limited_client, auth, tenants):
+    a, b = tenants['a'], tenants['b']
+    client = limited_client({'*': {'free': (0.001, 3)}}, {'*': {'free': (0.001, 1)}})
+    assert client.get('/api/notifications', headers=auth('u1', a['customer'])).status_code == 200
+    assert client.get('/api/notifications', headers=auth('u1', a['customer'])).status_code == 429
+    assert client.get('/api/notifications', headers=auth('u2', a['customer'])).status_code == 200
+    assert client.get('/api/notifications', headers=auth('u3', a['customer'])).status_code == 200
+    assert client.get('/api/notifications', headers=auth('u4', a['customer'])).status_code == 429
+    assert client.get('/api/notifications', headers=auth('u5', b['customer'])).status_code == 200
+
+
+def test_plans_only_fill_their_share_of_slots():
+    controller = AdmissionController()
+    controller.configure(max_in_flight=2, shares={'free': 0.5, 'enterprise': 1.0},
+                         queue_limits={'free': 0, 'enterprise': 1}, queue_timeout=0.05)
+    assert controller.acquire('free')
+    assert not controller.acquire('free')
+    assert controller.acquire('enterprise')
+    assert not controller.acquire('enterprise')
+    assert controller.stats()['shed'] == {'free': 1, 'enterprise': 1}
+    controller.release()
+    assert controller.acquire('enterprise')
+
+
+def test_shed_requests_get_503(make_app, auth, tenants):
+    a = tenants['a']
+    app = make_app(ADMISSION_ENABLED=True, ADMISSION_MAX_IN_FLIGHT=1, ADMISSION_QUEUE_LIMITS={})
+    assert admission.acquire('free')
+    try:
+        response = app.test_client().get('/api/notifications', headers=auth(a['user'], a['customer']))
+    finally:
+        admission.release()
+    assert response.status_code == 503 and response.headers['Retry-After']
+    assert app.test_client().get('/api/notifications', headers=auth(a['user'], a['customer'])).status_code == 200
+
+
+def test_async_board_draws_from_the_same_buckets(make_config, make_app, auth, tenants):
+    a = tenants['a']
+    overrides = {'RATE_LIMIT_ENABLED': True, 'RATE_LIMIT_REDIS_URL': None, 'RATE_LIMITS_PER_USER': {},
+                 'RATE_LIMITS': {'kanban_bp.get_kanban_board': {'free': (0.001, 1)}}}
+    flask_client = make_app(**overrides).test_client()
+    headers = auth(a['user'], a['customer'])
+    board = f"/api/kanban/{a['project']}"
+    with TestClient(create_async_app(make_config(**overrides))) as async_client:
+        assert async_client.get(board, headers=headers).status_code == 200
+        response = async_client.get(board, headers=headers)
+        assert response.status_code == 429 and response.headers['Retry-After']
+    assert flask_client.get(board, headers=headers).status_code == 429
@@ -0,0 +1,36 @@
+from datetime import date, datetime, timedelta
+from app.extensions import db
+from app.jobs import reminders
+from app.models import Task, TaskReminder
+
+
+def _due(app, task_id, due_date):
+    with app.app_context():
+        db.session.get(Task, task_id).due_date = due_date
+        db.session.commit()
+
+
+def test_unsent_reminders_are_retried(app, tenants, monkeypatch):
+    a = tenants['a']
+    _due(app, a['task'], date.today() + timedelta(days=1))
+    with app.app_context():
+        assert reminders.send_due_reminders() == {'claimed': 1, 'sent': 0}
+        assert reminders.send_due_reminders() == {'claimed': 0, 'sent': 0}
+        TaskReminder.query.update({'claimed_at': datetime.utcnow() - timedelta(hours=2)})
+        db.session.commit()
+        sent = []
+        monkeypatch.setattr(reminders, 'send_email', lambda to, subject, body: sent.append(to) or True)
+        assert reminders.send_due_reminders() == {'claimed': 1, 'sent': 1}
+        assert sent == ['admin-a@example.com']
+        assert TaskReminder.query.one().sent_at is not None
+
+
+def test_retry_skips_reminders_that_no_longer_apply(app, tenants):
+    a = tenants['a']
+    _due(app, a['task'], date.today() + timedelta(days=1))
+    with app.app_context():
+        reminders.send_due_reminders()
+        TaskReminder.query.update({'claimed_at': datetime.utcnow() - timedelta(hours=2)})
+        db.session.get(Task, a['task']).status = 'done'
+        db.session.commit()
+        assert reminders.send_due_reminders() == {'claimed': 0, 'sent': 0}
@@ -0,0 +1,60 @@
+from app.extensions import db
+from app.models import Comment, Task, Tombstone
+from app.services.project_stats import project_stats
+
+
+def _subtask(client, headers, parent_id, project_id, title):
+    response = client.post('/api/subtasks', headers=headers, json={
+        'parent_task_id': parent_id, 'project_id': project_id, 'title': title,
+    })
+    return response.get_json()['id']
+
+
+def test_deleting_a_subtask_hides_its_tree_at_once(app, client, auth, tenants):
+    a = tenants['a']
+    headers = auth(a['user'], a['customer'])
+    child = _subtask(client, headers, a['task'], a['project'], 'Child')
+    grandchild = _subtask(client, headers, child, a['project'], 'Grandchild')
+    comment = client.post('/api/comments', headers=headers, json={'task_id': grandchild, 'content': 'Hi'}).get_json()['id']
+    cursor = client.get('/api/sync', headers=headers).get_json()['cursor']
+
+    assert client.delete(f'/api/subtasks/{child}', headers=headers).status_code == 200
+    with app.app_context():
+        assert db.session.get(Task, grandchild) is None
+        assert db.session.get(Comment, comment) is None
+        assert db.session.get(Task, a['task']) is not None
+    changes = client.get(f'/api/sync?since={cursor}', headers=headers).get_json()
+    assert sorted((item['type'], item['id']) for item in changes['deleted']) == sorted([
+        ('task', child), ('task', grandchild), ('comment', comment),
+    ])
+    assert not any(changes['changes'].values())
+
+
+def test_deleting_a_subtask_tree_moves_counters_and_versions_in_bulk(app, client, auth, tenants):
+    a = tenants['a']
+    headers = auth(a['user'], a['customer'])
+    child = _subtask(client, headers, a['task'], a['project'], 'Child')
+    grandchild = _subtask(client, headers, child, a['project'], 'Grandchild')
+    client.post('/api/comments', headers=headers, json={'task_id': grandchild, 'content': 'Hi'})
+    with app.app_context():
+        assert project_stats(a['project'])['total'] == 3
+        version = db.session.get(Task, grandchild).version_id
+
+    assert client.delete(f'/api/subtasks/{child}', headers=headers).status_code == 200
+    with app.app_context():
+        assert project_stats(a['project'])['total'] == 1
+        deleted = db.session.get(Task, grandchild, execution_options={'include_deleted': True})
+        assert deleted.version_id == version + 1
+        tombstones = Tombstone.query.filter_by(customer_id=a['customer']).all()
+        assert len(tombstones) == 3
+        # Everything under the deleted task shares one change sequence
+        assert len({t.change_seq for t in tombstones if t.entity_id != child}) == 1
+
+
+def test_full_sync_leaves_deleted_rows_out(client, auth, tenants):
+    a = tenants['a']
+    headers = auth(a['user'], a['customer'])
+    child = _subtask(client, headers, a['task'], a['project'], 'Child')
+    client.delete(f'/api/subtasks/{child}', headers=headers)
+    changes = client.get('/api/sync?since=0', headers=headers).get_json()
+    assert [task['id'] for task in changes['changes']['task']] == [a['task']]
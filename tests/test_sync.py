@@ -0,0 +1,42 @@
+import importlib.util
+import os
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from app.extensions import db
+from app.models import Comment, SyncCounter, Task
+
+MIGRATION = os.path.join(os.path.dirname(__file__), os.pardir, 'migrations', 'versions',
+                         'c47e2a9b5d18_add_delta_sync_change_sequences.py')
+
+
+def _backfill():
+    spec = importlib.util.spec_from_file_location('c47e2a9b5d18', MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    with db.engine.begin() as connection, Operations.context(MigrationContext.configure(connection)):
+        migration.backfill_change_seqs()
+
+
+def test_rows_from_before_change_sequences_are_synced(app, client, auth, tenants):
+    a = tenants['a']
+    headers = auth(a['user'], a['customer'])
+    client.post('/api/comments', headers=headers, json={'task_id': a['task'], 'content': 'Hi'})
+    with app.app_context():
+        # As the tables stood when the migration added change_seq
+        for model in (Task, Comment):
+            db.session.execute(model.__table__.update().values(change_seq=None))
+        db.session.execute(SyncCounter.__table__.delete())
+        db.session.commit()
+        _backfill()
+
+    changes = client.get('/api/sync?since=0', headers=headers).get_json()
+    assert [task['id'] for task in changes['changes']['task']] == [a['task']]
+    assert len(changes['changes']['comment']) == 1
+    assert changes['cursor'] == '1'
+
+    response = client.post('/api/subtasks', headers=headers, json={
+        'parent_task_id': a['task'], 'project_id': a['project'], 'title': 'New',
+    })
+    changes = client.get('/api/sync?since=1', headers=headers).get_json()
+    assert [task['id'] for task in changes['changes']['task']] == [response.get_json()['id']]
+    assert changes['cursor'] == '2'
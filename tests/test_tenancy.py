@@ -0,0 +1,51 @@
+from app.extensions import db
+from app.models import Comment
+
+
+def test_lists_are_confined_to_the_callers_tenant(client, auth, tenants):
+    a, b = tenants['a'], tenants['b']
+    response = client.get(f"/api/kanban/{b['project']}", headers=auth(a['user'], a['customer']))
+    assert response.status_code == 200
+    assert all(not column for column in response.get_json().values())
+    response = client.get(f"/api/kanban/{b['project']}", headers=auth('root', None, 'superadmin'))
+    assert [card['id'] for card in response.get_json()['todo']] == [b['task']]
+
+
+def test_comment_on_another_tenants_task_is_not_found(client, auth, tenants):
+    a, b = tenants['a'], tenants['b']
+    headers = auth(a['user'], a['customer'])
+    response = client.post('/api/comments', headers=headers, json={'task_id': b['task'], 'content': 'Hi'})
+    assert response.status_code == 404
+    response = client.post('/api/comments', headers=headers, json={'task_id': a['task'], 'content': 'Hi'})
+    assert response.status_code == 201
+
+
+def test_superadmin_comments_in_the_tasks_tenant(app, client, auth, tenants):
+    b = tenants['b']
+    response = client.post('/api/comments', headers=auth('root', None, 'superadmin'), json={'task_id': b['task'], 'content': 'Hi'})
+    assert response.status_code == 201
+    with app.app_context():
+        assert db.session.get(Comment, response.get_json()['id']).customer_id == b['customer']
+
+
+def test_subtask_under_another_tenants_task_is_not_found(client, auth, tenants):
+    a, b = tenants['a'], tenants['b']
+    headers = auth(a['user'], a['customer'])
+    response = client.post('/api/subtasks', headers=headers, json={'parent_task_id': b['task'], 'title': 'Sub'})
+    assert response.status_code == 404
+    response = client.post('/api/subtasks', headers=headers, json={
+        'parent_task_id': a['task'], 'project_id': b['project'], 'title': 'Sub',
+    })
+    assert response.status_code == 400
+
+
+def test_file_on_another_tenants_project_is_not_found(client, auth, tenants):
+    a, b = tenants['a'], tenants['b']
+    headers = auth(a['user'], a['customer'])
+    link = {'file_url': 'https://example.com/spec.pdf', 'file_name': 'spec.pdf'}
+    response = client.post('/api/files', headers=headers, json={**link, 'project_id': b['project']})
+    assert response.status_code == 404
+    response = client.post('/api/files', headers=headers, json={**link, 'task_id': a['task'], 'project_id': b['project']})
+    assert response.status_code == 404
+    response = client.post('/api/files', headers=headers, json={**link, 'project_id': a['project']})
+    assert response.status_code == 201
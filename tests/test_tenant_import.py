@@ -0,0 +1,112 @@
+import json
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.jobs.tenant_import import run_import_job
+from app.routes import tenant_import as import_routes
+from app.models import Comment, FileAttachment, ImportJob, Task
+from app.services.tenant_import import TenantImporter
+
+
+def _archive(*records):
+    return [(json.dumps(record) if not isinstance(record, str) else record).encode() + b'\n' for record in records]
+
+
+def _job(customer_id, path='unused.ndjson'):
+    job = ImportJob(customer_id=customer_id, source_path=str(path))
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def test_invalid_records_are_skipped(app, tenants):
+    with app.app_context():
+        job = _job(tenants['a']['customer'])
+        TenantImporter(job).run(_archive(
+            {'type': 'task', 'data': {'id': 't1', 'title': 'Kept'}},
+            {'type': 'task', 'data': ['not', 'an', 'object']},
+            {'type': 'task', 'data': {'id': 't2', 'title': 'x' * 300}},
+            {'type': 'task', 'data': {'id': 't3', 'title': {'nested': True}}},
+            {'type': 'widget', 'data': {'id': 'w1'}},
+            '[1, 2]',
+            'not json',
+        ))
+        assert (job.rows_loaded, job.rows_skipped, job.lines_processed) == (1, 6, 7)
+
+
+def test_rows_the_database_refuses_do_not_fail_the_batch(app, tenants):
+    with app.app_context():
+        job = _job(tenants['a']['customer'])
+        TenantImporter(job, batch_size=2).run(_archive(
+            {'type': 'task', 'data': {'id': 't1', 'title': 'First'}},
+            {'type': 'task', 'data': {'id': 't2', 'title': 'Second'}},
+            {'type': 'task', 'data': {'id': 't1', 'title': 'Duplicate'}},
+            {'type': 'task', 'data': {'id': 't3', 'title': 'Third'}},
+        ))
+        assert (job.rows_loaded, job.rows_skipped) == (3, 1)
+        titles = {task.title for task in Task.query.filter_by(customer_id=job.customer_id)}
+        assert {'First', 'Second', 'Third'} <= titles and 'Duplicate' not in titles
+
+
+def test_references_to_missing_records_are_cleared(app, tenants):
+    with app.app_context():
+        job = _job(tenants['a']['customer'])
+        importer = TenantImporter(job)
+        importer.run(_archive(
+            {'type': 'project', 'data': {'id': 'p1', 'name': 'Imported'}},
+            {'type': 'task', 'data': {'id': 't1', 'title': 'Kept', 'project_id': 'p1', 'parent_task_id': 'gone'}},
+            {'type': 'task', 'data': {'id': 't2', 'title': 'Lost project', 'project_id': 'gone'}},
+            {'type': 'comment', 'data': {'id': 'c1', 'task_id': 'gone', 'content': 'Hi'}},
+            {'type': 'file', 'data': {'id': 'f1', 'task_id': 'gone', 'project_id': 'p1', 'file_url': 'u', 'file_name': 'n'}},
+        ))
+        kept = db.session.get(Task, importer.remap('task', 't1'))
+        assert kept.project_id == importer.remap('project', 'p1') and kept.parent_task_id is None
+        assert db.session.get(Task, importer.remap('task', 't2')).project_id is None
+        assert db.session.get(Comment, importer.remap('comment', 'c1')).task_id is None
+        file = db.session.get(FileAttachment, importer.remap('file', 'f1'))
+        assert file.task_id is None and file.project_id == importer.remap('project', 'p1')
+
+
+def test_uploaded_archive_is_removed_once_imported(app, tenants, tmp_path):
+    path = tmp_path / 'upload.ndjson'
+    path.write_bytes(b''.join(_archive({'type': 'task', 'data': {'id': 't1', 'title': 'Task'}})))
+    with app.app_context():
+        assert run_import_job(_job(tenants['a']['customer'], path).id) == {'rows_loaded': 1, 'rows_skipped': 0}
+    assert not path.exists()
+
+
+def test_import_into_a_missing_customer_is_not_found(client, auth):
+    response = client.post('/api/customers/missing/import', headers=auth('root', None, 'superadmin'), data=b'')
+    assert response.status_code == 404
+
+
+def _crashed_job(customer_id, path, heartbeat_age):
+    job = _job(customer_id, path)
+    job.status = 'running'
+    job.heartbeat_at = datetime.utcnow() - heartbeat_age
+    db.session.commit()
+    return job
+
+
+def test_running_import_is_taken_over_once_its_lease_expires(app, tenants, tmp_path):
+    path = tmp_path / 'upload.ndjson'
+    path.write_bytes(b''.join(_archive({'type': 'task', 'data': {'id': 't1', 'title': 'Task'}})))
+    with app.app_context():
+        job_id = _crashed_job(tenants['a']['customer'], path, timedelta(seconds=30)).id
+        assert run_import_job(job_id) is None
+        db.session.get(ImportJob, job_id).heartbeat_at = datetime.utcnow() - timedelta(hours=1)
+        db.session.commit()
+        assert run_import_job(job_id) == {'rows_loaded': 1, 'rows_skipped': 0}
+        assert db.session.get(ImportJob, job_id).status == 'done'
+
+
+def test_resume_accepts_stalled_imports_only(app, client, auth, tenants, tmp_path, monkeypatch):
+    monkeypatch.setattr(import_routes, '_queue', lambda job: True)
+    customer_id = tenants['a']['customer']
+    with app.app_context():
+        live = _crashed_job(customer_id, tmp_path / 'live', timedelta(seconds=30)).id
+        stalled = _crashed_job(customer_id, tmp_path / 'stalled', timedelta(hours=1)).id
+    headers = auth('root', None, 'superadmin')
+    response = client.post(f'/api/customers/{customer_id}/imports/{live}/resume', headers=headers)
+    assert response.status_code == 400
+    response = client.post(f'/api/customers/{customer_id}/imports/{stalled}/resume', headers=headers)
+    assert response.status_code == 202 and response.get_json()['status'] == 'pending'
@@ -0,0 +1,24 @@
+import io
+import pytest
+from app.extensions import db
+from app.jobs.thumbnails import process_thumbnail_backlog
+from app.models import FileBlob
+from app.services.blob_storage import store_stream, place_blob, blob_path
+from app.services.thumbnails import thumbnail_path
+
+Image = pytest.importorskip('PIL.Image')
+
+
+def test_backlog_renders_pending_thumbnails(app):
+    image = io.BytesIO()
+    Image.new('RGB', (800, 600), 'red').save(image, 'PNG')
+    image.seek(0)
+    with app.app_context():
+        sha256, size, tmp_path = store_stream(image)
+        db.session.add(FileBlob(sha256=sha256, size=size, content_type='image/png', ref_count=1, thumbnail_status='pending'))
+        place_blob(sha256, tmp_path)
+        db.session.commit()
+        assert process_thumbnail_backlog() == {'processed': 1}
+        assert db.session.get(FileBlob, sha256).thumbnail_status == 'ready'
+        with Image.open(thumbnail_path(blob_path(sha256))) as thumbnail:
+            assert max(thumbnail.size) <= 256
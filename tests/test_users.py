@@ -0,0 +1,20 @@
+from app.extensions import db
+from app.models import User
+from app.services.cache import cached_get
+
+
+def test_demoted_admin_loses_admin_rights_at_once(app, client, auth, tenants):
+    a = tenants['a']
+    headers = auth(a['user'], a['customer'])
+    with app.app_context():
+        member = User(email='member-a@example.com', name='Member', role='user', customer_id=a['customer'])
+        member.set_password('secret123')
+        db.session.add(member)
+        db.session.commit()
+        member_id = member.id
+        # Warm the record cache with the admin row, then demote it
+        assert cached_get(User, a['user']).role == 'admin'
+        db.session.execute(User.__table__.update().where(User.id == a['user']).values(role='user'))
+        db.session.commit()
+    assert client.put(f'/api/users/{member_id}', headers=headers, json={'name': 'Renamed'}).status_code == 403
+    assert client.delete(f'/api/users/{member_id}', headers=headers).status_code == 403
@@ -0,0 +1,74 @@
+from datetime import date, timedelta
+from app.extensions import db
+from app.models import Task
+
+
+def _add_tasks(app, tenant, *tasks):
+    with app.app_context():
+        for fields in tasks:
+            db.session.add(Task(project_id=tenant['project'], customer_id=tenant['customer'], **fields))
+        db.session.commit()
+
+
+def _workload(client, auth, tenant, query=''):
+    response = client.get(f"/api/customers/{tenant['customer']}/workload{query}", headers=auth(tenant['user'], tenant['customer']))
+    assert response.status_code == 200
+    return {entry['assignee_user_id']: entry for entry in response.get_json()}
+
+
+def test_workload_counts_open_tasks_per_assignee(app, client, auth, tenants):
+    a = tenants['a']
+    today = date.today()
+    _add_tasks(app, a,
+        {'title': 'Late', 'status': 'in_progress', 'assignee_user_id': a['user'], 'due_date': today - timedelta(days=3)},
+        {'title': 'Today', 'status': 'blocked', 'assignee_user_id': a['user'], 'due_date': today},
+        {'title': 'Done', 'status': 'done', 'assignee_user_id': a['user'], 'due_date': today - timedelta(days=3)},
+        {'title': 'Later', 'assignee_user_id': None, 'due_date': today + timedelta(days=30)},
+    )
+    with app.app_context():
+        deleted = Task(title='Gone', project_id=a['project'], customer_id=a['customer'], assignee_user_id=a['user'], due_date=today)
+        db.session.add(deleted)
+        db.session.flush()
+        deleted.soft_delete()
+        db.session.commit()
+
+    response = client.get(f"/api/customers/{a['customer']}/workload", headers=auth(a['user'], a['customer']))
+    assert [entry['assignee_user_id'] for entry in response.get_json()] == [a['user'], None]
+    workload = _workload(client, auth, a)
+    assert workload[a['user']] == {
+        'assignee_user_id': a['user'], 'name': 'Admin a', 'open': 3, 'todo': 1, 'in_progress': 1,
+        'blocked': 1, 'overdue': 1, 'due_this_week': 1,
+    }
+    assert workload[None] == {
+        'assignee_user_id': None, 'name': None, 'open': 1, 'todo': 1, 'in_progress': 0,
+        'blocked': 0, 'overdue': 0, 'due_this_week': 0,
+    }
+
+
+def test_workload_due_date_filters(app, client, auth, tenants):
+    a = tenants['a']
+    today = date.today()
+    _add_tasks(app, a,
+        {'title': 'Late', 'assignee_user_id': a['user'], 'due_date': today - timedelta(days=3)},
+        {'title': 'Today', 'assignee_user_id': a['user'], 'due_date': today},
+        {'title': 'Later', 'assignee_user_id': None, 'due_date': today + timedelta(days=30)},
+    )
+    workload = _workload(client, auth, a, f'?due_from={today.isoformat()}')
+    assert workload[a['user']]['open'] == 1 and workload[None]['open'] == 1
+    workload = _workload(client, auth, a, f'?due_to={today.isoformat()}')
+    assert set(workload) == {a['user']} and workload[a['user']]['open'] == 2
+    workload = _workload(client, auth, a, f'?due_from={today.isoformat()}&due_to={today.isoformat()}')
+    assert set(workload) == {a['user']} and workload[a['user']]['due_this_week'] == 1
+    response = client.get(f"/api/customers/{a['customer']}/workload?due_to=soon", headers=auth(a['user'], a['customer']))
+    assert response.status_code == 400
+
+
+def test_workload_stays_within_the_customer(app, client, auth, tenants):
+    a, b = tenants['a'], tenants['b']
+    _add_tasks(app, b, {'title': 'Theirs', 'assignee_user_id': None})
+    assert set(_workload(client, auth, a)) == {a['user']}
+    assert set(_workload(client, auth, b)) == {b['user'], None}
+    response = client.get(f"/api/customers/{a['customer']}/workload", headers=auth(b['user'], b['customer']))
+    assert response.status_code == 403
+    response = client.get(f"/api/customers/{a['customer']}/workload", headers=auth('root', None, 'superadmin'))
+    assert [entry['assignee_user_id'] for entry in response.get_json()] == [a['user']]